@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Acceso compartido a los archivos de quiz de la biblioteca
+
+Los quizzes conviven en dos formatos:
+- {"quizzes": [{"chapterId": ..., "questions": [...]}]}  (el que lee interactive-quiz.js)
+- {"chapters": {cap_id: {"chapterTitle": ..., "questions": [...]}}}  (generadores antiguos)
+
+Este módulo oculta esa diferencia para las herramientas de análisis.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+# www/books relativo a la raíz del repositorio
+BASE_PATH = Path(__file__).resolve().parent / "www" / "books"
+
+ARCHIVOS_QUIZ = ("quizzes.json", "quizzes-kids.json")
+
+
+def listar_archivos_quiz(base_path: Path = BASE_PATH) -> List[Path]:
+    """Devuelve todos los archivos de quiz (adultos y niños) ordenados"""
+    archivos = []
+    for libro_dir in sorted(base_path.iterdir()):
+        for nombre in ARCHIVOS_QUIZ:
+            quiz_path = libro_dir / "assets" / nombre
+            if quiz_path.exists():
+                archivos.append(quiz_path)
+    return archivos
+
+
+def libro_de_archivo(quiz_path: Path) -> str:
+    """Obtiene el id del libro a partir de la ruta de su archivo de quiz"""
+    return quiz_path.parent.parent.name
+
+
+def cargar_json(path: Path) -> Dict[str, Any]:
+    """Carga un archivo JSON en UTF-8"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def serializar_json(data: Any, final_linea: bool = False) -> bytes:
+    """Serializa igual que los generadores: UTF-8 sin escapar e indentado a 2"""
+    texto = json.dumps(data, ensure_ascii=False, indent=2)
+    return (texto + "\n" if final_linea else texto).encode('utf-8')
+
+
+def _escribir_atomico(path: Path, contenido: bytes, existe: bool):
+    """Archivo temporal en el mismo directorio + rename: nunca deja un archivo a medias"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(contenido)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp crea con 0600: conservar los permisos del original
+        os.chmod(temporal, path.stat().st_mode & 0o777 if existe else 0o644)
+        os.replace(temporal, path)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.unlink(temporal)
+        raise
+
+
+def escribir_si_cambia(path: Path, contenido: bytes) -> bool:
+    """
+    Escribe 'contenido' solo si difiere de lo que ya hay en disco.
+
+    La escritura es atómica, y los archivos sin cambios conservan su mtime
+    (no invalidan la caché del service worker). Devuelve True si se ha escrito.
+    """
+    path = Path(path)
+    actual = path.read_bytes() if path.exists() else None
+    if contenido == actual:
+        return False
+    _escribir_atomico(path, contenido, actual is not None)
+    return True
+
+
+def escribir_json_si_cambia(path: Path, data: Any) -> bool:
+    """
+    Escribe el JSON solo si los bytes serializados cambian (ver escribir_si_cambia).
+
+    Respeta el salto de línea final si el archivo ya lo tenía.
+    Devuelve True si el archivo se ha escrito.
+    """
+    path = Path(path)
+    actual = path.read_bytes() if path.exists() else None
+    nuevo = serializar_json(data, final_linea=bool(actual and actual.endswith(b"\n")))
+    if nuevo == actual:
+        return False
+    _escribir_atomico(path, nuevo, actual is not None)
+    return True
+
+
+def iterar_capitulos(quiz_data: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Recorre (cap_id, capítulo) en cualquiera de los dos formatos de quiz"""
+    for capitulo in quiz_data.get("quizzes") or []:
+        yield capitulo.get("chapterId", ""), capitulo
+
+    for cap_id, capitulo in (quiz_data.get("chapters") or {}).items():
+        yield cap_id, capitulo
+
+
+def indice_correcto(pregunta: Dict[str, Any]) -> Optional[int]:
+    """Índice de la opción correcta ('correctAnswer' o el antiguo 'correct')"""
+    for campo in ("correctAnswer", "correct"):
+        valor = pregunta.get(campo)
+        if isinstance(valor, int) and not isinstance(valor, bool):
+            return valor
+    return None
+
+
+def iterar_preguntas(base_path: Path = BASE_PATH) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre todas las preguntas de la biblioteca.
+
+    Cada elemento incluye la referencia completa de la pregunta:
+    libro, archivo, capítulo, posición y el dict original.
+    """
+    for quiz_path in listar_archivos_quiz(base_path):
+        quiz_data = cargar_json(quiz_path)
+        libro_id = libro_de_archivo(quiz_path)
+
+        for cap_id, capitulo in iterar_capitulos(quiz_data):
+            for idx, pregunta in enumerate(capitulo.get("questions") or []):
+                yield {
+                    "libro": libro_id,
+                    "archivo": quiz_path.name,
+                    "capitulo": cap_id,
+                    "indice": idx,
+                    "pregunta": pregunta
+                }
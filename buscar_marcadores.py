@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Buscador de Marcadores Pendientes
+
+Recorre todos los JSON de www/books (libros, quizzes, recursos y los
+generados en el build) buscando restos de plantilla que no deben publicarse:
+los "[PENDIENTE] ..." de generate_quizzes.py, los "[Buscar cita ...]" de
+populate_quizzes.py, etc.
+
+Cada patrón tiene una pista literal que se busca primero sobre el texto
+crudo de cada archivo; solo los archivos con alguna pista (muy pocos) se
+parsean, y en ellos la expresión regular única se aplica únicamente a las
+cadenas con pista, dando la ruta exacta de cada marcador como JSON Pointer
+(RFC 6901).
+
+Sale con código 1 si encuentra algún marcador, para poder usarlo como
+puerta antes de publicar (npm run check:placeholders).
+
+Uso:
+    python3 buscar_marcadores.py
+    python3 buscar_marcadores.py --salida REPORTE-MARCADORES.json
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Tuple
+
+from biblioteca_quizzes import BASE_PATH
+
+# Nombre del patrón -> (pista literal, expresión sin grupos propios).
+# La pista es un fragmento fijo que toda coincidencia contiene: buscarla con
+# 'in' es mucho más rápido que pasar la expresión por todo el texto.
+PATRONES = {
+    "pendiente": ("[PENDIENTE", r"\[PENDIENTE\b"),
+    "buscar_cita": ("[Buscar cita", r"\[Buscar cita\b"),
+    "cita_plantilla": ("[Cita textual relevante", r"\[Cita textual relevante"),
+    "lorem_ipsum": ("orem ipsum", r"\b[Ll]orem ipsum\b"),
+    "variable_sin_sustituir": ("{{", r"\{\{\s*[\w.]+\s*\}\}"),
+}
+
+PISTAS = tuple(pista for pista, _ in PATRONES.values())
+PATRON_MARCADORES = re.compile("|".join(f"(?P<{nombre}>{expresion})"
+                                        for nombre, (_, expresion) in PATRONES.items()))
+
+LONGITUD_EXTRACTO = 80
+
+
+def escapar_puntero(clave: str) -> str:
+    """Escapa un segmento de JSON Pointer"""
+    return clave.replace("~", "~0").replace("/", "~1")
+
+
+def iterar_cadenas(valor: Any, puntero: str = "") -> Iterator[Tuple[str, str]]:
+    """Recorre (JSON Pointer, cadena) de todas las cadenas de un valor JSON"""
+    pendientes = [(puntero, valor)]
+    while pendientes:
+        ruta, actual = pendientes.pop()
+        if isinstance(actual, str):
+            yield ruta, actual
+        elif isinstance(actual, dict):
+            pendientes.extend((f"{ruta}/{escapar_puntero(str(k))}", v) for k, v in reversed(actual.items()))
+        elif isinstance(actual, list):
+            pendientes.extend((f"{ruta}/{i}", v) for i, v in reversed(list(enumerate(actual))))
+
+
+def tiene_pista(texto: str) -> bool:
+    """Filtro rápido: False garantiza que el texto no tiene marcadores"""
+    return any(pista in texto for pista in PISTAS)
+
+
+def contiene_marcador(valor: Any) -> bool:
+    """True si alguna cadena del valor (p. ej. una pregunta) tiene un marcador"""
+    return any(tiene_pista(texto) and PATRON_MARCADORES.search(texto)
+               for _, texto in iterar_cadenas(valor))
+
+
+def buscar_en_archivo(path: Path) -> List[Dict[str, str]]:
+    """Marcadores de un archivo JSON, con su JSON Pointer"""
+    texto = path.read_text(encoding='utf-8')
+    if not tiene_pista(texto):
+        return []
+
+    hallazgos = []
+    for puntero, cadena in iterar_cadenas(json.loads(texto)):
+        if not tiene_pista(cadena):
+            continue
+        for coincidencia in PATRON_MARCADORES.finditer(cadena):
+            hallazgos.append({
+                "puntero": puntero,
+                "patron": coincidencia.lastgroup,
+                "extracto": cadena[coincidencia.start():coincidencia.start() + LONGITUD_EXTRACTO]
+            })
+    return hallazgos
+
+
+def buscar_marcadores(base_path: Path = BASE_PATH) -> Dict[str, Any]:
+    """
+    Busca marcadores en todos los JSON bajo base_path.
+
+    Devuelve {archivos, archivosConMarcadores, total, porPatron, hallazgos}
+    donde 'hallazgos' agrupa por archivo (ruta relativa a base_path).
+    """
+    hallazgos: Dict[str, List[Dict[str, str]]] = {}
+    archivos = sorted(base_path.rglob("*.json"))
+
+    for path in archivos:
+        encontrados = buscar_en_archivo(path)
+        if encontrados:
+            hallazgos[str(path.relative_to(base_path))] = encontrados
+
+    por_patron: Dict[str, int] = {}
+    for encontrados in hallazgos.values():
+        for h in encontrados:
+            por_patron[h["patron"]] = por_patron.get(h["patron"], 0) + 1
+
+    return {
+        "archivos": len(archivos),
+        "archivosConMarcadores": len(hallazgos),
+        "total": sum(por_patron.values()),
+        "porPatron": por_patron,
+        "hallazgos": hallazgos
+    }
+
+
+def main():
+    """Función principal; sale con 1 si hay marcadores"""
+    parser = argparse.ArgumentParser(description="Busca marcadores de plantilla en www/books")
+    parser.add_argument("--ruta", type=Path, default=BASE_PATH, help="Directorio a recorrer")
+    parser.add_argument("--salida", type=Path, help="Guardar el reporte completo en JSON")
+    parser.add_argument("--max-por-archivo", type=int, default=5,
+                        help="Hallazgos a mostrar por archivo (0 = todos)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    reporte = buscar_marcadores(args.ruta)
+    duracion = time.perf_counter() - inicio
+
+    for archivo, encontrados in reporte["hallazgos"].items():
+        print(f"\n✗ {archivo}: {len(encontrados)} marcadores")
+        mostrar = encontrados if args.max_por_archivo == 0 else encontrados[:args.max_por_archivo]
+        for h in mostrar:
+            print(f"    {h['puntero']}  [{h['patron']}] {h['extracto']}")
+        if len(mostrar) < len(encontrados):
+            print(f"    ... y {len(encontrados) - len(mostrar)} más")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+
+    print(f"\n{reporte['archivos']} archivos JSON revisados en {duracion:.2f}s")
+    if reporte["total"]:
+        resumen = ", ".join(f"{p}: {n}" for p, n in sorted(reporte["porPatron"].items()))
+        print(f"✗ {reporte['total']} marcadores en {reporte['archivosConMarcadores']} archivos ({resumen})")
+        sys.exit(1)
+    print("✓ Sin marcadores pendientes")
+
+
+if __name__ == "__main__":
+    main()
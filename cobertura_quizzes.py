@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Matriz de Cobertura de Quizzes
+
+Cruza los capítulos de cada book.json (prólogo, secciones y epílogo) con
+los archivos de quiz de adultos y de niños:
+
+- Por libro y capítulo: número de preguntas y reparto de dificultad en cada
+  variante (0 = capítulo sin quiz).
+- Entradas huérfanas: capítulos de quiz cuyo id ya no existe en el libro
+  (p. ej. tras regenerar el libro), quizzes de libros sin book.json y
+  capítulos repetidos dentro de un mismo archivo de quiz.
+
+Cada libro y cada archivo de quiz se lee una sola vez; los capítulos se
+indexan por id en diccionarios, así que el cruce de toda la biblioteca es
+lineal en el número de capítulos.
+
+Uso:
+    python3 cobertura_quizzes.py
+    python3 cobertura_quizzes.py --estricto   # sale con 1 si hay huérfanos
+"""
+
+import argparse
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Any
+
+from biblioteca_quizzes import BASE_PATH, cargar_json, escribir_json_si_cambia, iterar_capitulos
+from corpus_libros import iterar_libros
+from empaquetar_quizzes import VARIANTES
+from estimar_dificultad import ETIQUETAS_CONSERVADAS, normalizar_nivel
+
+REPORTE_PATH = BASE_PATH.parent.parent / "REPORTE-COBERTURA-QUIZ.json"
+
+SIN_NIVEL = "sinNivel"
+
+
+def nivel_pregunta(pregunta: Dict[str, Any]) -> str:
+    """Nivel normalizado, la etiqueta de audiencia ('ninos') o SIN_NIVEL"""
+    etiqueta = pregunta.get("difficulty")
+    if etiqueta in ETIQUETAS_CONSERVADAS:
+        return etiqueta
+    return normalizar_nivel(etiqueta) or SIN_NIVEL
+
+
+def indexar_quizzes(base_path: Path = BASE_PATH) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Índice libro -> variante -> {capitulos: {cap_id: celda}, repetidos: [cap_id]}.
+
+    Cada celda es {preguntas, dificultad}. Si un capítulo aparece dos veces en
+    el mismo archivo, cuenta el primero (como en la app) y se anota como repetido.
+    """
+    indice: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for libro_dir in sorted(p for p in base_path.iterdir() if p.is_dir()):
+        for variante, nombre in VARIANTES.items():
+            quiz_path = libro_dir / "assets" / nombre
+            if not quiz_path.exists():
+                continue
+
+            capitulos: Dict[str, Dict[str, Any]] = {}
+            repetidos: List[str] = []
+            for cap_id, capitulo in iterar_capitulos(cargar_json(quiz_path)):
+                if cap_id in capitulos:
+                    repetidos.append(cap_id)
+                    continue
+                preguntas = capitulo.get("questions") or []
+                capitulos[cap_id] = {
+                    "preguntas": len(preguntas),
+                    "dificultad": dict(sorted(Counter(nivel_pregunta(p) for p in preguntas).items()))
+                }
+            indice.setdefault(libro_dir.name, {})[variante] = {"capitulos": capitulos, "repetidos": repetidos}
+    return indice
+
+
+def calcular_cobertura(base_path: Path = BASE_PATH) -> Dict[str, Any]:
+    """Matriz libro × capítulo de toda la biblioteca, con huérfanos y resumen"""
+    quizzes = indexar_quizzes(base_path)
+    vacia = {"preguntas": 0, "dificultad": {}}
+
+    libros = {}
+    huerfanos = []
+    for libro in iterar_libros(base_path):
+        por_variante = quizzes.pop(libro.id, {})
+        capitulos = libro.capitulos_lectura()
+        ids = {c.id for c in capitulos}
+
+        filas = []
+        for capitulo in capitulos:
+            fila = {"capitulo": capitulo.id, "titulo": capitulo.title}
+            for variante in VARIANTES:
+                fila[variante] = por_variante.get(variante, {}).get("capitulos", {}).get(capitulo.id, vacia)
+            filas.append(fila)
+
+        resumen = {"capitulos": len(capitulos)}
+        for variante in VARIANTES:
+            datos = por_variante.get(variante)
+            resumen[variante] = {
+                "archivo": datos is not None,
+                "cubiertos": sum(1 for f in filas if f[variante]["preguntas"] > 0),
+                "preguntas": sum(f[variante]["preguntas"] for f in filas)
+            }
+            if datos is None:
+                continue
+            for cap_id in datos["capitulos"]:
+                if cap_id not in ids:
+                    huerfanos.append({"libro": libro.id, "variante": variante, "capitulo": cap_id,
+                                      "motivo": "capitulo_inexistente"})
+            for cap_id in datos["repetidos"]:
+                huerfanos.append({"libro": libro.id, "variante": variante, "capitulo": cap_id,
+                                  "motivo": "capitulo_repetido"})
+
+        libros[libro.id] = {"resumen": resumen, "capitulos": filas}
+
+    # Lo que queda en el índice de quizzes no tiene book.json
+    for libro_id, por_variante in quizzes.items():
+        for variante, datos in por_variante.items():
+            huerfanos.extend({"libro": libro_id, "variante": variante, "capitulo": cap_id,
+                              "motivo": "libro_inexistente"} for cap_id in datos["capitulos"])
+
+    return {
+        "libros": libros,
+        "huerfanos": huerfanos,
+        "totales": {
+            "capitulos": sum(l["resumen"]["capitulos"] for l in libros.values()),
+            **{variante: sum(l["resumen"][variante]["cubiertos"] for l in libros.values())
+               for variante in VARIANTES}
+        }
+    }
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Cobertura de quizzes frente a los capítulos de cada libro")
+    parser.add_argument("--salida", type=Path, default=REPORTE_PATH, help="Ruta del reporte JSON")
+    parser.add_argument("--estricto", action="store_true", help="Salir con código 1 si hay huérfanos")
+    args = parser.parse_args()
+
+    cobertura = calcular_cobertura()
+    escribir_json_si_cambia(args.salida, cobertura)
+
+    print(f"\n{'Libro':25} {'Caps':>5} " + " ".join(f"{v:>14}" for v in VARIANTES))
+    for libro_id, datos in cobertura["libros"].items():
+        resumen = datos["resumen"]
+        celdas = []
+        for variante in VARIANTES:
+            r = resumen[variante]
+            celdas.append(f"{r['cubiertos']:>3}/{resumen['capitulos']:<3} ({r['preguntas']:>3})"
+                          if r["archivo"] else f"{'—':>14}")
+        print(f"{libro_id:25} {resumen['capitulos']:>5} " + " ".join(celdas))
+
+    totales = cobertura["totales"]
+    print(f"\nCapítulos: {totales['capitulos']} · con quiz: " +
+          ", ".join(f"{v} {totales[v]}" for v in VARIANTES))
+
+    for h in cobertura["huerfanos"]:
+        print(f"  ⚠️  Huérfano ({h['motivo']}): {h['libro']} [{h['variante']}] {h['capitulo']}")
+
+    print(f"\n✓ Reporte guardado en: {args.salida}")
+
+    if args.estricto and cobertura["huerfanos"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
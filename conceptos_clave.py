@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Conceptos Clave por Capítulo (TF-IDF de n-gramas)
+
+Cuenta frases candidatas de 1 a 3 palabras en todos los capítulos de la
+biblioteca (prólogo, secciones y epílogo de cada book.json) y las puntúa
+con TF-IDF frente al resto de la biblioteca: un concepto es distintivo de
+un capítulo si aparece mucho en él y en pocos capítulos de otros libros.
+
+Las frecuencias de todos los capítulos se guardan en una matriz dispersa
+en formato CSR (indptr / indices / frecuencias de NumPy) con un único
+vocabulario, de modo que IDF y pesos de toda la biblioteca se calculan en
+una sola pasada vectorizada; los conceptos de cada libro salen de la misma
+matriz agregando sus capítulos.
+
+Las candidatas no empiezan ni terminan en palabra vacía ("economía del don"
+sí, "de la economía" no) y no cruzan signos de puntuación. Se descartan las
+frases que repiten un concepto ya elegido (sub o superfrase) y las de
+plantilla, presentes en la mayoría de capítulos de un libro ("Nota de
+Claude", "Ejercicio: aplica el capítulo...").
+
+Uso:
+    python3 conceptos_clave.py                     # resumen por libro
+    python3 conceptos_clave.py --libro nacimiento --k 10
+"""
+
+import argparse
+import io
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+from biblioteca_quizzes import BASE_PATH
+from corpus_libros import iterar_libros
+from texto_es import STOPWORDS_ES, limpiar_html, quitar_acentos
+
+MAX_PALABRAS = 3
+FRECUENCIA_MINIMA = 2
+LONGITUD_MINIMA = 4
+# Frases presentes en esta fracción de los capítulos de un libro (con al menos
+# CAPITULOS_PLANTILLA capítulos) son texto de plantilla: "Nota de Claude", ...
+FRACCION_PLANTILLA = 0.5
+CAPITULOS_PLANTILLA = 5
+# Únicas palabras vacías admitidas dentro de una frase ("economía del don")
+CONECTORES = frozenset("de del la el los las y en para sin con".split())
+# Las frases de varias palabras describen mejor un concepto que una palabra suelta
+PESO_LONGITUD = {1: 1.0, 2: 1.4, 3: 1.6}
+
+# El contenido viene cortado a ~70 columnas: solo las líneas en blanco separan frases
+PATRON_SEGMENTO = re.compile(r'[.,;:!?¡¿()\[\]«»"“”…—–*#>_`|/]+|\n\s*\n')
+PATRON_PALABRA_ACENTOS = re.compile(r'[a-záéíóúüñ0-9]+')
+
+# Palabras de discurso y de estructura del libro que no forman conceptos por sí solas
+VACIAS_EXTRA = frozenset("""
+cada cual cuando donde pues tal tras vez veces mismo misma mismos mismas
+aunque mientras entonces ademas otro otra otros otras toda todas este esta
+quizas incluso cosa cosas forma manera parte hacer hecho dice decir puede
+pueden podemos tenemos somos estamos hemos sera seria sino solo siempre nunca
+ahora aqui alla hoy algo nadie alguien nada mucho mucha muchos muchas
+capitulo capitulos libro libros ejercicio ejercicios nota notas
+""".split())
+VACIAS = STOPWORDS_ES | VACIAS_EXTRA
+
+
+def es_vacia(palabra: str) -> bool:
+    """Palabra que no puede abrir ni cerrar un concepto"""
+    return palabra in VACIAS or len(palabra) < 3 or palabra.isdigit()
+
+
+def frases_candidatas(texto: str, max_palabras: int = MAX_PALABRAS) -> Iterable[Tuple[str, str]]:
+    """(clave sin acentos, forma con acentos) de cada n-grama candidato del texto"""
+    texto = limpiar_html(texto).lower()
+    for segmento in PATRON_SEGMENTO.split(texto):
+        palabras = PATRON_PALABRA_ACENTOS.findall(segmento)
+        claves = [quitar_acentos(p) for p in palabras]
+        for i, clave in enumerate(claves):
+            if es_vacia(clave):
+                continue
+            for n in range(1, max_palabras + 1):
+                fin = i + n
+                if fin > len(claves):
+                    break
+                if n == 3 and es_vacia(claves[i + 1]) and claves[i + 1] not in CONECTORES:
+                    break
+                if es_vacia(claves[fin - 1]):
+                    continue
+                if n == 1 and len(clave) < LONGITUD_MINIMA:
+                    continue
+                yield ' '.join(claves[i:fin]), ' '.join(palabras[i:fin])
+
+
+def contiene_frase(mayor: str, menor: str) -> bool:
+    """True si 'menor' aparece como palabras completas dentro de 'mayor'"""
+    return f" {menor} " in f" {mayor} "
+
+
+class CorpusConceptos:
+    """
+    Matriz dispersa capítulo × n-grama de toda la biblioteca.
+
+    documentos: lista de (libro_id, cap_id, texto). Tras construirla:
+    - vocabulario: clave -> columna; formas: forma más frecuente de cada clave
+    - indptr / indices / frecuencias: filas CSR, una por documento
+    - idf: IDF suavizado por columna sobre todos los documentos
+    """
+
+    def __init__(self, documentos: List[Tuple[str, str, str]]):
+        self.documentos = [(libro, cap) for libro, cap, _ in documentos]
+        self.vocabulario: Dict[str, int] = {}
+        formas: List[Counter] = []
+
+        indptr = [0]
+        indices: List[int] = []
+        frecuencias: List[int] = []
+        for _, _, texto in documentos:
+            conteo: Counter = Counter()
+            for clave, forma in frases_candidatas(texto):
+                columna = self.vocabulario.get(clave)
+                if columna is None:
+                    columna = self.vocabulario[clave] = len(formas)
+                    formas.append(Counter())
+                formas[columna][forma] += 1
+                conteo[columna] += 1
+            indices.extend(conteo.keys())
+            frecuencias.extend(conteo.values())
+            indptr.append(len(indices))
+
+        self.claves = list(self.vocabulario)
+        self.formas = [f.most_common(1)[0][0] for f in formas]
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int32)
+        self.frecuencias = np.array(frecuencias, dtype=np.float32)
+        self._derivar()
+
+    def _derivar(self):
+        """Longitudes, IDF y pesos por longitud a partir de claves y filas CSR"""
+        self.longitudes = np.array([clave.count(' ') + 1 for clave in self.claves], dtype=np.int8)
+
+        # Cada columna aparece a lo sumo una vez por fila: df = bincount
+        documentos_con_termino = np.bincount(self.indices, minlength=len(self.claves))
+        n = len(self.documentos)
+        self.idf = (np.log((1 + n) / (1 + documentos_con_termino)) + 1).astype(np.float32)
+        self.peso_longitud = np.array([PESO_LONGITUD[min(l, MAX_PALABRAS)] for l in self.longitudes],
+                                      dtype=np.float32)
+
+    def serializar(self) -> bytes:
+        """Matriz y vocabulario en un .npz (para cachearlo sin volver a tokenizar)"""
+        textos = {nombre: np.frombuffer('\n'.join(lista).encode('utf-8'), dtype=np.uint8)
+                  for nombre, lista in (("claves", self.claves), ("formas", self.formas),
+                                        ("documentos", [f"{libro}\t{cap}" for libro, cap in self.documentos]))}
+        salida = io.BytesIO()
+        np.savez_compressed(salida, indptr=self.indptr, indices=self.indices,
+                            frecuencias=self.frecuencias, **textos)
+        return salida.getvalue()
+
+    @classmethod
+    def deserializar(cls, datos: bytes) -> "CorpusConceptos":
+        """Corpus guardado con serializar()"""
+        corpus = cls.__new__(cls)
+        with np.load(io.BytesIO(datos)) as npz:
+            def lineas(nombre: str) -> List[str]:
+                texto = npz[nombre].tobytes().decode('utf-8')
+                return texto.split('\n') if texto else []
+
+            corpus.claves = lineas("claves")
+            corpus.formas = lineas("formas")
+            corpus.documentos = [tuple(d.split('\t', 1)) for d in lineas("documentos")]
+            corpus.indptr, corpus.indices, corpus.frecuencias = npz["indptr"], npz["indices"], npz["frecuencias"]
+        corpus.vocabulario = {clave: i for i, clave in enumerate(corpus.claves)}
+        corpus._derivar()
+        return corpus
+
+    @property
+    def filas(self) -> np.ndarray:
+        """Índice de fila (documento) de cada entrada CSR"""
+        return np.repeat(np.arange(len(self.documentos)), np.diff(self.indptr))
+
+    def pesos_tfidf(self, frecuencias: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """TF sublineal × IDF × bonificación por longitud de la frase"""
+        return (1 + np.log(frecuencias)) * self.idf[indices] * self.peso_longitud[indices]
+
+    def _agregar_por_libro(self) -> Dict[str, Any]:
+        """
+        Entradas (libro, término) de todas las filas CSR de una vez: frecuencia
+        total y número de capítulos del libro en que aparece cada término.
+        """
+        libros = list(dict.fromkeys(libro for libro, _ in self.documentos))
+        posicion = {libro: i for i, libro in enumerate(libros)}
+        libro_fila = np.array([posicion[libro] for libro, _ in self.documentos], dtype=np.int64)
+
+        claves_entrada = libro_fila[self.filas] * len(self.claves) + self.indices
+        unicas, inversa = np.unique(claves_entrada, return_inverse=True)
+        return {
+            "libros": libros,
+            "capitulos_libro": np.bincount(libro_fila, minlength=len(libros)),
+            "filas": unicas // len(self.claves),
+            "indices": (unicas % len(self.claves)).astype(np.int32),
+            "frecuencias": np.bincount(inversa, weights=self.frecuencias).astype(np.float32),
+            "capitulos": np.bincount(inversa),
+            "inversa": inversa,
+        }
+
+    def _plantilla(self, agregado: Dict[str, Any]) -> np.ndarray:
+        """Máscara por entrada (libro, término): frase repetida en casi todo el libro"""
+        capitulos_libro = agregado["capitulos_libro"][agregado["filas"]]
+        return ((capitulos_libro >= CAPITULOS_PLANTILLA)
+                & (agregado["capitulos"] >= FRACCION_PLANTILLA * capitulos_libro))
+
+    def _seleccionar(self, indices: np.ndarray, frecuencias: np.ndarray, pesos: np.ndarray,
+                     k: int) -> List[Tuple[str, float]]:
+        """
+        Top-k de una fila sin frases redundantes. Las frases de varias palabras
+        necesitan FRECUENCIA_MINIMA; las palabras sueltas de frecuencia 1 solo
+        entran si no hay suficientes candidatas mejores.
+        """
+        frecuentes = frecuencias >= FRECUENCIA_MINIMA
+        validas = frecuentes | (self.longitudes[indices] == 1)
+        orden = np.lexsort((-pesos, ~frecuentes))
+        elegidas: List[Tuple[str, float]] = []
+        claves_elegidas: List[str] = []
+        for j in orden:
+            if not validas[j]:
+                continue
+            clave = self.claves[indices[j]]
+            if any(contiene_frase(otra, clave) or contiene_frase(clave, otra) for otra in claves_elegidas):
+                continue
+            claves_elegidas.append(clave)
+            elegidas.append((self.formas[indices[j]], round(float(pesos[j]), 3)))
+            if len(elegidas) == k:
+                break
+        return elegidas
+
+    def conceptos_por_capitulo(self, k: int = 8) -> Dict[str, Dict[str, List[Tuple[str, float]]]]:
+        """{libro: {cap_id: [(concepto, peso)]}} con los k conceptos más distintivos"""
+        pesos = self.pesos_tfidf(self.frecuencias, self.indices)
+        pesos[self._plantilla(agregado := self._agregar_por_libro())[agregado["inversa"]]] = 0
+        resultado: Dict[str, Dict[str, List[Tuple[str, float]]]] = {}
+        for fila, (libro, cap_id) in enumerate(self.documentos):
+            inicio, fin = self.indptr[fila], self.indptr[fila + 1]
+            con_peso = pesos[inicio:fin] > 0
+            resultado.setdefault(libro, {})[cap_id] = self._seleccionar(
+                self.indices[inicio:fin][con_peso], self.frecuencias[inicio:fin][con_peso],
+                pesos[inicio:fin][con_peso], k)
+        return resultado
+
+    def conceptos_por_libro(self, k: int = 8) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Conceptos distintivos de cada libro: sus capítulos agregados en una
+        fila, con el IDF calculado sobre libros en vez de capítulos. El TF es
+        el número de capítulos del libro que usan la frase (al menos dos), así
+        que pesa más un concepto que recorre el libro que uno repetido en un
+        solo capítulo.
+        """
+        agregado = self._agregar_por_libro()
+        libros, filas, indices = agregado["libros"], agregado["filas"], agregado["indices"]
+        capitulos = agregado["capitulos"].astype(np.float32)
+
+        libros_con_termino = np.bincount(indices, minlength=len(self.claves))
+        idf = (np.log((1 + len(libros)) / (1 + libros_con_termino)) + 1).astype(np.float32)
+        pesos = (1 + np.log(capitulos)) * idf[indices] * self.peso_longitud[indices]
+        validas = ~self._plantilla(agregado) & (capitulos >= 2)
+
+        limites = np.searchsorted(filas, np.arange(len(libros) + 1))
+        resultado = {}
+        for i, libro in enumerate(libros):
+            tramo = slice(limites[i], limites[i + 1])
+            mascara = validas[tramo]
+            resultado[libro] = self._seleccionar(indices[tramo][mascara], capitulos[tramo][mascara],
+                                                 pesos[tramo][mascara], k)
+        return resultado
+
+
+def texto_capitulo(capitulo) -> str:
+    """Título, epígrafe y contenido de un capítulo"""
+    epigrafe = capitulo.get('epigraph') or {}
+    partes = [capitulo.title, epigrafe.get('text', '') if isinstance(epigrafe, dict) else '', capitulo.content]
+    return '\n'.join(p for p in partes if p)
+
+
+def construir_corpus(base_path: Path = BASE_PATH, libros: Optional[List[str]] = None) -> CorpusConceptos:
+    """Corpus de todos los capítulos de lectura de la biblioteca (o de 'libros')"""
+    documentos = [
+        (libro.id, capitulo.id, texto_capitulo(capitulo))
+        for libro in iterar_libros(base_path)
+        if libros is None or libro.id in libros
+        for capitulo in libro.capitulos_lectura()
+    ]
+    return CorpusConceptos(documentos)
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Conceptos distintivos por capítulo (TF-IDF de n-gramas)")
+    parser.add_argument("--libro", help="Mostrar los conceptos de cada capítulo de este libro")
+    parser.add_argument("--k", type=int, default=8, help="Conceptos por capítulo")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    corpus = construir_corpus()
+    por_capitulo = corpus.conceptos_por_capitulo(args.k)
+    por_libro = corpus.conceptos_por_libro(args.k)
+    duracion = time.perf_counter() - inicio
+
+    if args.libro:
+        for cap_id, conceptos in por_capitulo.get(args.libro, {}).items():
+            print(f"{cap_id:20} " + ", ".join(c for c, _ in conceptos))
+    else:
+        for libro, conceptos in por_libro.items():
+            print(f"{libro:25} " + ", ".join(c for c, _ in conceptos))
+
+    print(f"\n{len(corpus.documentos)} capítulos, {len(corpus.claves)} n-gramas en {duracion:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
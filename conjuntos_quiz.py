@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Conjuntos de Preguntas Precalculados
+
+Etapa de build que prepara, para cada libro y capítulo, conjuntos
+equilibrados de preguntas que la app puede servir sin filtrar el quiz
+completo en el dispositivo (el selector de dificultad y tema del quiz):
+
+- Por nivel de dificultad (principiante / iniciado / experto): primero las
+  preguntas de ese nivel y, si no llegan, las de los niveles vecinos.
+- Por tag: las preguntas con ese tag, alternando niveles de dificultad.
+
+Además genera una bolsa de "repaso" entre libros: preguntas de todos los
+libros alternando libro y nivel, sin duplicados (se descartan las repetidas
+que encuentra detectar_duplicados_quiz.py).
+
+El nivel de cada pregunta es su etiqueta 'difficulty' normalizada; si no la
+tiene, el que calcula estimar_dificultad.py. Todo el barajado usa semillas
+derivadas de libro/capítulo/conjunto, así que la salida es la misma en cada
+ejecución y los archivos solo se reescriben cuando cambian las preguntas.
+
+Los conjuntos de cada capítulo (índices en sus 'questions') viajan dentro
+de su segmento de quizzes.bundle: empaquetar_quizzes.py los pide a
+conjuntos_biblioteca(), así que elegir un conjunto no cuesta ninguna
+descarga más. Este script escribe la bolsa de repaso (no versionada, como
+quizzes.bundle), que la app descarga al abrir el modo repaso:
+    www/books/quiz-review.json   preguntas completas, con bookId y chapterId
+
+Uso:
+    python3 conjuntos_quiz.py
+"""
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional, Set, Tuple
+
+from biblioteca_quizzes import BASE_PATH, cargar_json, escribir_si_cambia, iterar_capitulos
+from buscar_marcadores import contiene_marcador
+from detectar_duplicados_quiz import detectar_duplicados
+from distractores import generador_aleatorio
+from empaquetar_quizzes import VARIANTES, TablaCadenas, capitulos_app, compactar, limpiar_pregunta
+from estimar_dificultad import NIVELES, estimar_biblioteca, normalizar_nivel
+
+REPASO_PATH = BASE_PATH / "quiz-review.json"
+VERSION_CONJUNTOS = 1
+
+TAMANO_CONJUNTO = 5
+TAMANO_REPASO = 60
+
+# Orden de relleno de cada nivel cuando el capítulo no tiene bastantes preguntas
+VECINOS = {
+    "principiante": ("principiante", "iniciado", "experto"),
+    "iniciado": ("iniciado", "principiante", "experto"),
+    "experto": ("experto", "iniciado", "principiante"),
+}
+
+# (libro, archivo, capítulo, índice de pregunta)
+Referencia = Tuple[str, str, str, int]
+
+
+def evaluable(pregunta: Dict[str, Any]) -> bool:
+    """
+    Igual que interactive-quiz.js: las de reflexión o sin opciones no se
+    puntúan. Tampoco se sirven las que aún tienen marcadores de plantilla.
+    """
+    opciones = pregunta.get("options")
+    return (pregunta.get("type") != "reflection" and isinstance(opciones, list) and len(opciones) > 0
+            and not contiene_marcador(pregunta))
+
+
+def barajar(elementos: List, clave: str) -> List:
+    """Copia barajada con semilla derivada de 'clave'"""
+    return [elementos[i] for i in generador_aleatorio(clave).permutation(len(elementos))]
+
+
+def intercalar(grupos: List[List]) -> List:
+    """Toma un elemento de cada grupo por turnos hasta agotarlos"""
+    resultado = []
+    for ronda in range(max((len(g) for g in grupos), default=0)):
+        resultado.extend(g[ronda] for g in grupos if ronda < len(g))
+    return resultado
+
+
+def niveles_biblioteca(base_path: Path = BASE_PATH) -> Dict[Referencia, str]:
+    """Nivel de cada pregunta: su etiqueta normalizada o, si no tiene, la estimada"""
+    archivos, _ = estimar_biblioteca(base_path)
+    niveles = {}
+    for quiz_path, estimado in archivos.items():
+        libro_id = quiz_path.parent.parent.name
+        original = cargar_json(quiz_path)
+        for (cap_id, cap_original), (_, cap_estimado) in zip(iterar_capitulos(original),
+                                                             iterar_capitulos(estimado)):
+            pares = zip(cap_original.get("questions") or [], cap_estimado.get("questions") or [])
+            for idx, (pregunta, estimada) in enumerate(pares):
+                nivel = normalizar_nivel(pregunta.get("difficulty")) or normalizar_nivel(estimada.get("difficulty"))
+                if nivel:
+                    niveles.setdefault((libro_id, quiz_path.name, cap_id, idx), nivel)
+    return niveles
+
+
+def referencias_repetidas(base_path: Path = BASE_PATH) -> Set[Referencia]:
+    """
+    Preguntas que repiten otra del mismo tipo de archivo (adultos o niños).
+
+    De cada grupo de duplicados se conserva la primera de cada archivo: la
+    versión infantil de una pregunta de adultos no cuenta como repetida.
+    """
+    repetidas = set()
+    for cluster in detectar_duplicados(base_path)['clusters']:
+        vistos = set()
+        for r in [cluster['conservar']] + cluster['repetidas']:
+            if r['archivo'] in vistos:
+                repetidas.add((r['libro'], r['archivo'], r['capitulo'], r['indice']))
+            vistos.add(r['archivo'])
+    return repetidas
+
+
+def por_nivel(indices: List[int], nivel_de) -> Dict[Optional[str], List[int]]:
+    """Agrupa índices de pregunta por nivel (None = sin nivel)"""
+    grupos: Dict[Optional[str], List[int]] = {}
+    for idx in indices:
+        grupos.setdefault(nivel_de(idx), []).append(idx)
+    return grupos
+
+
+def equilibrado(indices: List[int], nivel_de, clave: str, tamano: int = TAMANO_CONJUNTO) -> List[int]:
+    """Hasta 'tamano' preguntas alternando niveles de dificultad"""
+    grupos = por_nivel(indices, nivel_de)
+    orden = [n for n in NIVELES if n in grupos] + ([None] if None in grupos else [])
+    elegidas = intercalar([barajar(grupos[n], f"{clave}/{n}") for n in orden])[:tamano]
+    return barajar(elegidas, clave)
+
+
+def conjuntos_capitulo(preguntas: List[Dict[str, Any]], nivel_de, clave: str) -> Dict[str, Any]:
+    """Conjuntos por dificultad y por tag de un capítulo (índices en 'questions')"""
+    indices = [i for i, p in enumerate(preguntas) if evaluable(p)]
+    grupos = por_nivel(indices, nivel_de)
+
+    dificultad = {}
+    for nivel in NIVELES:
+        if not grupos.get(nivel):
+            continue
+        elegidas = []
+        for vecino in VECINOS[nivel]:
+            elegidas.extend(barajar(grupos.get(vecino, []), f"{clave}/{nivel}/{vecino}"))
+        dificultad[nivel] = elegidas[:TAMANO_CONJUNTO]
+
+    con_tag: Dict[str, List[int]] = {}
+    for idx in indices:
+        for tag in preguntas[idx].get("tags") or []:
+            if isinstance(tag, str) and idx not in con_tag.setdefault(tag, []):
+                con_tag[tag].append(idx)
+
+    return {
+        "difficulty": dificultad,
+        "tags": {tag: equilibrado(lista, nivel_de, f"{clave}/tag/{tag}")
+                 for tag, lista in sorted(con_tag.items())}
+    }
+
+
+def capitulos_con_nivel(base_path: Path, niveles: Dict[Referencia, str]) -> Iterator[Tuple]:
+    """
+    (libro, variante, archivo, cap_id, preguntas, nivel_de) de cada capítulo
+    que sirve la app: los mismos que quizzes.bundle.
+    """
+    for libro_dir in sorted(p for p in base_path.iterdir() if p.is_dir()):
+        for variante, nombre in VARIANTES.items():
+            quiz_path = libro_dir / "assets" / nombre
+            if not quiz_path.exists():
+                continue
+            for cap_id, capitulo in capitulos_app(cargar_json(quiz_path)):
+                def nivel_de(idx, libro_id=libro_dir.name, nombre=nombre, cap_id=cap_id):
+                    return niveles.get((libro_id, nombre, cap_id, idx))
+
+                yield libro_dir.name, variante, nombre, cap_id, capitulo["questions"], nivel_de
+
+
+def conjuntos_biblioteca(base_path: Path = BASE_PATH) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """{libro: {variante: {cap_id: conjuntos_capitulo()}}} de toda la biblioteca"""
+    conjuntos: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for libro_id, variante, _, cap_id, preguntas, nivel_de in capitulos_con_nivel(base_path,
+                                                                                 niveles_biblioteca(base_path)):
+        conjuntos.setdefault(libro_id, {}).setdefault(variante, {})[cap_id] = conjuntos_capitulo(
+            preguntas, nivel_de, f"{libro_id}/{variante}/{cap_id}")
+    return conjuntos
+
+
+def generar_repaso(base_path: Path = BASE_PATH) -> Dict[str, Any]:
+    """
+    Escribe la bolsa de repaso (solo si cambia).
+
+    Devuelve por variante el tamaño de la bolsa y si el archivo se ha escrito.
+    """
+    repetidas = referencias_repetidas(base_path)
+    # variante -> libro -> nivel -> [(referencia, pregunta)]
+    candidatas: Dict[str, Dict[str, Dict[Optional[str], List]]] = {v: {} for v in VARIANTES}
+
+    for libro_id, variante, nombre, cap_id, preguntas, nivel_de in capitulos_con_nivel(
+            base_path, niveles_biblioteca(base_path)):
+        for idx, pregunta in enumerate(preguntas):
+            referencia = (libro_id, nombre, cap_id, idx)
+            if evaluable(pregunta) and referencia not in repetidas:
+                candidatas[variante].setdefault(libro_id, {}).setdefault(
+                    nivel_de(idx), []).append((referencia, pregunta))
+
+    tabla = TablaCadenas()
+    bolsas = {}
+    for variante, por_libro in candidatas.items():
+        por_libro_intercaladas = []
+        for libro_id, grupos in sorted(por_libro.items()):
+            orden = [n for n in NIVELES if n in grupos] + ([None] if None in grupos else [])
+            por_libro_intercaladas.append(intercalar(
+                [barajar(grupos[n], f"repaso/{variante}/{libro_id}/{n}") for n in orden]))
+        elegidas = barajar(intercalar(por_libro_intercaladas)[:TAMANO_REPASO], f"repaso/{variante}")
+        bolsas[variante] = [
+            {"bookId": referencia[0], "chapterId": referencia[2], **limpiar_pregunta(pregunta, tabla)}
+            for referencia, pregunta in elegidas
+        ]
+
+    return {
+        "repaso": {variante: len(bolsa) for variante, bolsa in bolsas.items()},
+        "escrito": escribir_si_cambia(
+            base_path / REPASO_PATH.name,
+            compactar({"version": VERSION_CONJUNTOS, "strings": tabla.cadenas, "pools": bolsas}))
+    }
+
+
+def main():
+    """Función principal"""
+    resumen = generar_repaso()
+
+    print("✓ Bolsa de repaso: " + ", ".join(f"{v}: {n}" for v, n in resumen['repaso'].items()))
+    print(f"{'✓ Escrita' if resumen['escrito'] else '= Sin cambios'}: {REPASO_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Acceso compartido al corpus de libros (book.json)
+
+Todos los scripts (generadores de quizzes, herramientas de análisis y
+scripts/resource-finder.py) cargan los libros a través de este módulo:
+
+- Carga memoizada para todo el proceso, con clave ruta + mtime: cada
+  book.json se parsea una sola vez por ejecución, aunque varios pasos del
+  pipeline lo pidan, y se vuelve a leer si cambia en disco.
+- Capítulos perezosos: la lista de capítulos y el índice por id solo se
+  construyen la primera vez que se piden, sin copiar el contenido.
+- Índice de capítulos por id con acceso O(1).
+"""
+
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from biblioteca_quizzes import BASE_PATH, cargar_json
+
+# Valores por defecto de los campos que leen los generadores
+CAMPOS_POR_DEFECTO = {
+    "id": "",
+    "title": "",
+    "content": "",
+    "epigraph": {},
+    "closingQuestion": "",
+}
+
+_cache: Dict[Path, Tuple[Tuple[int, int], "Libro"]] = {}
+_estadisticas = {"parseos": 0, "aciertos": 0}
+
+
+class Capitulo:
+    """
+    Vista de un capítulo de book.json que se comporta como un dict.
+
+    Lee directamente del dict original (sin copiar el contenido) y aplica los
+    valores por defecto de CAMPOS_POR_DEFECTO. Los campos que añaden los
+    scripts (p. ej. 'citas') se guardan aparte y no tocan el libro.
+    """
+
+    __slots__ = ("datos", "seccion", "_extra")
+
+    def __init__(self, datos: Dict[str, Any], seccion: str = ""):
+        self.datos = datos
+        self.seccion = seccion
+        self._extra: Dict[str, Any] = {}
+
+    @property
+    def id(self) -> str:
+        return self["id"]
+
+    @property
+    def title(self) -> str:
+        return self["title"]
+
+    @property
+    def content(self) -> str:
+        return self["content"]
+
+    def __getitem__(self, campo: str) -> Any:
+        if campo in self._extra:
+            return self._extra[campo]
+        if campo in self.datos:
+            return self.datos[campo]
+        if campo in CAMPOS_POR_DEFECTO:
+            return CAMPOS_POR_DEFECTO[campo]
+        raise KeyError(campo)
+
+    def __setitem__(self, campo: str, valor: Any):
+        self._extra[campo] = valor
+
+    def __contains__(self, campo: str) -> bool:
+        return campo in self._extra or campo in self.datos
+
+    def get(self, campo: str, defecto: Any = None) -> Any:
+        try:
+            return self[campo]
+        except KeyError:
+            return defecto
+
+    def __repr__(self) -> str:
+        return f"Capitulo({self.id!r}, {self.title!r})"
+
+
+class Libro:
+    """Un book.json cargado, con capítulos e índice construidos bajo demanda"""
+
+    def __init__(self, ruta: Path, datos: Dict[str, Any]):
+        self.ruta = ruta
+        self.id = ruta.parent.name
+        self.datos = datos
+        self._capitulos: Optional[List[Capitulo]] = None
+        self._indice: Optional[Dict[str, Capitulo]] = None
+
+    def get(self, campo: str, defecto: Any = None) -> Any:
+        return self.datos.get(campo, defecto)
+
+    @property
+    def capitulos(self) -> List[Capitulo]:
+        """Capítulos de sections[].chapters[] en orden de lectura"""
+        if self._capitulos is None:
+            self._capitulos = [
+                Capitulo(capitulo, seccion.get("title", ""))
+                for seccion in self.datos.get("sections", [])
+                for capitulo in seccion.get("chapters", [])
+            ]
+        return self._capitulos
+
+    def _capitulo_extra(self, clave: str, titulo: str) -> Optional[Capitulo]:
+        """Prólogo o epílogo como capítulo, si tiene contenido"""
+        extra = self.datos.get(clave)
+        if isinstance(extra, dict) and "content" in extra:
+            datos = dict(extra)
+            datos.setdefault("id", clave)
+            datos.setdefault("title", titulo)
+            return Capitulo(datos)
+        return None
+
+    def capitulos_con_prologo(self) -> List[Capitulo]:
+        """Como 'capitulos', precedidos del prólogo si tiene contenido"""
+        prologo = self._capitulo_extra("prologo", "Prólogo")
+        return [prologo] + self.capitulos if prologo else self.capitulos
+
+    def capitulos_lectura(self) -> List[Capitulo]:
+        """Todos los capítulos en orden de lectura: prólogo, secciones y epílogo"""
+        epilogo = self._capitulo_extra("epilogo", "Epílogo")
+        return self.capitulos_con_prologo() + ([epilogo] if epilogo else [])
+
+    def capitulo(self, cap_id: str) -> Optional[Capitulo]:
+        """Capítulo por id en O(1)"""
+        if self._indice is None:
+            self._indice = {c.id: c for c in self.capitulos}
+        return self._indice.get(cap_id)
+
+
+def cargar_libro(ruta: Path) -> Optional[Libro]:
+    """
+    Carga un book.json una sola vez por proceso.
+
+    La clave de la caché es la ruta resuelta; si mtime o tamaño cambian, el
+    archivo se vuelve a parsear. Devuelve None si el archivo no existe.
+    """
+    ruta = Path(ruta).resolve()
+    try:
+        stat = ruta.stat()
+    except FileNotFoundError:
+        return None
+
+    firma = (stat.st_mtime_ns, stat.st_size)
+    en_cache = _cache.get(ruta)
+    if en_cache and en_cache[0] == firma:
+        _estadisticas["aciertos"] += 1
+        return en_cache[1]
+
+    libro = Libro(ruta, cargar_json(ruta))
+    _cache[ruta] = (firma, libro)
+    _estadisticas["parseos"] += 1
+    return libro
+
+
+def cargar_libro_id(libro_id: str, base_path: Path = BASE_PATH) -> Optional[Libro]:
+    """Carga www/books/<libro_id>/book.json"""
+    return cargar_libro(base_path / libro_id / "book.json")
+
+
+def iterar_libros(base_path: Path = BASE_PATH) -> Iterator[Libro]:
+    """Recorre todos los libros de la biblioteca en orden alfabético de id"""
+    for ruta in sorted(base_path.glob("*/book.json")):
+        libro = cargar_libro(ruta)
+        if libro is not None:
+            yield libro
+
+
+def estadisticas() -> Dict[str, int]:
+    """Parseos reales y aciertos de caché en este proceso"""
+    return dict(_estadisticas, libros=len(_cache))
+
+
+def vaciar_cache():
+    """Olvida todos los libros cargados"""
+    _cache.clear()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Detector de Preguntas Duplicadas y Casi Duplicadas
+
+Los generadores de plantillas repiten enunciados genéricos ("¿Cuál es el
+concepto central desarrollado en…") en muchos capítulos y libros. Este script
+recorre todos los archivos de quiz de la biblioteca y agrupa las preguntas
+idénticas o casi idénticas:
+
+- Duplicados exactos: hash del enunciado normalizado + conjunto de opciones.
+- Casi duplicados: firmas MinHash sobre shingles de palabras, agrupadas con
+  LSH por bandas, de modo que solo se comparan pares candidatos (coste
+  subcuadrático) antes de confirmar la similitud estimada.
+
+El reporte indica, para cada grupo, qué pregunta conservar y cuáles repiten,
+para que el quiz interactivo no sirva la misma pregunta dos veces.
+"""
+
+import argparse
+import hashlib
+import json
+import zlib
+from pathlib import Path
+from typing import Dict, List, Any
+
+import numpy as np
+
+from biblioteca_quizzes import BASE_PATH, iterar_preguntas
+from texto_es import normalizar
+
+REPORTE_PATH = BASE_PATH.parent.parent / "REPORTE-DUPLICADOS-QUIZ.json"
+
+# 128 permutaciones en 16 bandas de 8 filas: umbral LSH ≈ (1/16)^(1/8) ≈ 0.71
+NUM_PERMUTACIONES = 128
+NUM_BANDAS = 16
+UMBRAL_SIMILITUD = 0.7
+TAMANO_SHINGLE = 3
+
+# Primo de Mersenne 2^31 - 1: a*x + b cabe en uint64 sin desbordar
+PRIMO = np.uint64((1 << 31) - 1)
+SEMILLA = 20251212
+
+
+def hash_exacto(pregunta: Dict[str, Any]) -> str:
+    """Hash del enunciado normalizado y del conjunto (sin orden) de opciones"""
+    enunciado = normalizar(pregunta.get('question', ''))
+    opciones = sorted(normalizar(str(o)) for o in pregunta.get('options') or [])
+    clave = enunciado + '\x1e' + '\x1f'.join(opciones)
+    return hashlib.blake2b(clave.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def shingles_pregunta(pregunta: Dict[str, Any]) -> List[int]:
+    """Shingles de palabras del enunciado más una entrada por opción, como hashes de 32 bits"""
+    palabras = normalizar(pregunta.get('question', '')).split()
+    if len(palabras) >= TAMANO_SHINGLE:
+        shingles = {' '.join(palabras[i:i + TAMANO_SHINGLE])
+                    for i in range(len(palabras) - TAMANO_SHINGLE + 1)}
+    else:
+        shingles = {' '.join(palabras)} if palabras else set()
+
+    for opcion in pregunta.get('options') or []:
+        opcion_norm = normalizar(str(opcion))
+        if opcion_norm:
+            shingles.add('opt:' + opcion_norm)
+
+    return [zlib.crc32(s.encode('utf-8')) for s in shingles]
+
+
+def calcular_firmas(shingles_por_pregunta: List[List[int]]) -> np.ndarray:
+    """
+    Firmas MinHash (n_preguntas × NUM_PERMUTACIONES) en una sola pasada.
+
+    Todos los shingles se concatenan y el mínimo por pregunta se obtiene con
+    np.minimum.reduceat sobre los segmentos contiguos, así que ninguna lista
+    puede estar vacía (reduceat tomaría la firma de la siguiente pregunta).
+    """
+    if not all(shingles_por_pregunta):
+        raise ValueError("calcular_firmas: hay preguntas sin shingles")
+
+    rng = np.random.default_rng(SEMILLA)
+    a = rng.integers(1, int(PRIMO), size=NUM_PERMUTACIONES, dtype=np.uint64)
+    b = rng.integers(0, int(PRIMO), size=NUM_PERMUTACIONES, dtype=np.uint64)
+
+    longitudes = np.array([len(s) for s in shingles_por_pregunta], dtype=np.int64)
+    inicios = np.concatenate(([0], np.cumsum(longitudes)[:-1]))
+    valores = np.fromiter((h for s in shingles_por_pregunta for h in s),
+                          dtype=np.uint64, count=int(longitudes.sum()))
+    valores %= PRIMO
+
+    hashes = (valores[:, None] * a[None, :] + b[None, :]) % PRIMO
+    return np.minimum.reduceat(hashes, inicios, axis=0)
+
+
+class UnionFind:
+    """Conjuntos disjuntos con compresión de caminos"""
+
+    def __init__(self, n: int):
+        self.padre = list(range(n))
+
+    def buscar(self, x: int) -> int:
+        while self.padre[x] != x:
+            self.padre[x] = self.padre[self.padre[x]]
+            x = self.padre[x]
+        return x
+
+    def unir(self, x: int, y: int):
+        rx, ry = self.buscar(x), self.buscar(y)
+        if rx != ry:
+            self.padre[max(rx, ry)] = min(rx, ry)
+
+
+def agrupar_candidatos(firmas: np.ndarray, grupos: UnionFind, umbral: float,
+                       indices: np.ndarray) -> int:
+    """
+    LSH por bandas: las preguntas que coinciden en una banda completa caen en
+    el mismo cubo. Cada miembro se confirma contra el primero del cubo con la
+    similitud estimada por la firma completa, así que el coste es lineal en el
+    tamaño del cubo. La fila i de 'firmas' es la pregunta indices[i] de 'grupos'.
+    """
+    filas = NUM_PERMUTACIONES // NUM_BANDAS
+    uniones = 0
+
+    for banda in range(NUM_BANDAS):
+        segmento = np.ascontiguousarray(firmas[:, banda * filas:(banda + 1) * filas])
+        _, cubo, tamanos = np.unique(segmento, axis=0, return_inverse=True, return_counts=True)
+        cubo = cubo.ravel()
+
+        orden = np.argsort(cubo, kind='stable')
+        limites = np.cumsum(tamanos)[:-1]
+        for miembros in np.split(orden, limites):
+            if len(miembros) < 2:
+                continue
+            similitud = (firmas[miembros[1:]] == firmas[miembros[0]]).mean(axis=1)
+            primero = int(indices[miembros[0]])
+            for otro in indices[miembros[1:][similitud >= umbral]]:
+                if grupos.buscar(int(otro)) != grupos.buscar(primero):
+                    grupos.unir(int(otro), primero)
+                    uniones += 1
+
+    return uniones
+
+
+def detectar_duplicados(base_path: Path = BASE_PATH, umbral: float = UMBRAL_SIMILITUD) -> Dict[str, Any]:
+    """Agrupa las preguntas duplicadas de toda la biblioteca"""
+    refs = [r for r in iterar_preguntas(base_path) if r['pregunta'].get('question')]
+    shingles = [shingles_pregunta(r['pregunta']) for r in refs]
+    grupos = UnionFind(len(refs))
+
+    # Duplicados exactos
+    por_hash: Dict[str, int] = {}
+    exactos = set()
+    for i, ref in enumerate(refs):
+        clave = hash_exacto(ref['pregunta'])
+        if clave in por_hash:
+            grupos.unir(i, por_hash[clave])
+            exactos.add(i)
+        else:
+            por_hash[clave] = i
+
+    # Casi duplicados (MinHash + LSH); sin shingles no hay nada que comparar
+    con_shingles = np.array([i for i, s in enumerate(shingles) if s], dtype=np.int64)
+    if len(con_shingles):
+        firmas = calcular_firmas([shingles[i] for i in con_shingles])
+        agrupar_candidatos(firmas, grupos, umbral, con_shingles)
+
+    miembros_por_grupo: Dict[int, List[int]] = {}
+    for i in range(len(refs)):
+        miembros_por_grupo.setdefault(grupos.buscar(i), []).append(i)
+
+    clusters = []
+    for raiz, miembros in miembros_por_grupo.items():
+        if len(miembros) < 2:
+            continue
+        entradas = [{
+            "libro": refs[i]['libro'],
+            "archivo": refs[i]['archivo'],
+            "capitulo": refs[i]['capitulo'],
+            "indice": refs[i]['indice'],
+            "id": refs[i]['pregunta'].get('id', ''),
+            "question": refs[i]['pregunta'].get('question', ''),
+            "exacta": i in exactos
+        } for i in miembros]
+        clusters.append({
+            "tamano": len(entradas),
+            "libros": sorted({e['libro'] for e in entradas}),
+            "conservar": entradas[0],
+            "repetidas": entradas[1:]
+        })
+
+    clusters.sort(key=lambda c: (-c['tamano'], c['conservar']['question']))
+
+    return {
+        "totalPreguntas": len(refs),
+        "umbral": umbral,
+        "totalClusters": len(clusters),
+        "preguntasRepetidas": sum(c['tamano'] - 1 for c in clusters),
+        "clusters": clusters
+    }
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Detecta preguntas de quiz duplicadas en la biblioteca")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_SIMILITUD,
+                        help="Similitud de Jaccard estimada mínima (por defecto 0.7)")
+    parser.add_argument("--salida", type=Path, default=REPORTE_PATH,
+                        help="Ruta del reporte JSON")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("DETECTOR DE PREGUNTAS DUPLICADAS")
+    print("="*60)
+
+    reporte = detectar_duplicados(umbral=args.umbral)
+
+    print(f"Preguntas analizadas: {reporte['totalPreguntas']}")
+    print(f"Grupos de duplicados: {reporte['totalClusters']}")
+    print(f"Preguntas repetidas:  {reporte['preguntasRepetidas']}")
+
+    for cluster in reporte['clusters'][:10]:
+        print(f"\n  [{cluster['tamano']}x en {len(cluster['libros'])} libros] "
+              f"{cluster['conservar']['question'][:70]}")
+
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2)
+
+    print(f"\n✓ Reporte guardado en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Generador de Distractores por Similitud
+
+Dada la respuesta correcta de una pregunta (una oración de un capítulo),
+elige opciones incorrectas plausibles entre oraciones de OTROS capítulos y
+libros: las más cercanas por coseno TF-IDF, pero sin llegar a ser paráfrasis
+de la correcta ("cerca, pero no demasiado").
+
+El índice de candidatas (las oraciones mejor puntuadas por TextRank de cada
+capítulo de la biblioteca) se calcula una vez; las respuestas se procesan en
+bloque, así que generar distractores para toda la biblioteca cuesta unas pocas
+multiplicaciones de matrices en lugar de recorrer el índice por pregunta.
+
+También baraja las opciones de forma determinista (semilla derivada del id
+de la pregunta), para que la correcta deje de estar siempre en la posición 1.
+"""
+
+import argparse
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+
+from biblioteca_quizzes import BASE_PATH, escribir_json_si_cambia
+from corpus_libros import iterar_libros
+from textrank_citas import calcular_idf, citas_por_capitulo, matriz_frecuencias, vectores_tfidf
+
+REPORTE_PATH = BASE_PATH.parent.parent / "REPORTE-DISTRACTORES-QUIZ.json"
+
+CANDIDATAS_POR_CAPITULO = 12
+NUM_DISTRACTORES = 3
+
+# Banda de similitud aceptable con la respuesta correcta
+SIMILITUD_MIN = 0.03
+SIMILITUD_MAX = 0.55
+# Penalización por diferencia de longitud (las opciones deben parecerse en tamaño)
+PESO_LONGITUD = 0.05
+# Preselección por pregunta antes del filtrado voraz de distractores parecidos entre sí
+PRESELECCION = 24
+
+
+class IndiceDistractores:
+    """Matriz de vectores TF-IDF de las oraciones candidatas de la biblioteca"""
+
+    def __init__(self, candidatas: List[Dict[str, str]]):
+        self.candidatas = candidatas
+        self.idf = calcular_idf(matriz_frecuencias([c['texto'] for c in candidatas]))
+        self.vectores = vectores_tfidf([c['texto'] for c in candidatas], self.idf)
+        self.longitudes = np.log(np.array([max(len(c['texto']), 1) for c in candidatas], dtype=float))
+        self.origen = np.array([f"{c['libro']}/{c['capitulo']}" for c in candidatas])
+
+    @classmethod
+    def desde_biblioteca(cls, base_path: Path = BASE_PATH,
+                         por_capitulo: int = CANDIDATAS_POR_CAPITULO) -> "IndiceDistractores":
+        """Construye el índice con las mejores oraciones de cada capítulo de cada libro"""
+        candidatas = []
+        for libro in iterar_libros(base_path):
+            for cap_id, citas in citas_por_capitulo(libro.capitulos, k=por_capitulo).items():
+                candidatas.extend({"texto": cita, "libro": libro.id, "capitulo": cap_id}
+                                  for cita in citas)
+        return cls(candidatas)
+
+    def generar(self, respuestas: List[Dict[str, str]],
+                n: int = NUM_DISTRACTORES) -> List[List[str]]:
+        """
+        Distractores para un lote de respuestas correctas.
+
+        Cada respuesta es {"texto", "libro", "capitulo"}; las candidatas del
+        mismo capítulo nunca se usan como distractor.
+        """
+        if not respuestas:
+            return []
+
+        consultas = vectores_tfidf([r['texto'] for r in respuestas], self.idf)
+        similitud = consultas @ self.vectores.T
+
+        longitudes = np.log(np.array([max(len(r['texto']), 1) for r in respuestas], dtype=float))
+        puntuacion = similitud - PESO_LONGITUD * np.abs(longitudes[:, None] - self.longitudes[None, :])
+
+        propio = np.array([f"{r['libro']}/{r['capitulo']}" for r in respuestas])
+        fuera_de_banda = (similitud < SIMILITUD_MIN) | (similitud > SIMILITUD_MAX)
+        puntuacion[fuera_de_banda | (propio[:, None] == self.origen[None, :])] = -np.inf
+
+        k = min(PRESELECCION, puntuacion.shape[1])
+        preseleccion = np.argpartition(-puntuacion, k - 1, axis=1)[:, :k]
+        orden = np.take_along_axis(puntuacion, preseleccion, axis=1).argsort(axis=1)[:, ::-1]
+        preseleccion = np.take_along_axis(preseleccion, orden, axis=1)
+
+        resultado = []
+        for fila, candidatos in enumerate(preseleccion):
+            elegidos: List[int] = []
+            for c in candidatos:
+                if not np.isfinite(puntuacion[fila, c]):
+                    break
+                # Evitar dos distractores que digan casi lo mismo
+                if any(self.vectores[c] @ self.vectores[e] > SIMILITUD_MAX for e in elegidos):
+                    continue
+                elegidos.append(int(c))
+                if len(elegidos) == n:
+                    break
+            resultado.append([self.candidatas[c]['texto'] for c in elegidos])
+
+        return resultado
+
+
+def generador_aleatorio(clave: str) -> np.random.Generator:
+    """Generador con semilla derivada de 'clave': mismo resultado en cada ejecución"""
+    semilla = int.from_bytes(hashlib.blake2b(clave.encode('utf-8'), digest_size=8).digest(), 'big')
+    return np.random.default_rng(semilla)
+
+
+def barajar_opciones(opciones: List[str], correcta: int, clave: str) -> Tuple[List[str], int]:
+    """Baraja las opciones con una semilla derivada de 'clave'; devuelve (opciones, índice correcto)"""
+    permutacion = generador_aleatorio(clave).permutation(len(opciones))
+    return [opciones[i] for i in permutacion], int(np.flatnonzero(permutacion == correcta)[0])
+
+
+def main():
+    """Propone una pregunta de reconocimiento de cita por capítulo para toda la biblioteca"""
+    parser = argparse.ArgumentParser(description="Genera distractores para toda la biblioteca")
+    parser.add_argument("--salida", type=Path, default=REPORTE_PATH,
+                        help="Ruta del reporte JSON con las preguntas propuestas")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("GENERADOR DE DISTRACTORES")
+    print("="*60)
+
+    indice = IndiceDistractores.desde_biblioteca()
+    print(f"Oraciones candidatas en el índice: {len(indice.candidatas)}")
+
+    # La primera cita de cada capítulo hace de respuesta correcta
+    respuestas = []
+    vistos = set()
+    for candidata in indice.candidatas:
+        clave = (candidata['libro'], candidata['capitulo'])
+        if clave not in vistos:
+            vistos.add(clave)
+            respuestas.append(candidata)
+
+    propuestas: Dict[str, Dict[str, Any]] = {}
+    for respuesta, distractores in zip(respuestas, indice.generar(respuestas)):
+        if len(distractores) < NUM_DISTRACTORES:
+            continue
+        clave = f"{respuesta['libro']}/{respuesta['capitulo']}/cita"
+        opciones, correcta = barajar_opciones([respuesta['texto']] + distractores, 0, clave)
+        propuestas.setdefault(respuesta['libro'], {})[respuesta['capitulo']] = {
+            "question": "¿Cuál de estas afirmaciones aparece en este capítulo?",
+            "type": "multiple",
+            "options": opciones,
+            "correctAnswer": correcta,
+            "bookQuote": respuesta['texto']
+        }
+
+    escribir_json_si_cambia(args.salida, propuestas)
+
+    total = sum(len(caps) for caps in propuestas.values())
+    print(f"✓ Preguntas propuestas: {total} en {len(propuestas)} libros")
+    print(f"✓ Reporte guardado en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Empaquetador de Quizzes por Libro
+
+Genera www/books/<libro>/assets/quizzes.bundle, un único archivo por libro
+con los quizzes de adultos y de niños listo para interactive-quiz.js:
+
+- Elimina los campos que solo sirven al generar (_notas_generacion,
+  epigraph, contentLength, chapterContext).
+- Normaliza cada capítulo al formato que lee la app (chapterId, title,
+  questions[].correctAnswer).
+- Solo empaqueta los archivos con la lista "quizzes", los únicos que la app
+  sabe leer. Los antiguos {"chapters": {...}} (algunos quizzes-kids.json,
+  aún llenos de preguntas [PENDIENTE]) se quedan fuera, y en esos libros la
+  app sigue cayendo al quiz de adultos.
+- Interna las cadenas repetidas (tags, difficulty, type): en las preguntas
+  se guardan como índices de una tabla común.
+- Incluye una tabla de desplazamientos por capítulo, de modo que la app
+  solo parsea las preguntas del capítulo que abre.
+- Añade a cada capítulo sus conjuntos por dificultad y por tag
+  ("sets", índices en "questions"), que calcula conjuntos_quiz.py y usa el
+  selector del quiz.
+
+Formato del archivo (UTF-8):
+
+    línea 1: cabecera JSON
+        {"version": 1, "bookId": ..., "strings": [...],
+         "chapters": {"normal": {cap_id: [inicio, longitud]}, "kids": {...}}}
+    resto:   un JSON compacto por capítulo, separados por "\\n"
+             {"chapterId", "title", ..., "questions": [...],
+              "sets": {"difficulty": {nivel: [i, ...]}, "tags": {tag: [i, ...]}}}
+
+'inicio' y 'longitud' son bytes contados desde el primer byte tras la
+cabecera. El archivo solo se reescribe si su contenido cambia.
+
+Uso:
+    python3 empaquetar_quizzes.py
+    python3 empaquetar_quizzes.py --libro manifiesto
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+from biblioteca_quizzes import BASE_PATH, cargar_json, escribir_si_cambia, indice_correcto
+
+NOMBRE_BUNDLE = "quizzes.bundle"
+VERSION_BUNDLE = 1
+
+# Variante del bundle -> archivo de quiz de origen
+VARIANTES = {"normal": "quizzes.json", "kids": "quizzes-kids.json"}
+
+CAMPOS_SOLO_CONSTRUCCION = frozenset({"_notas_generacion", "epigraph", "contentLength", "chapterContext"})
+CAMPOS_INTERNADOS = ("difficulty", "type")
+
+
+def compactar(valor: Any) -> bytes:
+    """JSON sin espacios ni escapes de caracteres no ASCII"""
+    return json.dumps(valor, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class TablaCadenas:
+    """Tabla de cadenas internadas, en orden de primera aparición"""
+
+    def __init__(self):
+        self.cadenas: List[str] = []
+        self._indices: Dict[str, int] = {}
+
+    def indice(self, cadena: str) -> int:
+        if cadena not in self._indices:
+            self._indices[cadena] = len(self.cadenas)
+            self.cadenas.append(cadena)
+        return self._indices[cadena]
+
+
+def capitulos_app(quiz_data: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    (cap_id, capítulo) que puede servir la app: como el fallback JSON de
+    interactive-quiz.js, solo la lista 'quizzes', y si un capítulo aparece
+    dos veces vale el primero.
+    """
+    vistos = set()
+    for capitulo in quiz_data.get("quizzes") or []:
+        cap_id = capitulo.get("chapterId", "")
+        if capitulo.get("questions") and cap_id not in vistos:
+            vistos.add(cap_id)
+            yield cap_id, capitulo
+
+
+def limpiar_pregunta(pregunta: Dict[str, Any], tabla: TablaCadenas) -> Dict[str, Any]:
+    """Pregunta sin campos de construcción, con correctAnswer y cadenas internadas"""
+    limpia = {k: v for k, v in pregunta.items()
+              if k not in CAMPOS_SOLO_CONSTRUCCION and k != "correct"}
+
+    correcta = indice_correcto(pregunta)
+    if correcta is not None:
+        limpia["correctAnswer"] = correcta
+
+    for campo in CAMPOS_INTERNADOS:
+        if isinstance(limpia.get(campo), str):
+            limpia[campo] = tabla.indice(limpia[campo])
+    if isinstance(limpia.get("tags"), list):
+        limpia["tags"] = [tabla.indice(t) if isinstance(t, str) else t for t in limpia["tags"]]
+
+    return limpia
+
+
+def limpiar_capitulo(cap_id: str, capitulo: Dict[str, Any], tabla: TablaCadenas) -> Dict[str, Any]:
+    """Capítulo en el formato que lee interactive-quiz.js"""
+    limpio = {"chapterId": cap_id}
+    for campo, valor in capitulo.items():
+        if campo in CAMPOS_SOLO_CONSTRUCCION or campo in ("chapterId", "questions"):
+            continue
+        limpio["title" if campo == "chapterTitle" else campo] = valor
+    limpio["questions"] = [limpiar_pregunta(p, tabla) for p in capitulo.get("questions") or []]
+    return limpio
+
+
+def empaquetar_libro(libro_dir: Path,
+                     conjuntos: Optional[Dict[str, Dict[str, Any]]] = None) -> Optional[bytes]:
+    """
+    Contenido del bundle de un libro, o None si no tiene quizzes.
+
+    'conjuntos' es {variante: {cap_id: sets}} (conjuntos_biblioteca() de
+    conjuntos_quiz.py); sin él los capítulos van sin "sets".
+    """
+    tabla = TablaCadenas()
+    desplazamientos: Dict[str, Dict[str, List[int]]] = {}
+    segmentos: List[bytes] = []
+    posicion = 0
+
+    for variante, nombre in VARIANTES.items():
+        quiz_path = libro_dir / "assets" / nombre
+        if not quiz_path.exists():
+            continue
+
+        tabla_variante = desplazamientos.setdefault(variante, {})
+        conjuntos_variante = (conjuntos or {}).get(variante, {})
+        for cap_id, capitulo in capitulos_app(cargar_json(quiz_path)):
+            limpio = limpiar_capitulo(cap_id, capitulo, tabla)
+            if cap_id in conjuntos_variante:
+                limpio["sets"] = conjuntos_variante[cap_id]
+            segmento = compactar(limpio)
+            tabla_variante[cap_id] = [posicion, len(segmento)]
+            segmentos.append(segmento)
+            posicion += len(segmento) + 1
+
+    if not segmentos:
+        return None
+
+    cabecera = {
+        "version": VERSION_BUNDLE,
+        "bookId": libro_dir.name,
+        "strings": tabla.cadenas,
+        "chapters": desplazamientos
+    }
+    return compactar(cabecera) + b"\n" + b"\n".join(segmentos) + b"\n"
+
+
+def empaquetar_biblioteca(base_path: Path = BASE_PATH,
+                          libros: Optional[List[str]] = None,
+                          conjuntos: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+    """
+    Escribe el bundle de cada libro (solo si cambia).
+
+    Devuelve por libro el tamaño de los JSON de origen, el del bundle y si
+    se ha reescrito.
+    """
+    resultado = []
+    for libro_dir in sorted(base_path.iterdir()):
+        if not libro_dir.is_dir() or (libros and libro_dir.name not in libros):
+            continue
+
+        contenido = empaquetar_libro(libro_dir, (conjuntos or {}).get(libro_dir.name))
+        if contenido is None:
+            continue
+
+        origen = sum((libro_dir / "assets" / nombre).stat().st_size
+                     for nombre in VARIANTES.values()
+                     if (libro_dir / "assets" / nombre).exists())
+        resultado.append({
+            "libro": libro_dir.name,
+            "bytesOrigen": origen,
+            "bytesBundle": len(contenido),
+            "escrito": escribir_si_cambia(libro_dir / "assets" / NOMBRE_BUNDLE, contenido)
+        })
+    return resultado
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Genera un bundle compacto de quizzes por libro")
+    parser.add_argument("--libro", action="append", help="Empaquetar solo este libro (repetible)")
+    args = parser.parse_args()
+
+    # conjuntos_quiz importa este módulo: se carga aquí para no hacer el ciclo
+    from conjuntos_quiz import conjuntos_biblioteca
+    resultado = empaquetar_biblioteca(libros=args.libro, conjuntos=conjuntos_biblioteca())
+
+    for r in resultado:
+        estado = "✓ Escrito" if r["escrito"] else "= Sin cambios"
+        print(f"{estado}: {r['libro']:25} {r['bytesOrigen']:>8} → {r['bytesBundle']:>8} bytes")
+
+    origen = sum(r["bytesOrigen"] for r in resultado)
+    bundle = sum(r["bytesBundle"] for r in resultado)
+    if origen:
+        print(f"\nTotal: {origen} → {bundle} bytes ({100 * bundle / origen:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
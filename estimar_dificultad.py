@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Estimador de Dificultad por Legibilidad
+
+Sustituye los mapas de dificultad escritos a mano (difficulty_map) por una
+estimación calculada para todas las preguntas de la biblioteca a la vez.
+
+Rasgos por pregunta (vectores NumPy de n_preguntas):
+- Legibilidad Fernández-Huerta y Szigriszt-Pazos del enunciado + opciones
+- Longitud media de oración (palabras)
+- Rareza léxica: -log de la frecuencia de cada palabra en el corpus de libros
+- Similitud entre la opción correcta y los distractores (más parecidas = más difícil)
+
+Los rasgos se estandarizan sobre toda la biblioteca y se combinan en una
+puntuación; los terciles de esa puntuación dan el nivel normalizado
+(principiante / iniciado / experto). Los quizzes de niños (*-kids.json)
+son otra audiencia y no se estiman: sus preguntas se medirían contra las de
+adultos y caerían en niveles sin sentido para ellas.
+
+Las etiquetas puestas a mano se conservan (solo se traducen al vocabulario
+normalizado); --sobrescribir las sustituye por la estimación.
+"""
+
+import argparse
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from biblioteca_quizzes import (
+    BASE_PATH, listar_archivos_quiz, libro_de_archivo, cargar_json, iterar_capitulos, indice_correcto
+)
+from corpus_libros import iterar_libros
+from parchear_quizzes import guardar_quizzes
+from texto_es import limpiar_html, tokenizar
+
+NIVELES = ("principiante", "iniciado", "experto")
+
+# Vocabularios usados por otros generadores → nivel normalizado
+EQUIVALENCIAS = {
+    "principiante": "principiante", "básico": "principiante", "basico": "principiante",
+    "facil": "principiante", "fácil": "principiante",
+    "iniciado": "iniciado", "intermedio": "iniciado", "media": "iniciado",
+    "experto": "experto", "avanzado": "experto", "avanzada": "experto",
+}
+
+# Etiquetas de audiencia, no de dificultad: se respetan tal cual
+ETIQUETAS_CONSERVADAS = {"ninos"}
+
+# Peso de cada rasgo estandarizado en la puntuación final
+PESOS = {
+    "legibilidad": 0.30,   # se resta: más legible = más fácil
+    "long_oracion": 0.15,
+    "rareza": 0.35,
+    "similitud_opciones": 0.20,
+}
+
+DIMENSION_HASH = 512
+
+PATRON_ORACION = re.compile(r'[.!?¿¡;:]+')
+PATRON_PALABRA_ES = re.compile(r'[a-záéíóúüñ]+')
+PATRON_NUCLEO = re.compile(r'[aeiouáéíóúü]+')
+FUERTES = set("aeoáéó")
+
+
+@lru_cache(maxsize=None)
+def contar_silabas(palabra: str) -> int:
+    """Aproxima las sílabas de una palabra española contando núcleos vocálicos"""
+    silabas = 0
+    for grupo in PATRON_NUCLEO.findall(palabra):
+        silabas += 1
+        # Hiato: dos vocales fuertes seguidas o vocal débil acentuada
+        for previa, actual in zip(grupo, grupo[1:]):
+            if (previa in FUERTES and actual in FUERTES) or actual in "íú" or previa in "íú":
+                silabas += 1
+    return max(1, silabas)
+
+
+def texto_pregunta(pregunta: Dict[str, Any]) -> str:
+    """Texto que lee quien responde: enunciado y opciones"""
+    partes = [pregunta.get('question', '')]
+    partes.extend(str(o) for o in pregunta.get('options') or [])
+    return limpiar_html('. '.join(partes))
+
+
+def frecuencias_corpus(base_path: Path = BASE_PATH) -> Counter:
+    """Frecuencia de cada palabra en el contenido de todos los libros"""
+    frecuencias = Counter()
+    for libro in iterar_libros(base_path):
+        for extra in (libro.get("prologo"), libro.get("epilogo")):
+            if isinstance(extra, dict):
+                frecuencias.update(tokenizar(extra.get("content", "")))
+        for capitulo in libro.capitulos:
+            frecuencias.update(tokenizar(capitulo.content))
+    return frecuencias
+
+
+def vector_hash(texto: str) -> np.ndarray:
+    """Bolsa de palabras con hashing trick, normalizada a norma 1"""
+    vector = np.zeros(DIMENSION_HASH, dtype=np.float32)
+    for palabra in tokenizar(texto):
+        vector[zlib.crc32(palabra.encode('utf-8')) % DIMENSION_HASH] += 1.0
+    norma = np.linalg.norm(vector)
+    return vector / norma if norma else vector
+
+
+def calcular_rasgos(preguntas: List[Dict[str, Any]], frecuencias: Counter) -> Dict[str, np.ndarray]:
+    """Calcula todos los rasgos de legibilidad como arrays de n_preguntas"""
+    n = len(preguntas)
+    palabras = np.zeros(n)
+    silabas = np.zeros(n)
+    oraciones = np.zeros(n)
+
+    vocabulario = {p: i for i, p in enumerate(frecuencias)}
+    total = sum(frecuencias.values()) or 1
+    # Rareza por palabra del vocabulario; la última posición es "palabra desconocida"
+    rareza_vocab = np.empty(len(vocabulario) + 1)
+    rareza_vocab[:-1] = -np.log(np.fromiter(frecuencias.values(), dtype=float, count=len(vocabulario)) / total)
+    rareza_vocab[-1] = -np.log(0.5 / total)
+
+    ids_tokens: List[int] = []
+    longitudes = np.zeros(n, dtype=np.int64)
+
+    max_opciones = max((len(p.get('options') or []) for p in preguntas), default=0)
+    opciones = np.zeros((n, max(max_opciones, 1), DIMENSION_HASH), dtype=np.float32)
+    correctas = np.zeros(n, dtype=np.int64)
+    n_opciones = np.zeros(n, dtype=np.int64)
+
+    for i, pregunta in enumerate(preguntas):
+        texto = texto_pregunta(pregunta)
+        lista_palabras = PATRON_PALABRA_ES.findall(texto.lower())
+        palabras[i] = len(lista_palabras)
+        silabas[i] = sum(contar_silabas(p) for p in lista_palabras)
+        oraciones[i] = max(1, len([s for s in PATRON_ORACION.split(texto) if s.strip()]))
+
+        tokens = tokenizar(texto)
+        ids_tokens.extend(vocabulario.get(t, len(vocabulario)) for t in tokens)
+        longitudes[i] = len(tokens)
+
+        lista_opciones = pregunta.get('options') or []
+        n_opciones[i] = len(lista_opciones)
+        correctas[i] = indice_correcto(pregunta) or 0
+        for j, opcion in enumerate(lista_opciones):
+            opciones[i, j] = vector_hash(str(opcion))
+
+    palabras = np.maximum(palabras, 1)
+
+    # Fernández-Huerta: 206.84 - 0.60·P - 1.02·F (P sílabas y F frases por cada 100 palabras)
+    fernandez_huerta = 206.84 - 0.60 * (100 * silabas / palabras) - 1.02 * (100 * oraciones / palabras)
+    # Szigriszt-Pazos (perspicuidad): 206.835 - 62.3·S/P - P/F
+    szigriszt = 206.835 - 62.3 * (silabas / palabras) - (palabras / oraciones)
+
+    # Rareza media por pregunta con una sola reducción por segmentos
+    rareza = np.zeros(n)
+    con_tokens = longitudes > 0
+    if ids_tokens:
+        valores = rareza_vocab[np.asarray(ids_tokens)]
+        inicios = np.concatenate(([0], np.cumsum(longitudes)[:-1]))
+        sumas = np.add.reduceat(valores, inicios[con_tokens])
+        rareza[con_tokens] = sumas / longitudes[con_tokens]
+
+    # Coseno entre la opción correcta y cada distractor
+    correctas = np.minimum(correctas, opciones.shape[1] - 1)
+    vector_correcto = opciones[np.arange(n), correctas]
+    cosenos = np.einsum('nod,nd->no', opciones, vector_correcto)
+    validos = np.arange(opciones.shape[1])[None, :] < n_opciones[:, None]
+    validos[np.arange(n), correctas] = False
+    n_distractores = validos.sum(axis=1)
+    similitud_opciones = np.where(n_distractores > 0,
+                                  (cosenos * validos).sum(axis=1) / np.maximum(n_distractores, 1),
+                                  0.0)
+
+    return {
+        "fernandez_huerta": fernandez_huerta,
+        "szigriszt": szigriszt,
+        "legibilidad": (fernandez_huerta + szigriszt) / 2,
+        "long_oracion": palabras / oraciones,
+        "rareza": rareza,
+        "similitud_opciones": similitud_opciones,
+    }
+
+
+def estandarizar(valores: np.ndarray) -> np.ndarray:
+    """Puntuación z (sin división por cero)"""
+    desviacion = valores.std()
+    return (valores - valores.mean()) / desviacion if desviacion else np.zeros_like(valores)
+
+
+def puntuar(rasgos: Dict[str, np.ndarray]) -> np.ndarray:
+    """Combina los rasgos estandarizados en una única puntuación de dificultad"""
+    return (
+        - PESOS["legibilidad"] * estandarizar(rasgos["legibilidad"])
+        + PESOS["long_oracion"] * estandarizar(rasgos["long_oracion"])
+        + PESOS["rareza"] * estandarizar(rasgos["rareza"])
+        + PESOS["similitud_opciones"] * estandarizar(rasgos["similitud_opciones"])
+    )
+
+
+def asignar_niveles(puntuaciones: np.ndarray) -> List[str]:
+    """Reparte las puntuaciones en terciles de toda la biblioteca"""
+    if len(puntuaciones) == 0:
+        return []
+    cortes = np.quantile(puntuaciones, [1 / 3, 2 / 3])
+    return [NIVELES[i] for i in np.searchsorted(cortes, puntuaciones, side='right')]
+
+
+def es_quiz_ninos(quiz_path: Path) -> bool:
+    """quizzes-kids.json: audiencia infantil, fuera de la estimación"""
+    return quiz_path.name.endswith("-kids.json")
+
+
+def normalizar_nivel(etiqueta: Optional[str]) -> Optional[str]:
+    """Traduce cualquier vocabulario de dificultad al normalizado"""
+    if etiqueta is None:
+        return None
+    return EQUIVALENCIAS.get(etiqueta.strip().lower())
+
+
+def estimar_biblioteca(base_path: Path = BASE_PATH, libros: Optional[List[str]] = None,
+                       sobrescribir: bool = False) -> Tuple[Dict[Path, Dict[str, Any]], Dict[str, int]]:
+    """
+    Estima la dificultad de las preguntas de adultos de la biblioteca (o solo
+    de 'libros') en una pasada.
+
+    Devuelve los datos de quiz de cada archivo con 'difficulty' ya asignado
+    (no escribe nada en disco) y un resumen de coincidencias con las
+    etiquetas que ya tenían las preguntas. Las etiquetas previas se
+    conservan, normalizadas, salvo con 'sobrescribir'.
+    """
+    archivos = {
+        quiz_path: cargar_json(quiz_path) for quiz_path in listar_archivos_quiz(base_path)
+        if not es_quiz_ninos(quiz_path) and (libros is None or libro_de_archivo(quiz_path) in libros)
+    }
+
+    preguntas = []
+    for quiz_data in archivos.values():
+        for _, capitulo in iterar_capitulos(quiz_data):
+            for pregunta in capitulo.get("questions") or []:
+                if pregunta.get("difficulty") not in ETIQUETAS_CONSERVADAS:
+                    preguntas.append(pregunta)
+
+    rasgos = calcular_rasgos(preguntas, frecuencias_corpus(base_path))
+    resumen = {"preguntas": len(preguntas), "conEtiquetaPrevia": 0, "coincidencias": 0, "estimadas": 0}
+
+    for pregunta, nivel in zip(preguntas, asignar_niveles(puntuar(rasgos))):
+        previo = normalizar_nivel(pregunta.get("difficulty"))
+        if previo:
+            resumen["conEtiquetaPrevia"] += 1
+            resumen["coincidencias"] += previo == nivel
+        if previo and not sobrescribir:
+            pregunta["difficulty"] = previo
+        else:
+            pregunta["difficulty"] = nivel
+            resumen["estimadas"] += 1
+
+    return archivos, resumen
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Asigna dificultad normalizada a todos los quizzes")
+    parser.add_argument("--simular", action="store_true",
+                        help="Muestra la distribución sin escribir los archivos")
+    parser.add_argument("--libro", action="append", help="Estimar solo este libro (repetible)")
+    parser.add_argument("--sobrescribir", action="store_true",
+                        help="Sustituye también las dificultades ya asignadas a mano")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("ESTIMADOR DE DIFICULTAD POR LEGIBILIDAD")
+    print("="*60)
+
+    archivos, resumen = estimar_biblioteca(libros=args.libro, sobrescribir=args.sobrescribir)
+
+    for quiz_path, quiz_data in archivos.items():
+        niveles = Counter(
+            pregunta.get("difficulty")
+            for _, capitulo in iterar_capitulos(quiz_data)
+            for pregunta in capitulo.get("questions") or []
+        )
+        distribucion = ", ".join(f"{nivel}: {niveles[nivel]}" for nivel in sorted(niveles, key=str))
+        print(f"  {quiz_path.parent.parent.name}/{quiz_path.name} → {distribucion}")
+
+    print(f"\nPreguntas: {resumen['preguntas']} ({resumen['estimadas']} con dificultad estimada)")
+    print(f"Coinciden con la etiqueta previa: {resumen['coincidencias']}/{resumen['conEtiquetaPrevia']}")
+
+    if args.simular:
+        print("\n(simulación: no se ha escrito ningún archivo)")
+    else:
+        escritos = guardar_quizzes(archivos)
+        print(f"\n✓ {escritos} de {len(archivos)} archivos de quiz actualizados")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,17 @@
 Generador de iconos Android para Colección Nuevo Ser
 Crea iconos de biblioteca (library) en todas las resoluciones necesarias
 Basado en el ícono library de Lucide que usamos en la app
+
+Las variantes se dibujan una vez a resolución maestra y se reducen a cada
+densidad con scripts/build_icons.py (igual que los sabores awakening y
+trascendencia).
 """
 
 from PIL import Image, ImageDraw
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
 
 # Colores de la app
 COLOR_BG = "#0f172a"  # Slate-900 (fondo muy oscuro)
@@ -16,15 +23,6 @@ COLOR_ACCENT = "#fbbf24"  # Amber-400 (color de acento)
 COLOR_GRADIENT_START = "#a855f7"  # Purple-400
 COLOR_GRADIENT_END = "#f59e0b"  # Amber-500
 
-# Tamaños para cada densidad
-SIZES = {
-    'mdpi': 48,
-    'hdpi': 72,
-    'xhdpi': 96,
-    'xxhdpi': 144,
-    'xxxhdpi': 192
-}
-
 def hex_to_rgb(hex_color):
     """Convierte color hex a tupla RGB"""
     hex_color = hex_color.lstrip('#')
@@ -124,46 +122,43 @@ def create_library_icon(size):
 
     return img
 
+def crear_variantes(size):
+    """Icono completo, redondo y foreground a 'size' px, por nombre de archivo"""
+    icon = create_library_icon(size)
+
+    # Icono completo (con fondo)
+    bg = Image.new('RGB', (size, size), hex_to_rgb(COLOR_BG))
+    # Agregar círculo de fondo
+    draw = ImageDraw.Draw(bg)
+    margin = size // 8
+    draw.ellipse([margin, margin, size-margin, size-margin],
+                 fill=hex_to_rgb(COLOR_CIRCLE))
+    # Pegar foreground
+    bg.paste(icon, (0, 0), icon)
+
+    # Icono redondo
+    round_bg = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(round_bg)
+    # Círculo exterior (fondo oscuro)
+    draw.ellipse([0, 0, size-1, size-1], fill=hex_to_rgb(COLOR_BG))
+    # Círculo interior (fondo de contenido)
+    inner_margin = max(1, int(size * 0.05))
+    draw.ellipse([inner_margin, inner_margin, size-inner_margin-1, size-inner_margin-1],
+                 fill=hex_to_rgb(COLOR_CIRCLE))
+    # Pegar foreground
+    round_bg.paste(icon, (0, 0), icon)
+
+    return {
+        'ic_launcher_foreground': icon,
+        'ic_launcher': bg,
+        'ic_launcher_round': round_bg
+    }
+
 def main():
     """Genera todos los iconos necesarios"""
-    base_path = "android/app/src/main/res"
-
-    # Crear icono foreground para cada densidad
-    for density, size in SIZES.items():
-        output_dir = f"{base_path}/mipmap-{density}"
-        os.makedirs(output_dir, exist_ok=True)
-
-        # Icono principal (foreground)
-        icon = create_library_icon(size)
-        icon.save(f"{output_dir}/ic_launcher_foreground.png", "PNG")
-
-        # Icono completo (con fondo)
-        bg = Image.new('RGB', (size, size), hex_to_rgb(COLOR_BG))
-        # Agregar círculo de fondo
-        draw = ImageDraw.Draw(bg)
-        margin = size // 8
-        draw.ellipse([margin, margin, size-margin, size-margin],
-                     fill=hex_to_rgb(COLOR_CIRCLE))
-        # Pegar foreground
-        bg.paste(icon, (0, 0), icon)
-        bg.save(f"{output_dir}/ic_launcher.png", "PNG")
-
-        # Icono redondo
-        round_bg = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(round_bg)
-        # Círculo exterior (fondo oscuro)
-        draw.ellipse([0, 0, size-1, size-1], fill=hex_to_rgb(COLOR_BG))
-        # Círculo interior (fondo de contenido)
-        inner_margin = max(1, int(size * 0.05))
-        draw.ellipse([inner_margin, inner_margin, size-inner_margin-1, size-inner_margin-1],
-                     fill=hex_to_rgb(COLOR_CIRCLE))
-        # Pegar foreground
-        round_bg.paste(icon, (0, 0), icon)
-        round_bg.save(f"{output_dir}/ic_launcher_round.png", "PNG")
-
-        print(f"✓ Generados iconos para {density} ({size}x{size}px)")
-
-    print("\n✓ Todos los iconos generados exitosamente")
+    from build_icons import build_flavors
+
+    build_flavors(['main'])
     print(f"✓ Diseño: Biblioteca (Library icon) con gradiente purple-amber")
 
 if __name__ == "__main__":
@@ -5,10 +5,14 @@ Generador de Quizzes Educativos para Filosofía del Nuevo Ser, Manual Práctico
 Genera preguntas de comprensión de alta calidad basadas en el contenido real de cada capítulo.
 """
 
-import json
 import re
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+from biblioteca_quizzes import escribir_json_si_cambia
+from corpus_libros import Capitulo, Libro, cargar_libro_id
+from distractores import NUM_DISTRACTORES, IndiceDistractores, barajar_opciones
+from textrank_citas import citas_capitulo, citas_por_capitulo
 
 # Configuración base
 BASE_PATH = Path("/home/josu/Documentos/guiaIT/25-11-25-version/coleccion-nuevo-ser/www/books")
@@ -38,22 +42,19 @@ def limpiar_html(texto: str) -> str:
     return re.sub(r'<[^>]+>', '', texto)
 
 
-def extraer_cita_significativa(contenido: str, max_length: int = 180) -> str:
-    """Extrae una cita significativa del contenido"""
-    texto_limpio = limpiar_html(contenido)
+def extraer_cita_significativa(contenido: str, max_length: int = 180,
+                               citas: Optional[List[str]] = None) -> str:
+    """
+    Extrae la cita más representativa del contenido (TextRank).
 
-    # Buscar texto entre comillas o asteriscos (énfasis)
-    citas_enfasis = re.findall(r'[«*"]([^»*"]{50,200})[»*"]', texto_limpio)
-    if citas_enfasis:
-        cita = citas_enfasis[0]
-        if len(cita) > max_length:
-            cita = cita[:max_length] + "..."
-        return cita
+    'citas' permite pasar las citas ya ordenadas por citas_por_capitulo(),
+    calculadas para todo el libro de una vez en generar_quiz_libro().
+    """
+    if citas is None:
+        citas = citas_capitulo(contenido, k=1)
 
-    # Buscar párrafos significativos
-    parrafos = [p.strip() for p in texto_limpio.split('\n\n') if 80 < len(p.strip()) < 300]
-    if parrafos:
-        cita = parrafos[0]
+    if citas:
+        cita = citas[0]
         if len(cita) > max_length:
             cita = cita[:max_length] + "..."
         return cita
@@ -78,47 +79,19 @@ def extraer_conceptos_clave(contenido: str) -> List[str]:
     return conceptos[:5] if conceptos else []
 
 
-def cargar_libro(libro_id: str) -> Dict[str, Any]:
-    """Carga el archivo book.json de un libro"""
-    libro_path = BASE_PATH / libro_id / "book.json"
+def cargar_libro(libro_id: str) -> Optional[Libro]:
+    """Carga el archivo book.json de un libro (una sola vez por proceso)"""
+    libro = cargar_libro_id(libro_id, BASE_PATH)
+
+    if libro is None:
+        print(f"❌ ERROR: No se encuentra {BASE_PATH / libro_id / 'book.json'}")
+
+    return libro
 
-    if not libro_path.exists():
-        print(f"❌ ERROR: No se encuentra {libro_path}")
-        return None
 
-    with open(libro_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-
-def extraer_capitulos(book_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Extrae todos los capítulos de un libro"""
-    capitulos = []
-
-    # Manejar tanto 'sections' como 'prologo'
-    if "prologo" in book_data and isinstance(book_data["prologo"], dict):
-        prologo = book_data["prologo"]
-        if "content" in prologo:
-            capitulos.append({
-                "id": prologo.get("id", "prologo"),
-                "title": prologo.get("title", "Prólogo"),
-                "content": prologo.get("content", ""),
-                "epigraph": prologo.get("epigraph", {}),
-                "closingQuestion": ""
-            })
-
-    if "sections" in book_data:
-        for seccion in book_data["sections"]:
-            if "chapters" in seccion:
-                for capitulo in seccion["chapters"]:
-                    capitulos.append({
-                        "id": capitulo.get("id", ""),
-                        "title": capitulo.get("title", ""),
-                        "content": capitulo.get("content", ""),
-                        "epigraph": capitulo.get("epigraph", {}),
-                        "closingQuestion": capitulo.get("closingQuestion", "")
-                    })
-
-    return capitulos
+def extraer_capitulos(book_data: Libro) -> List[Capitulo]:
+    """Extrae todos los capítulos de un libro, incluido el prólogo"""
+    return book_data.capitulos_con_prologo()
 
 
 def generar_preguntas_filosofia_cap(capitulo: Dict[str, Any], cap_numero: int) -> List[Dict[str, Any]]:
@@ -127,7 +100,7 @@ def generar_preguntas_filosofia_cap(capitulo: Dict[str, Any], cap_numero: int) -
     cap_id = capitulo['id']
     titulo = capitulo['title']
     contenido = capitulo['content']
-    cita = extraer_cita_significativa(contenido)
+    cita = extraer_cita_significativa(contenido, citas=capitulo.get('citas'))
 
     # Preguntas específicas por capítulo conocido
     preguntas_especificas = {
@@ -262,7 +235,7 @@ def generar_preguntas_manual_practico(capitulo: Dict[str, Any]) -> List[Dict[str
 
     titulo = capitulo['title']
     contenido = capitulo['content']
-    cita = extraer_cita_significativa(contenido)
+    cita = extraer_cita_significativa(contenido, citas=capitulo.get('citas'))
 
     preguntas = [
         {
@@ -331,7 +304,7 @@ def generar_preguntas_practicas_radicales(capitulo: Dict[str, Any]) -> List[Dict
 
     titulo = capitulo['title']
     contenido = capitulo['content']
-    cita = extraer_cita_significativa(contenido)
+    cita = extraer_cita_significativa(contenido, citas=capitulo.get('citas'))
 
     preguntas = [
         {
@@ -395,10 +368,11 @@ def generar_preguntas_practicas_radicales(capitulo: Dict[str, Any]) -> List[Dict
     return preguntas
 
 
-def generar_preguntas_genericas(titulo: str, contenido: str, cap_id: str) -> List[Dict[str, Any]]:
+def generar_preguntas_genericas(titulo: str, contenido: str, cap_id: str,
+                                citas: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """Genera preguntas genéricas de calidad basadas en contenido"""
 
-    cita = extraer_cita_significativa(contenido)
+    cita = extraer_cita_significativa(contenido, citas=citas)
     conceptos = extraer_conceptos_clave(contenido)
 
     preguntas = [
@@ -463,7 +437,45 @@ def generar_preguntas_genericas(titulo: str, contenido: str, cap_id: str) -> Lis
     return preguntas
 
 
-def generar_quiz_libro(libro_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
+def agregar_preguntas_cita(libro_id: str, capitulos: List[Dict[str, Any]],
+                           quiz_data: Dict[str, Any], indice: IndiceDistractores):
+    """
+    Añade a cada capítulo una pregunta de reconocimiento de cita cuyos
+    distractores son oraciones de otros capítulos y libros. Se generan todas
+    las del libro en un solo lote.
+    """
+    # La primera cita ya se usa como bookQuote: la respuesta es la segunda
+    respuestas = [
+        {"texto": capitulo['citas'][1], "libro": libro_id, "capitulo": capitulo['id']}
+        for capitulo in capitulos if len(capitulo.get('citas', [])) > 1
+    ]
+
+    for respuesta, distractores in zip(respuestas, indice.generar(respuestas)):
+        if len(distractores) < NUM_DISTRACTORES:
+            continue
+        preguntas = quiz_data["chapters"][respuesta['capitulo']]["questions"]
+        preguntas.append({
+            "id": f"q{len(preguntas) + 1}",
+            "question": "¿Cuál de estas afirmaciones aparece en este capítulo?",
+            "type": "multiple",
+            "options": [respuesta['texto']] + distractores,
+            "correct": 0,
+            "explanation": "Las demás afirmaciones pertenecen a otros capítulos de la colección.",
+            "bookQuote": respuesta['texto']
+        })
+
+
+def barajar_quiz(libro_id: str, quiz_data: Dict[str, Any]):
+    """Baraja las opciones de cada pregunta de forma determinista (la correcta no siempre es la 1)"""
+    for cap_id, capitulo in quiz_data["chapters"].items():
+        for pregunta in capitulo["questions"]:
+            pregunta["options"], pregunta["correct"] = barajar_opciones(
+                pregunta["options"], pregunta["correct"], f"{libro_id}/{cap_id}/{pregunta['id']}"
+            )
+
+
+def generar_quiz_libro(libro_id: str, config: Dict[str, Any],
+                       indice: Optional[IndiceDistractores] = None) -> Dict[str, Any]:
     """Genera el quiz completo para un libro"""
 
     print(f"\n{'='*70}")
@@ -493,10 +505,14 @@ def generar_quiz_libro(libro_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
         "chapters": {}
     }
 
+    # Citas representativas de todos los capítulos en una sola pasada
+    citas = citas_por_capitulo(capitulos, k=3)
+
     # Generar preguntas para cada capítulo
     for idx, capitulo in enumerate(capitulos, 1):
         cap_id = capitulo['id']
         titulo = capitulo['title']
+        capitulo['citas'] = citas.get(cap_id, [])
 
         print(f"\n  [{idx}/{len(capitulos)}] {cap_id}: {titulo}")
         print(f"      Contenido: {len(capitulo['content'])} caracteres")
@@ -509,7 +525,7 @@ def generar_quiz_libro(libro_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
         elif libro_id == "practicas-radicales":
             preguntas = generar_preguntas_practicas_radicales(capitulo)
         else:
-            preguntas = generar_preguntas_genericas(titulo, capitulo['content'], cap_id)
+            preguntas = generar_preguntas_genericas(titulo, capitulo['content'], cap_id, capitulo['citas'])
 
         quiz_data["chapters"][cap_id] = {
             "chapterTitle": titulo,
@@ -518,6 +534,11 @@ def generar_quiz_libro(libro_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
 
         print(f"      ✓ {len(preguntas)} preguntas generadas")
 
+    if indice is not None:
+        agregar_preguntas_cita(libro_id, capitulos, quiz_data, indice)
+
+    barajar_quiz(libro_id, quiz_data)
+
     return quiz_data
 
 
@@ -527,12 +548,14 @@ def guardar_quiz(libro_id: str, quiz_data: Dict[str, Any]):
     # Guardar en /books/{libro_id}/quizzes.json (no en assets/)
     output_path = BASE_PATH / libro_id / "quizzes.json"
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(quiz_data, f, ensure_ascii=False, indent=2)
+    escrito = escribir_json_si_cambia(output_path, quiz_data)
 
     total_preguntas = sum(len(cap['questions']) for cap in quiz_data['chapters'].values())
 
-    print(f"\n✅ Quiz guardado exitosamente:")
+    if escrito:
+        print(f"\n✅ Quiz guardado exitosamente:")
+    else:
+        print(f"\n✅ Quiz sin cambios (no se reescribe):")
     print(f"   📁 {output_path}")
     print(f"   📖 {quiz_data['metadata']['totalChapters']} capítulos")
     print(f"   ❓ {total_preguntas} preguntas totales")
@@ -549,8 +572,11 @@ def main():
 
     resultados = {}
 
+    # Índice de distractores de toda la biblioteca (se construye una sola vez)
+    indice = IndiceDistractores.desde_biblioteca()
+
     for libro_id, config in LIBROS_CONFIG.items():
-        quiz_data = generar_quiz_libro(libro_id, config)
+        quiz_data = generar_quiz_libro(libro_id, config, indice)
 
         if quiz_data:
             guardar_quiz(libro_id, quiz_data)
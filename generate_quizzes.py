@@ -8,10 +8,12 @@ Este script genera preguntas de quiz educativo para los libros:
 - toolkit-transicion (22 capítulos)
 """
 
-import json
 import os
 from pathlib import Path
 
+from biblioteca_quizzes import escribir_json_si_cambia
+from corpus_libros import cargar_libro_id
+
 # Configuración base
 BASE_PATH = Path("/home/josu/Documentos/guiaIT/25-11-25-version/coleccion-nuevo-ser/www/books")
 
@@ -55,33 +57,17 @@ LIBROS = {
 }
 
 def cargar_libro(libro_id):
-    """Carga el archivo book.json de un libro"""
-    libro_path = BASE_PATH / libro_id / "book.json"
+    """Carga el archivo book.json de un libro (una sola vez por proceso)"""
+    libro = cargar_libro_id(libro_id, BASE_PATH)
 
-    if not libro_path.exists():
-        print(f"ERROR: No se encuentra {libro_path}")
-        return None
+    if libro is None:
+        print(f"ERROR: No se encuentra {BASE_PATH / libro_id / 'book.json'}")
 
-    with open(libro_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return libro
 
 def extraer_capitulos(book_data):
     """Extrae todos los capítulos de un libro"""
-    capitulos = []
-
-    if "sections" in book_data:
-        for seccion in book_data["sections"]:
-            if "chapters" in seccion:
-                for capitulo in seccion["chapters"]:
-                    capitulos.append({
-                        "id": capitulo.get("id"),
-                        "title": capitulo.get("title"),
-                        "content": capitulo.get("content", ""),
-                        "epigraph": capitulo.get("epigraph", {}),
-                        "closingQuestion": capitulo.get("closingQuestion", "")
-                    })
-
-    return capitulos
+    return book_data.capitulos
 
 def generar_preguntas_capitulo(capitulo, libro_info):
     """
@@ -254,13 +240,11 @@ def guardar_quiz(libro_id, quiz_data):
 
     output_path = BASE_PATH / libro_id / "assets" / "quizzes.json"
 
-    # Crear directorio assets si no existe
-    output_path.parent.mkdir(exist_ok=True)
-
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(quiz_data, f, ensure_ascii=False, indent=2)
-
-    print(f"\n✓ Quiz guardado en: {output_path}")
+    # Crea el directorio assets si no existe y no reescribe si nada cambió
+    if escribir_json_si_cambia(output_path, quiz_data):
+        print(f"\n✓ Quiz guardado en: {output_path}")
+    else:
+        print(f"\n= Quiz sin cambios: {output_path}")
     print(f"  Total capítulos: {quiz_data['metadata']['totalChapters']}")
     print(f"  Total preguntas (plantillas): {quiz_data['metadata']['totalQuestions']}")
 
@@ -300,8 +284,7 @@ def generar_reporte():
 
     # Guardar reporte
     reporte_path = BASE_PATH.parent.parent / "REPORTE-CONTENIDOS-QUIZ.json"
-    with open(reporte_path, 'w', encoding='utf-8') as f:
-        json.dump(reporte, f, ensure_ascii=False, indent=2)
+    escribir_json_si_cambia(reporte_path, reporte)
 
     print(f"\n✓ Reporte de contenidos guardado en: {reporte_path}")
 
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Parcheador de Quizzes en Bloque
+
+Aplica cambios a nivel de campo (difficulty, tags, id, ...) a muchas
+preguntas de muchos archivos de quiz en un solo proceso. Cada archivo se
+carga una vez, se le aplican todos sus parches y solo se reescribe si el
+resultado serializado cambia (escritura atómica, ver
+biblioteca_quizzes.escribir_json_si_cambia).
+
+Formato de un parche:
+
+    {
+      "libro": "ahora-instituciones",
+      "archivo": "quizzes.json",          # opcional, por defecto quizzes.json
+      "capitulo": "cap5",
+      "pregunta": "q2",                   # id de la pregunta o índice (int)
+      "campos": {"difficulty": "experto", "tags": ["economía"]}
+    }
+
+Un campo con valor null se elimina de la pregunta.
+
+Uso:
+    python3 parchear_quizzes.py parches.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional
+
+from biblioteca_quizzes import BASE_PATH, cargar_json, escribir_json_si_cambia, iterar_capitulos
+
+
+def buscar_pregunta(quiz_data: Dict[str, Any], cap_id: str, clave) -> Optional[Dict[str, Any]]:
+    """Localiza una pregunta por id (str) o por posición (int) dentro de un capítulo"""
+    for id_capitulo, capitulo in iterar_capitulos(quiz_data):
+        if id_capitulo != cap_id:
+            continue
+        preguntas = capitulo.get("questions") or []
+        if isinstance(clave, int):
+            return preguntas[clave] if 0 <= clave < len(preguntas) else None
+        for pregunta in preguntas:
+            if pregunta.get("id") == clave:
+                return pregunta
+    return None
+
+
+def aplicar_campos(pregunta: Dict[str, Any], campos: Dict[str, Any]):
+    """Actualiza los campos de una pregunta; None elimina el campo"""
+    for campo, valor in campos.items():
+        if valor is None:
+            pregunta.pop(campo, None)
+        else:
+            pregunta[campo] = valor
+
+
+def guardar_quizzes(datos: Dict[Path, Dict[str, Any]]) -> int:
+    """Escribe varios quizzes ya modificados; devuelve cuántos archivos se han tocado"""
+    return sum(escribir_json_si_cambia(path, quiz_data) for path, quiz_data in datos.items())
+
+
+def aplicar_parches(parches: Iterable[Dict[str, Any]], base_path: Path = BASE_PATH) -> Dict[str, Any]:
+    """
+    Aplica una lista de parches agrupándolos por archivo.
+
+    Devuelve un resumen con archivos cargados, archivos realmente escritos,
+    parches aplicados y los que no encontraron su pregunta.
+    """
+    por_archivo: Dict[Path, List[Dict[str, Any]]] = {}
+    for parche in parches:
+        quiz_path = base_path / parche["libro"] / "assets" / parche.get("archivo", "quizzes.json")
+        por_archivo.setdefault(quiz_path, []).append(parche)
+
+    datos = {}
+    aplicados = 0
+    no_encontrados = []
+
+    for quiz_path, lista in por_archivo.items():
+        if not quiz_path.exists():
+            no_encontrados.extend(lista)
+            continue
+
+        quiz_data = cargar_json(quiz_path)
+        for parche in lista:
+            pregunta = buscar_pregunta(quiz_data, parche["capitulo"], parche["pregunta"])
+            if pregunta is None:
+                no_encontrados.append(parche)
+                continue
+            aplicar_campos(pregunta, parche.get("campos", {}))
+            aplicados += 1
+        datos[quiz_path] = quiz_data
+
+    return {
+        "archivosCargados": len(datos),
+        "archivosEscritos": guardar_quizzes(datos),
+        "parchesAplicados": aplicados,
+        "noEncontrados": no_encontrados
+    }
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Aplica parches de campos a los archivos de quiz")
+    parser.add_argument("parches", type=Path, help="Archivo JSON con la lista de parches")
+    args = parser.parse_args()
+
+    with open(args.parches, 'r', encoding='utf-8') as f:
+        parches = json.load(f)
+
+    resumen = aplicar_parches(parches)
+
+    print(f"✓ Parches aplicados: {resumen['parchesAplicados']}")
+    print(f"✓ Archivos cargados: {resumen['archivosCargados']}")
+    print(f"✓ Archivos escritos: {resumen['archivosEscritos']} "
+          f"(sin cambios: {resumen['archivosCargados'] - resumen['archivosEscritos']})")
+
+    for parche in resumen['noEncontrados']:
+        print(f"  ⚠️  No encontrada: {parche['libro']} {parche['capitulo']} {parche['pregunta']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,17 @@ educativas de calidad basadas en el contenido real.
 """
 
 import json
-import re
 from pathlib import Path
 
+from biblioteca_quizzes import escribir_json_si_cambia
+from corpus_libros import cargar_libro_id
+from textrank_citas import cita_mas_afin, citas_capitulo, citas_por_capitulo
+
 BASE_PATH = Path("/home/josu/Documentos/guiaIT/25-11-25-version/coleccion-nuevo-ser/www/books")
 
 def cargar_libro(libro_id):
-    """Carga el archivo book.json de un libro"""
-    libro_path = BASE_PATH / libro_id / "book.json"
-    with open(libro_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """Carga el archivo book.json de un libro (una sola vez por proceso)"""
+    return cargar_libro_id(libro_id, BASE_PATH)
 
 def cargar_quiz(libro_id):
     """Carga el archivo de quiz existente"""
@@ -25,35 +26,21 @@ def cargar_quiz(libro_id):
         return json.load(f)
 
 def guardar_quiz(libro_id, quiz_data):
-    """Guarda el archivo de quiz"""
+    """Guarda el archivo de quiz (solo si ha cambiado); devuelve True si se escribió"""
     quiz_path = BASE_PATH / libro_id / "assets" / "quizzes.json"
-    with open(quiz_path, 'w', encoding='utf-8') as f:
-        json.dump(quiz_data, f, ensure_ascii=False, indent=2)
+    return escribir_json_si_cambia(quiz_path, quiz_data)
 
 def extraer_citas_relevantes(contenido, max_citas=5):
-    """Extrae las frases más significativas del contenido"""
-    # Buscar oraciones que parezcan conceptualmente importantes
-    # (contienen palabras clave, son afirmaciones, tienen comillas, etc.)
-    oraciones = re.split(r'[.!?]\s+', contenido)
-
-    citas = []
-    palabras_clave = [
-        'es', 'son', 'significa', 'implica', 'requiere', 'necesita',
-        'debe', 'puede', 'permite', 'fundamental', 'esencial', 'clave',
-        'importante', 'central', 'crucial', 'básico', 'principio'
-    ]
-
-    for oracion in oraciones:
-        if len(oracion) > 50 and len(oracion) < 300:
-            for palabra in palabras_clave:
-                if palabra in oracion.lower():
-                    citas.append(oracion.strip() + '.')
-                    break
-
-        if len(citas) >= max_citas:
-            break
-
-    return citas
+    """Extrae las frases más representativas del contenido (TextRank)"""
+    return citas_capitulo(contenido, k=max_citas)
+
+def completar_citas_pendientes(preguntas, citas):
+    """Sustituye las citas '[Buscar cita...]' por la cita del capítulo más afín a la pregunta"""
+    for pregunta in preguntas:
+        if pregunta.get("bookQuote", "").startswith("[") and citas:
+            texto = f"{pregunta.get('question', '')} {pregunta.get('explanation', '')}"
+            pregunta["bookQuote"] = cita_mas_afin(texto, citas)
+    return preguntas
 
 def generar_preguntas_tierra_que_despierta(capitulo_id, capitulo_data, contenido):
     """Genera preguntas específicas para La Tierra que Despierta"""
@@ -249,17 +236,15 @@ def poblar_quizzes_tierra():
     book_data = cargar_libro("tierra-que-despierta")
     quiz_data = cargar_quiz("tierra-que-despierta")
 
-    # Extraer capítulos del libro
-    capitulos_libro = {}
-    for seccion in book_data["sections"]:
-        for cap in seccion["chapters"]:
-            capitulos_libro[cap["id"]] = cap
+    # Citas candidatas de todos los capítulos en una sola pasada
+    citas_libro = citas_por_capitulo(book_data.capitulos, k=5)
 
     # Poblar preguntas
     capitulos_poblados = 0
     for cap_id, cap_quiz in quiz_data["chapters"].items():
-        if cap_id in capitulos_libro:
-            contenido = capitulos_libro[cap_id].get("content", "")
+        capitulo = book_data.capitulo(cap_id)
+        if capitulo is not None:
+            contenido = capitulo.content
 
             # Generar preguntas basadas en contenido
             nuevas_preguntas = generar_preguntas_tierra_que_despierta(
@@ -268,6 +253,8 @@ def poblar_quizzes_tierra():
                 contenido
             )
 
+            completar_citas_pendientes(nuevas_preguntas, citas_libro.get(cap_id, []))
+
             # Actualizar solo si se generaron preguntas reales
             if nuevas_preguntas != cap_quiz["questions"]:
                 quiz_data["chapters"][cap_id]["questions"] = nuevas_preguntas
@@ -275,7 +262,8 @@ def poblar_quizzes_tierra():
                 print(f"✓ {cap_id}: {cap_quiz['chapterTitle']} - {len(nuevas_preguntas)} preguntas")
 
     # Guardar
-    guardar_quiz("tierra-que-despierta", quiz_data)
+    if not guardar_quiz("tierra-que-despierta", quiz_data):
+        print("= Sin cambios: no se reescribe quizzes.json")
     print(f"\nCapítulos poblados: {capitulos_poblados}/{len(quiz_data['chapters'])}")
 
 def main():
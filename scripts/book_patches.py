@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Chapter Delta Packs between versions of a book.json
+
+A book.json is 100-315 KB, and editing one chapter makes every device
+download all of it again. This tool diffs two versions of a book at
+chapter granularity and writes a patch pack with only what changed:
+
+    {"version": 1, "book": "manifiesto", "from": "<hash>", "to": "<hash>",
+     "ops": [
+       {"op": "set", "key": "prologo", "value": {...}},      top-level keys
+       {"op": "delete", "key": "epilogo"},
+       {"op": "section", "id": "parte-1", "value": {...}},   section fields, without chapters
+       {"op": "chapter", "id": "cap-3", "value": {...}},     changed or new chapters
+       {"op": "remove_chapter", "id": "cap-9"},
+       {"op": "layout", "sections": [["parte-1", ["cap-1", ...]], ...]}
+     ]}
+
+"layout" (present only when something moved, appeared or disappeared)
+gives the order of the sections and of the chapters in each. Hashes are the
+first 16 hex digits of the SHA-256 of the book's canonical JSON (sorted
+keys, no spaces, UTF-8), so they don't depend on formatting. apply_patch()
+is the reference implementation for the client; every pack is checked
+against it before it is written, and packs that are not smaller than the
+book itself are skipped (the index still moves to the new version).
+
+Packs go to www/books/<id>/patches/<from>-<to>.json, listed in
+patches/index.json ({"current": <hash>, "patches": [{"from", "to", "file",
+"bytes", "chapters"}]}). A device that has version <from> follows packs
+until it reaches "current"; if no chain starts at its hash it downloads
+book.json.
+
+Usage:
+    python3 scripts/book_patches.py old/book.json new/book.json -o patch.json
+    python3 scripts/book_patches.py --from-ref v2.9.0        # every book vs. a git revision
+    python3 scripts/book_patches.py --from-dir /tmp/books-old  # every book vs. an old www/books copy
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+from biblioteca_quizzes import BASE_PATH, escribir_si_cambia, escribir_json_si_cambia
+
+PATCH_VERSION = 1
+PATCHES_DIR = 'patches'
+
+
+def canonical(data: Any) -> bytes:
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def content_hash(book: Dict[str, Any]) -> str:
+    return hashlib.sha256(canonical(book)).hexdigest()[:16]
+
+
+def compact(data: Any) -> bytes:
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def layout(book: Dict[str, Any]) -> List[List[Any]]:
+    return [[section['id'], [chapter['id'] for chapter in section.get('chapters', [])]]
+            for section in book.get('sections', [])]
+
+
+def chapters_by_id(book: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    chapters = {}
+    for section in book.get('sections', []):
+        for chapter in section.get('chapters', []):
+            if chapter.get('id') is None or chapter['id'] in chapters:
+                raise ValueError(f"id de capítulo ausente o repetido: {chapter.get('id')}")
+            chapters[chapter['id']] = chapter
+    return chapters
+
+
+def section_fields(section: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in section.items() if key != 'chapters'}
+
+
+def diff_books(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Operations that turn 'old' into 'new' (see the module docstring)."""
+    ops = []
+    for key, value in new.items():
+        if key != 'sections' and old.get(key, object()) != value:
+            ops.append({'op': 'set', 'key': key, 'value': value})
+    ops.extend({'op': 'delete', 'key': key} for key in old if key not in new)
+
+    old_sections = {s['id']: section_fields(s) for s in old.get('sections', [])}
+    for section in new.get('sections', []):
+        fields = section_fields(section)
+        if old_sections.get(section['id']) != fields:
+            ops.append({'op': 'section', 'id': section['id'], 'value': fields})
+
+    old_chapters, new_chapters = chapters_by_id(old), chapters_by_id(new)
+    ops.extend({'op': 'chapter', 'id': cid, 'value': chapter}
+               for cid, chapter in new_chapters.items() if old_chapters.get(cid) != chapter)
+    ops.extend({'op': 'remove_chapter', 'id': cid} for cid in old_chapters if cid not in new_chapters)
+
+    if layout(old) != layout(new):
+        ops.append({'op': 'layout', 'sections': layout(new)})
+    return ops
+
+
+def apply_patch(book: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
+    """The book 'patch' leads to from 'book' (which must hash to patch['from'])."""
+    if content_hash(book) != patch['from']:
+        raise ValueError(f"el parche parte de {patch['from']}, no de {content_hash(book)}")
+    book = copy.deepcopy(book)
+    sections = {s['id']: s for s in book.get('sections', [])}
+    chapters = chapters_by_id(book)
+    new_layout = layout(book)
+
+    for op in patch['ops']:
+        kind = op['op']
+        if kind == 'set':
+            book[op['key']] = op['value']
+        elif kind == 'delete':
+            book.pop(op['key'], None)
+        elif kind == 'section':
+            sections[op['id']] = dict(op['value'], chapters=sections.get(op['id'], {}).get('chapters', []))
+        elif kind == 'chapter':
+            chapters[op['id']] = op['value']
+        elif kind == 'remove_chapter':
+            chapters.pop(op['id'], None)
+        elif kind == 'layout':
+            new_layout = op['sections']
+        else:
+            raise ValueError(f'operación desconocida: {kind}')
+
+    if 'sections' in book or new_layout:
+        book['sections'] = [dict(sections[sid], chapters=[chapters[cid] for cid in cids])
+                            for sid, cids in new_layout]
+    if content_hash(book) != patch['to']:
+        raise ValueError(f"el resultado no coincide con {patch['to']}")
+    return book
+
+
+def make_patch(book_id: str, old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    patch = {
+        'version': PATCH_VERSION,
+        'book': book_id,
+        'from': content_hash(old),
+        'to': content_hash(new),
+        'ops': diff_books(old, new)
+    }
+    # Never publish a pack the reference client can't apply
+    apply_patch(old, patch)
+    return patch
+
+
+def changed_chapters(patch: Dict[str, Any]) -> List[str]:
+    return [op['id'] for op in patch['ops'] if op['op'] in ('chapter', 'remove_chapter')]
+
+
+def reachable(patches: List[Dict[str, Any]], current: str) -> List[Dict[str, Any]]:
+    """The entries of 'patches' whose chain of packs still ends at 'current'."""
+    leads = {current}
+    changed = True
+    while changed:
+        changed = False
+        for entry in patches:
+            if entry['to'] in leads and entry['from'] not in leads:
+                leads.add(entry['from'])
+                changed = True
+    return [entry for entry in patches if entry['to'] in leads and entry['from'] != current]
+
+
+def write_pack(book_dir: Path, old: Dict[str, Any], new: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Write the pack old → new of one book and update its index; its index entry, or None if not worth it.
+
+    The index always moves to the hash of 'new', even when the pack is
+    skipped, and drops the packs that no longer lead to it (their files too).
+    """
+    patch = make_patch(book_dir.name, old, new)
+    data = compact(patch)
+    full_size = len(compact(new))
+    patches_dir = book_dir / PATCHES_DIR
+    index_file = patches_dir / 'index.json'
+
+    entry = None
+    if patch['from'] != patch['to'] and len(data) < full_size:
+        name = f"{patch['from']}-{patch['to']}.json"
+        escribir_si_cambia(patches_dir / name, data)
+        entry = {
+            'from': patch['from'],
+            'to': patch['to'],
+            'file': f"books/{book_dir.name}/{PATCHES_DIR}/{name}",
+            'bytes': len(data),
+            'full_bytes': full_size,
+            'chapters': changed_chapters(patch)
+        }
+
+    index = {'current': patch['to'], 'patches': []}
+    if index_file.exists():
+        with open(index_file, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    elif entry is None:
+        return None
+    patches = [p for p in index['patches'] if entry is None or p['file'] != entry['file']]
+    if entry:
+        patches.append(entry)
+    kept = reachable(patches, patch['to'])
+    for stale in patches:
+        if stale not in kept:
+            (patches_dir / Path(stale['file']).name).unlink(missing_ok=True)
+    escribir_json_si_cambia(index_file, {'current': patch['to'], 'patches': kept})
+    return entry
+
+
+def git_version(ref: str, path: Path) -> Optional[Dict[str, Any]]:
+    """The JSON at 'path' in git revision 'ref', or None if it didn't exist."""
+    relative = path.resolve().relative_to(REPO_ROOT).as_posix()
+    result = subprocess.run(['git', 'show', f'{ref}:{relative}'], cwd=REPO_ROOT, capture_output=True)
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout.decode('utf-8'))
+
+
+def load_json(path: Path) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Chapter-level patch packs between book.json versions')
+    parser.add_argument('files', nargs='*', type=Path, metavar='BOOK_JSON', help='Old and new book.json')
+    parser.add_argument('-o', '--output', type=Path, help='Where to write the pack (two-file mode)')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--from-ref', help='Diff every book against this git revision')
+    source.add_argument('--from-dir', type=Path, help='Diff every book against an old copy of www/books')
+    args = parser.parse_args()
+
+    if args.files:
+        if len(args.files) != 2 or args.from_ref or args.from_dir:
+            parser.error('give exactly two book.json files, or --from-ref / --from-dir')
+        old, new = load_json(args.files[0]), load_json(args.files[1])
+        patch = make_patch(args.files[1].parent.name, old, new)
+        data = compact(patch)
+        if args.output:
+            escribir_si_cambia(args.output, data)
+        else:
+            sys.stdout.write(data.decode('utf-8') + '\n')
+        print(f"✓ {patch['from']} → {patch['to']}: {len(patch['ops'])} operaciones, "
+              f"{len(changed_chapters(patch))} capítulos, {len(data) / 1024:.1f} KB "
+              f"de {len(compact(new)) / 1024:.1f} KB", file=sys.stderr)
+        return
+    if not (args.from_ref or args.from_dir):
+        parser.error('give two book.json files, or --from-ref / --from-dir')
+
+    packs = 0
+    for path in sorted(BASE_PATH.glob('*/book.json')):
+        book_id = path.parent.name
+        if args.from_ref:
+            old = git_version(args.from_ref, path)
+        else:
+            old_path = args.from_dir / book_id / 'book.json'
+            old = load_json(old_path) if old_path.exists() else None
+        if old is None:
+            continue
+        entry = write_pack(path.parent, old, load_json(path))
+        if entry:
+            packs += 1
+            print(f"  {book_id:24} {entry['from']} → {entry['to']}  {len(entry['chapters'])} capítulos  "
+                  f"{entry['bytes'] / 1024:7.1f} KB de {entry['full_bytes'] / 1024:.1f} KB")
+    print(f"\n✓ {packs} paquetes de parches escritos")
+
+
+if __name__ == '__main__':
+    main()
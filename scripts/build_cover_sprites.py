@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Cover Sprite Sheet for the catalog grid
+
+Rasterizes the coverImage of every book in www/books/catalog.json to
+thumbnails once and packs them into one sprite sheet per pixel density, so
+the library grid loads a single image instead of parsing an SVG (or
+fetching a JPEG) per card.
+
+- SVG covers are rasterized with cairosvg when it is installed, otherwise
+  with rsvg-convert or inkscape if one is on the PATH; raster covers are
+  resized with Pillow. Covers are scaled to fit TILE (2:3) and centred.
+- Each thumbnail is cached in .cache/cover-thumbs/ under the SHA-256 of
+  the cover's bytes and the tile size, so a cover is only rasterized again
+  when its file changes. Books sharing a cover share a tile.
+- The sheets are encoded through optimize_pngs.optimize_image and only
+  rewritten when their bytes change (escribir_si_cambia).
+
+Output (www/assets/):
+    covers-sprite.png, covers-sprite@2x.png
+    covers-sprite.json:
+        {"version": 1, "tile": {"width": 120, "height": 180},
+         "sheets": {"1x": {"file": "assets/covers-sprite.png", "width", "height"},
+                    "2x": {...}},
+         "covers": {"<book id>": {"source": "books/.../cover.svg", "x": 0, "y": 0}}}
+    x/y are in 1x pixels: with background-size set to the 1x sheet size,
+    the same background-position works for the @2x sheet. Without covers
+    no sheet is written and "sheets" and "covers" are empty.
+
+The frontend does not read covers-sprite.json yet: the catalog grid still
+loads each coverImage on its own until it is switched to the sheets.
+
+Usage:
+    python3 scripts/build_cover_sprites.py
+    python3 scripts/build_cover_sprites.py --force   # ignore the thumbnail cache
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from PIL import Image
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+from biblioteca_quizzes import escribir_si_cambia, escribir_json_si_cambia
+from optimize_pngs import optimize_image
+
+WWW_DIR = REPO_ROOT / 'www'
+CATALOG_FILE = WWW_DIR / 'books' / 'catalog.json'
+THUMBS_DIR = REPO_ROOT / '.cache' / 'cover-thumbs'
+SPRITE_FILE = WWW_DIR / 'assets' / 'covers-sprite.png'
+COORDS_FILE = WWW_DIR / 'assets' / 'covers-sprite.json'
+COORDS_VERSION = 1
+
+# Tile size at 1x (the covers are 400 × 600)
+TILE = (120, 180)
+DENSITIES = {'1x': 1, '2x': 2}
+# Transparent gap between tiles, so bilinear sampling never bleeds a neighbour in
+GAP = 2
+COLUMNS = 6
+
+Rasterizer = Callable[[bytes, int, int], bytes]
+
+
+def svg_rasterizer() -> Optional[Rasterizer]:
+    """(svg bytes, width, height) → PNG bytes with the first available backend, or None."""
+    try:
+        import cairosvg
+    except ImportError:
+        cairosvg = None
+    if cairosvg is not None:
+        return lambda svg, width, height: cairosvg.svg2png(bytestring=svg, output_width=width,
+                                                           output_height=height)
+
+    if shutil.which('rsvg-convert'):
+        def command(width, height):
+            return ['rsvg-convert', '--keep-aspect-ratio', '-w', str(width), '-h', str(height)]
+    elif shutil.which('inkscape'):
+        def command(width, height):
+            return ['inkscape', '--pipe', '--export-type=png', '--export-filename=-',
+                    f'--export-width={width}', f'--export-height={height}']
+    else:
+        return None
+    return lambda svg, width, height: subprocess.run(command(width, height), input=svg,
+                                                     capture_output=True, check=True).stdout
+
+
+def catalog_covers() -> Dict[str, Path]:
+    """Book id → cover file, in catalog order, for the covers that exist."""
+    with open(CATALOG_FILE, 'r', encoding='utf-8') as f:
+        books = json.load(f)['books']
+    covers = {}
+    for book in books:
+        cover = book.get('coverImage')
+        if not cover:
+            continue
+        path = WWW_DIR / cover
+        if path.exists():
+            covers[book['id']] = path
+        else:
+            print(f"⚠ {book['id']}: no existe {cover}")
+    return covers
+
+
+def fit(image: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """'image' scaled to fit 'size' and centred on a transparent tile."""
+    image = image.convert('RGBA')
+    scale = min(size[0] / image.width, size[1] / image.height)
+    scaled = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    if scaled != image.size:
+        image = image.resize(scaled, Image.LANCZOS)
+    if image.size == size:
+        return image
+    tile = Image.new('RGBA', size, (0, 0, 0, 0))
+    tile.paste(image, ((size[0] - scaled[0]) // 2, (size[1] - scaled[1]) // 2))
+    return tile
+
+
+def thumbnail(path: Path, size: Tuple[int, int], rasterize: Optional[Rasterizer], force: bool) -> Image.Image:
+    """Cached thumbnail of one cover at 'size'."""
+    data = path.read_bytes()
+    key = hashlib.sha256(data).hexdigest()[:16]
+    cached = THUMBS_DIR / f'{key}-{size[0]}x{size[1]}.png'
+    if cached.exists() and not force:
+        with Image.open(cached) as image:
+            return image.convert('RGBA')
+
+    if path.suffix.lower() == '.svg':
+        if rasterize is None:
+            raise SystemExit('✗ Hace falta cairosvg (pip install cairosvg), rsvg-convert o inkscape '
+                             'para rasterizar las portadas SVG')
+        image = Image.open(io.BytesIO(rasterize(data, *size)))
+    else:
+        image = Image.open(path)
+    tile = fit(image, size)
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    tile.save(cached, 'PNG')
+    return tile
+
+
+def layout(sources: List[Path]) -> Dict[Path, Tuple[int, int]]:
+    """1x position of each unique cover in the sheet."""
+    return {source: ((i % COLUMNS) * (TILE[0] + GAP), (i // COLUMNS) * (TILE[1] + GAP))
+            for i, source in enumerate(sources)}
+
+
+def build_sprites(force: bool = False) -> Dict[str, Any]:
+    covers = catalog_covers()
+    sources = list(dict.fromkeys(covers.values()))
+    coords = {
+        'version': COORDS_VERSION,
+        'tile': {'width': TILE[0], 'height': TILE[1]},
+        'sheets': {},
+        'covers': {}
+    }
+    if not sources:
+        escribir_json_si_cambia(COORDS_FILE, coords)
+        return coords
+
+    positions = layout(sources)
+    columns = min(COLUMNS, len(sources))
+    rows = math.ceil(len(sources) / COLUMNS)
+    sheet_size = (columns * (TILE[0] + GAP) - GAP, rows * (TILE[1] + GAP) - GAP)
+    rasterize = svg_rasterizer() if any(s.suffix.lower() == '.svg' for s in sources) else None
+
+    for density, scale in DENSITIES.items():
+        tile = (TILE[0] * scale, TILE[1] * scale)
+        sheet = Image.new('RGBA', (sheet_size[0] * scale, sheet_size[1] * scale), (0, 0, 0, 0))
+        for source, (x, y) in positions.items():
+            sheet.paste(thumbnail(source, tile, rasterize, force), (x * scale, y * scale))
+        path = SPRITE_FILE if scale == 1 else SPRITE_FILE.with_name(f'{SPRITE_FILE.stem}@{density}.png')
+        escribir_si_cambia(path, optimize_image(sheet)[0])
+        coords['sheets'][density] = {
+            'file': path.relative_to(WWW_DIR).as_posix(),
+            'width': sheet.width,
+            'height': sheet.height
+        }
+
+    coords['covers'] = {book_id: {'source': path.relative_to(WWW_DIR).as_posix(),
+                                  'x': positions[path][0], 'y': positions[path][1]}
+                        for book_id, path in covers.items()}
+    escribir_json_si_cambia(COORDS_FILE, coords)
+    return coords
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack the catalog covers into sprite sheets')
+    parser.add_argument('--force', action='store_true', help='Rasterize every cover again')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    coords = build_sprites(args.force)
+    print(f"✓ {len(coords['covers'])} portadas en {time.perf_counter() - start:.2f}s")
+    for sheet in coords['sheets'].values():
+        size = (WWW_DIR / sheet['file']).stat().st_size
+        print(f"  {sheet['file']}: {sheet['width']}×{sheet['height']}, {size / 1024:.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Launcher Icon Pipeline for every Android flavor
+
+Each design is rendered once, at MASTER_SIZE, into all its variants
+(ic_launcher, ic_launcher_round, ic_launcher_foreground); every density in
+SIZES is then a Lanczos downsample of that master, so small densities get
+antialiased edges instead of 1-2 px aliased strokes, and nothing is drawn
+more than once per flavor.
+
+Flavors build in a process pool and the densities of each variant in
+threads (Pillow releases the GIL while resizing and encoding). A hash of
+everything that determines the output (the design module, icon_render.py,
+optimize_pngs.py, this pipeline's settings) is kept per flavor in
+.cache/icon-builds.json;
+unchanged flavors whose files are all present are skipped, and files are
+only rewritten when their bytes change (escribir_si_cambia). Every PNG
+goes through optimize_pngs.optimize_image, so the written icons are
+already as small as the optimizer would leave them.
+
+Designs (module, variants function, res directory):
+    main           generate_icons.crear_variantes        android/app/src/main/res
+    awakening      generate_awakening_icons.variants     mobile-game/.../awakening/res
+    trascendencia  generate_trascendencia_icons.variants mobile-game/.../trascendencia/res
+
+Usage:
+    python3 scripts/build_icons.py                 # all flavors
+    python3 scripts/build_icons.py awakening --force
+    python3 scripts/build_icons.py --out /tmp/icons
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from PIL import Image
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+from biblioteca_quizzes import escribir_si_cambia, escribir_json_si_cambia
+from optimize_pngs import optimize_image
+
+CACHE_FILE = REPO_ROOT / '.cache' / 'icon-builds.json'
+# Bump when the pipeline changes its output for the same designs
+PIPELINE_VERSION = 2
+
+# 4 × the largest density: enough for a clean Lanczos reduction to all of them
+MASTER_SIZE = 768
+SIZES = {
+    'mdpi': 48,
+    'hdpi': 72,
+    'xhdpi': 96,
+    'xxhdpi': 144,
+    'xxxhdpi': 192
+}
+
+FLAVORS = {
+    'main': {
+        'module': 'generate_icons',
+        'variants': 'crear_variantes',
+        'res': 'android/app/src/main/res'
+    },
+    'awakening': {
+        'module': 'generate_awakening_icons',
+        'variants': 'variants',
+        'res': 'mobile-game/mobile-app/android/app/src/awakening/res'
+    },
+    'trascendencia': {
+        'module': 'generate_trascendencia_icons',
+        'variants': 'variants',
+        'res': 'mobile-game/mobile-app/android/app/src/trascendencia/res'
+    }
+}
+
+
+def module_file(name: str) -> Path:
+    """Source file of a design module (scripts/ or the repository root)."""
+    for folder in (SCRIPTS_DIR, REPO_ROOT):
+        candidate = folder / f'{name}.py'
+        if candidate.exists():
+            return candidate
+    raise FileNotFoundError(f'{name}.py')
+
+
+def design_hash(flavor: str) -> str:
+    """Hash of everything that determines a flavor's PNGs."""
+    spec = FLAVORS[flavor]
+    digest = hashlib.sha256()
+    digest.update(json.dumps([PIPELINE_VERSION, MASTER_SIZE, SIZES, spec], sort_keys=True).encode())
+    for path in (module_file(spec['module']), SCRIPTS_DIR / 'icon_render.py', SCRIPTS_DIR / 'optimize_pngs.py'):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def output_files(flavor: str, out_root: Path) -> List[Path]:
+    """Every PNG a flavor produces, without rendering it."""
+    res = out_root / FLAVORS[flavor]['res']
+    variants = ('ic_launcher', 'ic_launcher_round', 'ic_launcher_foreground')
+    return [res / f'mipmap-{density}' / f'{variant}.png' for density in SIZES for variant in variants]
+
+
+def png_bytes(image: Image.Image) -> bytes:
+    return optimize_image(image)[0]
+
+
+def downsample(master: Image.Image, size: int) -> Image.Image:
+    """Lanczos reduction (premultiplied by Pillow for RGBA, so edges don't darken)."""
+    return master.resize((size, size), Image.LANCZOS, reducing_gap=None)
+
+
+def write_variant(res: Path, name: str, master: Image.Image) -> List[bool]:
+    """Every density of one variant; True for each file that changed."""
+    return [escribir_si_cambia(res / f'mipmap-{density}' / f'{name}.png', png_bytes(downsample(master, size)))
+            for density, size in SIZES.items()]
+
+
+def render_flavor(flavor: str, out_root: str) -> Dict[str, Any]:
+    """Render a flavor's master variants once and write all their densities."""
+    spec = FLAVORS[flavor]
+    start = time.perf_counter()
+    module = importlib.import_module(spec['module'])
+    masters = getattr(module, spec['variants'])(MASTER_SIZE)
+    rendered = time.perf_counter()
+
+    res = Path(out_root) / spec['res']
+    with ThreadPoolExecutor(max_workers=len(masters)) as pool:
+        changed = sum(sum(flags) for flags in pool.map(lambda item: write_variant(res, *item), masters.items()))
+
+    return {
+        'flavor': flavor,
+        'files': len(masters) * len(SIZES),
+        'changed': changed,
+        'render_ms': round((rendered - start) * 1000, 1),
+        'total_ms': round((time.perf_counter() - start) * 1000, 1)
+    }
+
+
+def load_cache() -> Dict[str, Any]:
+    if CACHE_FILE.exists():
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def build_flavors(flavors: Optional[List[str]] = None, out_root: Path = REPO_ROOT,
+                  force: bool = False, jobs: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Build 'flavors' (all by default), skipping the ones whose hash and files are unchanged."""
+    flavors = flavors or list(FLAVORS)
+    cache = load_cache()
+    hashes = {flavor: design_hash(flavor) for flavor in flavors}
+    key = str(Path(out_root).resolve())
+
+    stale = [flavor for flavor in flavors
+             if force or cache.get(flavor, {}).get(key) != hashes[flavor]
+             or not all(path.exists() for path in output_files(flavor, Path(out_root)))]
+
+    workers = min(len(stale), jobs or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(render_flavor, stale, [str(out_root)] * len(stale)))
+    else:
+        results = [render_flavor(flavor, str(out_root)) for flavor in stale]
+
+    for result in results:
+        cache.setdefault(result['flavor'], {})[key] = hashes[result['flavor']]
+        print(f"✓ {result['flavor']}: {result['files']} PNG ({result['changed']} cambiados), "
+              f"maestro {MASTER_SIZE}px en {result['render_ms']} ms, total {result['total_ms']} ms")
+    for flavor in flavors:
+        if flavor not in stale:
+            print(f"· {flavor}: sin cambios ({hashes[flavor]})")
+
+    escribir_json_si_cambia(CACHE_FILE, cache)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the launcher icons of every Android flavor')
+    parser.add_argument('flavors', nargs='*', metavar='FLAVOR',
+                        help=f"Flavors to build ({', '.join(FLAVORS)}); all by default")
+    parser.add_argument('--force', action='store_true', help='Render even if the design hash is unchanged')
+    parser.add_argument('--out', type=Path, default=REPO_ROOT, help='Root the res/ paths are relative to')
+    parser.add_argument('--jobs', type=int, help='Worker processes (default: one per flavor, up to the CPU count)')
+    args = parser.parse_args()
+    unknown = [flavor for flavor in args.flavors if flavor not in FLAVORS]
+    if unknown:
+        parser.error(f"unknown flavor: {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    build_flavors(args.flavors or None, args.out, args.force, args.jobs)
+    print(f"\n✓ Iconos listos en {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Precache Manifest for the service worker
+
+Runs as the last step of npm run build: hashes every shipped file under
+dist/ (minified scripts and styles, generated quiz bundles and resource
+index included; see size_budget.shipped_files) and writes
+dist/precache-manifest.json with one entry per file: its URL, a revision
+(the first 16 hex digits of its SHA-256), its size and its group:
+
+    static  HTML, JS, CSS and app JSON outside books/
+    book    book content: everything under books/ and the premium downloads
+    image   PNG/JPEG/WebP/AVIF/SVG/ICO/GIF
+    audio   MP3/OGG/Opus/M4A/WAV
+
+Entries listed in STATIC_ASSETS of the service worker are marked
+"critical". The manifest revision is stamped into PRECACHE_REVISION of
+dist/service-worker.js, so any content change makes browsers install the
+new worker; on install it compares the manifest with the one it stored
+last time, fetches only the files whose revision changed (critical ones
+always, the rest if they were cached) and drops the removed ones, instead
+of dropping whole caches when CACHE_VERSION is bumped.
+
+Not shipped, so not listed: tests/, Markdown notes, *.example files,
+.htaccess and the service worker itself.
+
+Output:
+    {"version": 1, "revision": "<hash of all entries>",
+     "groups": {"static": {"files": 120, "bytes": 123456}, ...},
+     "entries": [{"url": "/js/core/logger.js", "revision": "9f2c...", "size": 4123,
+                  "group": "static", "critical": true}, ...]}
+
+Each run also compares with the manifest of the previous build (kept in
+.cache/, since build.js empties dist/) and prints how many files, and
+bytes, an update would make clients download again.
+
+Usage:
+    python3 scripts/build_precache_manifest.py                # dist/, after node scripts/build.js
+    python3 scripts/build_precache_manifest.py --root www --no-stamp
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Any
+
+from size_budget import DIST_DIR, SERVICE_WORKER, first_load_files, shipped_files
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+from biblioteca_quizzes import escribir_si_cambia, escribir_json_si_cambia
+
+MANIFEST_NAME = 'precache-manifest.json'
+MANIFEST_VERSION = 1
+PREVIOUS_FILE = REPO_ROOT / '.cache' / MANIFEST_NAME
+# Also matches the minified worker (double quotes, no spaces)
+REVISION_PATTERN = re.compile(r"""(PRECACHE_REVISION\s*=\s*)(['"])[^'"]*\2""")
+
+EXCLUDE = ['tests/*', '*.md', '*.example', '.htaccess', 'service-worker.js', MANIFEST_NAME]
+GROUPS = [
+    ('audio', {'.mp3', '.ogg', '.opus', '.m4a', '.wav'}),
+    ('image', {'.png', '.jpg', '.jpeg', '.webp', '.avif', '.gif', '.svg', '.ico'}),
+]
+
+
+def group_of(path: str) -> str:
+    suffix = Path(path).suffix.lower()
+    for name, extensions in GROUPS:
+        if suffix in extensions:
+            return name
+    if path.startswith('books/') or path.startswith('downloads/'):
+        return 'book'
+    return 'static'
+
+
+def file_revision(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def build_manifest(root: Path = DIST_DIR) -> Dict[str, Any]:
+    critical = set(first_load_files(root))
+    files = [path for path in shipped_files(root)
+             if not any(fnmatch.fnmatch(path, pattern) for pattern in EXCLUDE)]
+
+    entries, groups = [], defaultdict(lambda: {'files': 0, 'bytes': 0})
+    for path in files:
+        full = root / path
+        entry = {
+            'url': '/' + path,
+            'revision': file_revision(full),
+            'size': full.stat().st_size,
+            'group': group_of(path)
+        }
+        if path in critical:
+            entry['critical'] = True
+        entries.append(entry)
+        groups[entry['group']]['files'] += 1
+        groups[entry['group']]['bytes'] += entry['size']
+
+    revision = hashlib.sha256(json.dumps([[e['url'], e['revision']] for e in entries]).encode())
+    return {
+        'version': MANIFEST_VERSION,
+        'revision': revision.hexdigest()[:16],
+        'groups': dict(sorted(groups.items())),
+        'entries': entries
+    }
+
+
+def stamp_worker(root: Path, revision: str) -> bool:
+    """Write the manifest revision into the service worker under 'root'; True if it changed."""
+    worker = root / SERVICE_WORKER
+    source = worker.read_text(encoding='utf-8')
+    stamped, count = REVISION_PATTERN.subn(lambda m: f'{m.group(1)}{m.group(2)}{revision}{m.group(2)}', source)
+    if count != 1:
+        raise ValueError(f'{worker}: expected one PRECACHE_REVISION, found {count}')
+    return escribir_si_cambia(worker, stamped.encode('utf-8'))
+
+
+def update_cost(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Entries a client holding 'old' has to download or can drop to reach 'new'."""
+    before = {e['url']: e for e in old.get('entries', [])}
+    after = {e['url']: e for e in new['entries']}
+    return {
+        'changed': [e for url, e in after.items() if url in before and before[url]['revision'] != e['revision']],
+        'added': [e for url, e in after.items() if url not in before],
+        'removed': [e for url, e in before.items() if url not in after]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write the precache manifest of the built app')
+    parser.add_argument('--root', type=Path, default=DIST_DIR, help='Folder to index (default: dist)')
+    parser.add_argument('--no-stamp', action='store_true',
+                        help="Don't write the revision into the service worker (e.g. for www/)")
+    args = parser.parse_args()
+    root = args.root.resolve()
+    if not root.is_dir():
+        parser.error(f'{root} does not exist (run node scripts/build.js first)')
+    manifest_file = root / MANIFEST_NAME
+
+    previous = {}
+    if PREVIOUS_FILE.exists():
+        with open(PREVIOUS_FILE, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    manifest = build_manifest(root)
+    escribir_json_si_cambia(manifest_file, manifest)
+    escribir_json_si_cambia(PREVIOUS_FILE, manifest)
+    if not args.no_stamp:
+        stamp_worker(root, manifest['revision'])
+
+    print(f"✓ {len(manifest['entries'])} archivos en {manifest_file} (revisión {manifest['revision']})")
+    for name, group in manifest['groups'].items():
+        print(f"  {name:8} {group['files']:5} archivos {group['bytes'] / 1024:10.1f} KB")
+
+    if previous:
+        cost = update_cost(previous, manifest)
+        download = cost['changed'] + cost['added']
+        total = sum(e['size'] for e in manifest['entries'])
+        print(f"\nFrente al build anterior: {len(cost['changed'])} cambiados, {len(cost['added'])} nuevos, "
+              f"{len(cost['removed'])} eliminados")
+        print(f"  Descarga de la actualización: {sum(e['size'] for e in download) / 1024:.1f} KB "
+              f"de {total / 1024:.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
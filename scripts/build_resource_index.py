@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Global Resource Index for Colección Nuevo Ser
+
+Merges the resources.json of every book into www/books/resources-index.json:
+one entry per unique work, with every book/chapter that references it.
+
+Entries are matched across books by any shared key:
+- canonical URL (see resource_library.canonical_url), unless some book uses
+  that URL for two different resources (author sites, publisher landing
+  pages, ...), which makes it too generic to identify anything;
+- title fingerprint: normalised title (every translation) + author surname,
+  or + kind of resource when there is no author;
+- the same id inside one book.
+
+Keys are joined with union-find, so A~B by URL and B~C by title puts A, B
+and C in one entry. Chapters come from relatedChapters/relevantChapters and
+the by_chapter/by_section maps. The entry keeps the most complete resource
+object; what each book says about the work (description, why, relation)
+stays in its ref, under "text", when it differs from that object (null
+where the book leaves out a field the object has).
+
+Output shape (compact JSON, loaded by the Brújula de Recursos):
+    {"version": 1, "books": [...],
+     "resources": [{"key", "kind", "urls",
+                    "refs": [{"book", "id", "category", "chapters", "text"?}],
+                    "resource": {...}}],
+     "lookup": {"<book>": {"<resource id>": <index in resources>}}}
+
+Usage:
+    python3 scripts/build_resource_index.py
+    python3 scripts/build_resource_index.py --show 20   # print merged groups
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from typing import Dict, List, Any
+
+from resource_library import (
+    BOOKS_DIR, REPO_ROOT, canonical_url, chapter_recommendations, fingerprints,
+    iter_book_resources, load_resources, resource_chapters, resource_kind,
+    resource_titles, resource_urls
+)
+
+sys.path.insert(0, str(REPO_ROOT))
+from biblioteca_quizzes import escribir_si_cambia
+from detectar_duplicados_quiz import UnionFind
+
+INDEX_FILE = BOOKS_DIR / 'resources-index.json'
+INDEX_VERSION = 1
+# What a book says about a work, as opposed to what the work is
+PER_BOOK_FIELDS = ('description', 'description_en', 'why', 'relation')
+
+
+def resources_enabled(book_id: str) -> bool:
+    """True unless the book's config.json disables resources."""
+    config_file = BOOKS_DIR / book_id / 'config.json'
+    if not config_file.exists():
+        return True
+    with open(config_file, 'r', encoding='utf-8') as f:
+        resources = json.load(f).get('features', {}).get('resources')
+    return not isinstance(resources, dict) or resources.get('enabled', True)
+
+
+def collect_entries() -> List[Dict[str, Any]]:
+    """Every resource of every book with resources enabled, plus its chapters."""
+    entries = []
+    for book_dir in sorted(p for p in BOOKS_DIR.iterdir() if p.is_dir()):
+        data = load_resources(book_dir.name)
+        if data is None or not resources_enabled(book_dir.name):
+            continue
+        recommended = chapter_recommendations(data)
+        for entry in iter_book_resources(book_dir.name, data=data):
+            resource = entry['resource']
+            chapters = resource_chapters(resource)
+            chapters.extend(c for c in recommended.get(resource['id'], []) if c not in chapters)
+            entry['chapters'] = chapters
+            entries.append(entry)
+    return entries
+
+
+def generic_urls(entries: List[Dict[str, Any]]) -> set:
+    """Canonical URLs that some book uses for more than one resource."""
+    ids_by_url = defaultdict(set)
+    for entry in entries:
+        for _, url in resource_urls(entry['resource']):
+            ids_by_url[(entry['book'], canonical_url(url))].add(entry['resource']['id'])
+    return {url for (_, url), ids in ids_by_url.items() if len(ids) > 1}
+
+
+def group_entries(entries: List[Dict[str, Any]]) -> List[List[int]]:
+    """Indices of 'entries' grouped by shared keys, groups in book order."""
+    skip = generic_urls(entries)
+    groups = UnionFind(len(entries))
+    owner: Dict[str, int] = {}
+
+    for i, entry in enumerate(entries):
+        resource = entry['resource']
+        keys = {f"id:{entry['book']}/{resource['id']}"}
+        keys.update(f"url:{key}" for key in (canonical_url(u) for _, u in resource_urls(resource))
+                    if key not in skip)
+        keys.update(f"fp:{key}" for key in fingerprints(resource, entry['category']))
+        for key in keys:
+            if key in owner:
+                groups.unir(owner[key], i)
+            else:
+                owner[key] = i
+
+    members = defaultdict(list)
+    for i in range(len(entries)):
+        members[groups.buscar(i)].append(i)
+    return [members[root] for root in sorted(members)]
+
+
+def build_index(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    resources = []
+    lookup: Dict[str, Dict[str, int]] = defaultdict(dict)
+
+    for group in group_entries(entries):
+        # The most complete entry (most fields) represents the group
+        main = entries[max(group, key=lambda i: (len(entries[i]['resource']), -i))]
+        resource = main['resource']
+
+        urls, refs = [], []
+        for i in group:
+            entry = entries[i]
+            urls.extend(u for _, u in resource_urls(entry['resource']) if u not in urls)
+            ref = next((r for r in refs if r['book'] == entry['book'] and r['id'] == entry['resource']['id']), None)
+            if ref is None:
+                ref = {'book': entry['book'], 'id': entry['resource']['id'],
+                       'category': entry['category'], 'chapters': list(entry['chapters'])}
+                # null: the book says nothing where the main resource does
+                text = {field: entry['resource'].get(field) for field in PER_BOOK_FIELDS
+                        if entry['resource'].get(field) != resource.get(field)}
+                if text:
+                    ref['text'] = text
+                refs.append(ref)
+            else:
+                ref['chapters'].extend(c for c in entry['chapters'] if c not in ref['chapters'])
+            lookup[entry['book']][entry['resource']['id']] = len(resources)
+
+        resources.append({
+            'key': f"{main['book']}/{resource['id']}",
+            'kind': resource_kind(main['category']),
+            'urls': urls,
+            'refs': refs,
+            'resource': {k: v for k, v in resource.items() if k not in ('relatedChapters', 'relevantChapters')}
+        })
+
+    return {
+        'version': INDEX_VERSION,
+        'books': sorted(lookup),
+        'resources': resources,
+        'lookup': dict(lookup)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the shared resource index of all books')
+    parser.add_argument('--show', type=int, default=0, metavar='N',
+                        help='Print the N resources referenced by most books')
+    args = parser.parse_args()
+
+    print("=== RESOURCE INDEX ===\n")
+    entries = collect_entries()
+    index = build_index(entries)
+    # Compact: the app downloads it as-is
+    changed = escribir_si_cambia(INDEX_FILE, json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    shared = [r for r in index['resources'] if len({ref['book'] for ref in r['refs']}) > 1]
+    for entry in sorted(shared, key=lambda r: -len(r['refs']))[:args.show]:
+        where = ', '.join(f"{ref['book']}/{ref['id']}" for ref in entry['refs'])
+        print(f"  {resource_titles(entry['resource'])[0][:45]:45} {where}")
+
+    print(f"\n{len(entries)} recursos en {len(index['books'])} libros → {len(index['resources'])} únicos "
+          f"({len(shared)} compartidos entre libros)")
+    print(f"{'✓ Índice guardado en' if changed else '✓ Índice sin cambios'}: {INDEX_FILE}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Responsive Image Derivatives for backgrounds and book covers
+
+Every www/assets/backgrounds/*.jpg and www/books/*/assets/cover.jpg is
+resized to the widths in WIDTHS (never upscaled; images narrower than the
+largest step also get one derivative at their own width) and encoded as:
+
+- WebP, for every browser and Android WebView the app supports;
+- AVIF, when this Pillow build has an AVIF encoder (smaller again);
+- progressive JPEG, as the fallback <img src>.
+
+Derivatives go to a responsive/ directory next to the source, named
+<stem>-<width>.<ext>, and are listed in www/assets/responsive-images.json,
+keyed by the source path relative to www/ (the same string the catalog uses
+in coverImage), so the frontend can build <picture>/srcset from it:
+
+    {"version": 1, "formats": ["avif", "webp", "jpeg"],
+     "images": {"assets/backgrounds/vitruvio.jpg": {
+         "width": 1400, "height": 1903,
+         "sources": {"webp": {"type": "image/webp",
+                              "srcset": "assets/backgrounds/responsive/vitruvio-480.webp 480w, ..."},
+                     ...},
+         "fallback": "assets/backgrounds/responsive/vitruvio-960.jpg"}}}
+
+Sources are encoded in a process pool. The SHA-256 of each source (plus
+the encoder settings) is kept in .cache/responsive-images.json, so only new
+or changed images are re-encoded, and files are only rewritten when their
+bytes change (escribir_si_cambia).
+
+Usage:
+    python3 scripts/build_responsive_images.py
+    python3 scripts/build_responsive_images.py --force
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from PIL import Image, ImageCms, ImageOps, features
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+from biblioteca_quizzes import escribir_si_cambia, escribir_json_si_cambia
+
+WWW_DIR = REPO_ROOT / 'www'
+SOURCES = ('assets/backgrounds/*.jpg', 'books/*/assets/cover.jpg')
+MANIFEST_FILE = WWW_DIR / 'assets' / 'responsive-images.json'
+MANIFEST_VERSION = 1
+CACHE_FILE = REPO_ROOT / '.cache' / 'responsive-images.json'
+OUTPUT_DIR = 'responsive'
+
+WIDTHS = (480, 960, 1600)
+# Width of the JPEG used as <img src> (the closest one at or below it)
+FALLBACK_WIDTH = 960
+
+# Format: (extension, MIME type, Pillow save options); best first in <picture>
+ENCODERS = {
+    'avif': ('avif', 'image/avif', {'quality': 60, 'speed': 6}),
+    'webp': ('webp', 'image/webp', {'quality': 80, 'method': 6}),
+    'jpeg': ('jpg', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True})
+}
+FORMATS = [name for name in ENCODERS if name != 'avif' or features.check('avif')]
+# Bump when the derivatives change for the same source and encoder settings
+PIPELINE_VERSION = 2
+
+# ICC colour space (bytes 16-19 of the profile header) of each image mode
+PROFILE_SPACES = {'L': 'GRAY', 'RGB': 'RGB'}
+
+
+def source_files() -> List[Path]:
+    return sorted(path for pattern in SOURCES for path in WWW_DIR.glob(pattern))
+
+
+def web_path(path: Path) -> str:
+    return path.relative_to(WWW_DIR).as_posix()
+
+
+def target_widths(width: int) -> List[int]:
+    """Steps of WIDTHS narrower than 'width', then 'width' itself capped at the largest step."""
+    return [step for step in WIDTHS if step < min(width, WIDTHS[-1])] + [min(width, WIDTHS[-1])]
+
+
+def output_file(source: Path, width: int, fmt: str) -> Path:
+    return source.parent / OUTPUT_DIR / f'{source.stem}-{width}.{ENCODERS[fmt][0]}'
+
+
+def source_hash(data: bytes) -> str:
+    digest = hashlib.sha256(json.dumps([PIPELINE_VERSION, WIDTHS, FORMATS, ENCODERS], sort_keys=True).encode())
+    digest.update(data)
+    return digest.hexdigest()[:16]
+
+
+def profile_space(icc_profile: Optional[bytes]) -> Optional[str]:
+    """Colour space of an ICC profile ('RGB', 'GRAY', 'CMYK', ...), from its header."""
+    if not icc_profile or len(icc_profile) < 20:
+        return None
+    return icc_profile[16:20].decode('ascii', 'replace').strip()
+
+
+def gray_to_srgb(image: Image.Image, icc_profile: Optional[bytes]) -> Image.Image:
+    """Grayscale image as sRGB, through its GRAY profile when it has one."""
+    if profile_space(icc_profile) == 'GRAY':
+        try:
+            source = ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+            return ImageCms.profileToProfile(image, source, ImageCms.createProfile('sRGB'), outputMode='RGB')
+        except ImageCms.PyCMSError:
+            pass
+    return image.convert('RGB')
+
+
+def encode(image: Image.Image, fmt: str, icc_profile: Optional[bytes]) -> bytes:
+    buffer = io.BytesIO()
+    options = dict(ENCODERS[fmt][2])
+    if fmt != 'jpeg' and image.mode == 'L':
+        # WebP/AVIF have no grayscale mode in Pillow; untagged output is read as sRGB
+        image, icc_profile = gray_to_srgb(image, icc_profile), None
+    # A profile for another colour space (GRAY on RGB, CMYK after converting) would be misapplied
+    if icc_profile and profile_space(icc_profile) == PROFILE_SPACES.get(image.mode):
+        options['icc_profile'] = icc_profile
+    image.save(buffer, fmt.upper(), **options)
+    return buffer.getvalue()
+
+
+def build_image(path: str) -> Dict[str, Any]:
+    """Write every derivative of one source; its size and the bytes of each derivative by format and width."""
+    source = Path(path)
+    with Image.open(source) as original:
+        icc_profile = original.info.get('icc_profile')
+        # Apply the EXIF orientation: derivatives carry no EXIF
+        image = ImageOps.exif_transpose(original)
+        image = image.convert('L' if image.mode in ('1', 'L') else 'RGB')
+
+    sizes = {fmt: {} for fmt in FORMATS}
+    changed = 0
+    for width in target_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in FORMATS:
+            data = encode(resized, fmt, icc_profile)
+            sizes[fmt][width] = len(data)
+            changed += escribir_si_cambia(output_file(source, width, fmt), data)
+
+    return {'path': path, 'width': image.width, 'height': image.height, 'sizes': sizes, 'changed': changed}
+
+
+def manifest_entry(source: Path, width: int, height: int) -> Dict[str, Any]:
+    widths = target_widths(width)
+    sources = {}
+    for fmt in FORMATS:
+        srcset = ', '.join(f'{web_path(output_file(source, w, fmt))} {w}w' for w in widths)
+        sources[fmt] = {'type': ENCODERS[fmt][1], 'srcset': srcset}
+    fallback = max((w for w in widths if w <= FALLBACK_WIDTH), default=widths[0])
+    return {
+        'width': width,
+        'height': height,
+        'sources': sources,
+        'fallback': web_path(output_file(source, fallback, 'jpeg'))
+    }
+
+
+def load_cache() -> Dict[str, Any]:
+    if CACHE_FILE.exists():
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def build_all(force: bool = False, jobs: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Encode the new or changed sources and rewrite the manifest; results of the encoded ones."""
+    cache = load_cache()
+    sources = source_files()
+    hashes = {web_path(path): source_hash(path.read_bytes()) for path in sources}
+
+    def fresh(path: Path) -> bool:
+        entry = cache.get(web_path(path))
+        return (not force and entry is not None and entry['hash'] == hashes[web_path(path)]
+                and all(output_file(path, w, fmt).exists()
+                        for w in target_widths(entry['width']) for fmt in FORMATS))
+
+    stale = [str(path) for path in sources if not fresh(path)]
+    workers = min(len(stale), jobs or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(build_image, stale))
+    else:
+        results = [build_image(path) for path in stale]
+
+    for result in results:
+        cache[web_path(Path(result['path']))] = {
+            'hash': hashes[web_path(Path(result['path']))],
+            'width': result['width'],
+            'height': result['height']
+        }
+    # Forget sources that no longer exist
+    cache = {key: value for key, value in cache.items() if key in hashes}
+
+    images = {key: manifest_entry(WWW_DIR / key, value['width'], value['height'])
+              for key, value in sorted(cache.items())}
+    escribir_json_si_cambia(MANIFEST_FILE, {'version': MANIFEST_VERSION, 'formats': FORMATS, 'images': images})
+    escribir_json_si_cambia(CACHE_FILE, cache)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build WebP/AVIF/JPEG derivatives of backgrounds and covers')
+    parser.add_argument('--force', action='store_true', help='Re-encode even unchanged sources')
+    parser.add_argument('--jobs', type=int, help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = build_all(args.force, args.jobs)
+    for r in results:
+        original = os.path.getsize(r['path'])
+        print(f"  {web_path(Path(r['path']))} ({r['width']}px, {original / 1024:.1f} KB, {r['changed']} escritos)")
+        for fmt, by_width in r['sizes'].items():
+            steps = '  '.join(f"{width}w {size / 1024:6.1f} KB" for width, size in by_width.items())
+            print(f"      {fmt:5} {steps}")
+
+    print(f"\n✓ {len(results)} imágenes procesadas ({len(source_files()) - len(results)} sin cambios), "
+          f"formatos: {', '.join(FORMATS)} en {time.perf_counter() - start:.1f}s")
+    print(f"  Manifiesto: {MANIFEST_FILE.relative_to(REPO_ROOT)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+Resource Link Checker for Colección Nuevo Ser
+
+Checks every http(s) link in the books' resources.json files (available,
+url, website, link, ...) concurrently with asyncio:
+
+- Minimal HTTP/1.1 client on asyncio streams (no extra dependencies) with a
+  keep-alive connection pool per host, a per-host limit and a global limit.
+- HEAD first; servers that reject HEAD get a one-byte ranged GET instead.
+  Redirects are followed (up to MAX_REDIRECTS).
+- ETag / Last-Modified from the previous run are sent back as conditional
+  headers, so unchanged pages answer 304 without a body.
+- Results persist in .cache/resource-links.json; --max-age skips links
+  that were fine recently.
+
+A local stand-in HTTP server (StandInServer) reproduces the cases above
+(HEAD rejected, redirects, 404, chunked bodies, Connection: close, 304) so
+the checker can be verified and benchmarked offline:
+
+    python3 scripts/check_resource_links.py
+    python3 scripts/check_resource_links.py --max-age 24 --strict
+    python3 scripts/check_resource_links.py --self-test
+    python3 scripts/check_resource_links.py --benchmark 500
+"""
+
+import argparse
+import asyncio
+import json
+import ssl
+import sys
+import time
+from email.utils import formatdate
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from resource_library import REPO_ROOT, iter_resources, resource_urls
+
+sys.path.insert(0, str(REPO_ROOT))
+from biblioteca_quizzes import escribir_json_si_cambia
+
+STORE_FILE = REPO_ROOT / '.cache' / 'resource-links.json'
+REPORT_FILE = REPO_ROOT / 'REPORTE-ENLACES-RECURSOS.json'
+
+USER_AGENT = 'ColeccionNuevoSer-LinkChecker/1.0'
+TOTAL_CONCURRENCY = 64
+PER_HOST_CONCURRENCY = 4
+CONNECT_TIMEOUT = 10.0
+REQUEST_TIMEOUT = 15.0
+MAX_REDIRECTS = 5
+# Bodies larger than this are not drained; the connection is dropped instead
+MAX_DRAIN_BYTES = 256 * 1024
+
+# HEAD answers that are trusted without retrying with GET
+HEAD_TRUSTED = {404, 410}
+
+
+class HttpError(Exception):
+    """Malformed or truncated HTTP response."""
+
+
+class Response:
+    """Status line and headers of an HTTP response (header names lower-cased)."""
+
+    def __init__(self, status: int, headers: Dict[str, str]):
+        self.status = status
+        self.headers = headers
+
+
+class HostPool:
+    """Keep-alive connections to one scheme://host:port, at most 'limit' in use."""
+
+    def __init__(self, scheme: str, host: str, port: int, limit: int, ssl_context: ssl.SSLContext):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.semaphore = asyncio.Semaphore(limit)
+        self.idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.ssl_context = ssl_context
+        self.opened = 0
+
+    async def connect(self) -> Tuple[Tuple[asyncio.StreamReader, asyncio.StreamWriter], bool]:
+        """(connection, reused): an idle connection if one is still open, otherwise a new one."""
+        while self.idle:
+            reader, writer = self.idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return (reader, writer), True
+            writer.close()
+
+        self.opened += 1
+        return await asyncio.wait_for(asyncio.open_connection(
+            self.host, self.port,
+            ssl=self.ssl_context if self.scheme == 'https' else None,
+            server_hostname=self.host if self.scheme == 'https' else None
+        ), CONNECT_TIMEOUT), False
+
+    def release(self, connection, reusable: bool):
+        if reusable:
+            self.idle.append(connection)
+        else:
+            connection[1].close()
+
+    async def close(self):
+        idle, self.idle = self.idle, []
+        for _, writer in idle:
+            writer.close()
+        await asyncio.gather(*(writer.wait_closed() for _, writer in idle), return_exceptions=True)
+
+
+async def read_response_head(reader: asyncio.StreamReader) -> Response:
+    status_line = await reader.readline()
+    if not status_line:
+        raise HttpError('connection closed before response')
+    parts = status_line.decode('latin-1').split(' ', 2)
+    if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+        raise HttpError(f'bad status line: {status_line[:60]!r}')
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return Response(int(parts[1]), headers)
+
+
+async def drain_body(reader: asyncio.StreamReader, response: Response, method: str) -> bool:
+    """Consume the response body; returns False if the connection can't be reused."""
+    if method == 'HEAD' or response.status in (204, 304) or 100 <= response.status < 200:
+        return True
+
+    if response.headers.get('transfer-encoding', '').lower() == 'chunked':
+        drained = 0
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+            if size == 0:
+                # Trailers end with an empty line
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return True
+            drained += size
+            if drained > MAX_DRAIN_BYTES:
+                return False
+            await reader.readexactly(size + 2)
+
+    length = response.headers.get('content-length')
+    if length is not None and length.isdigit():
+        if int(length) > MAX_DRAIN_BYTES:
+            return False
+        await reader.readexactly(int(length))
+        return True
+
+    # No framing: the body ends when the server closes the connection
+    return False
+
+
+class LinkChecker:
+    """Checks many URLs with per-host connection pools."""
+
+    def __init__(self, total: int = TOTAL_CONCURRENCY, per_host: int = PER_HOST_CONCURRENCY,
+                 verify_tls: bool = True, request_timeout: float = REQUEST_TIMEOUT):
+        self.semaphore = asyncio.Semaphore(total)
+        self.per_host = per_host
+        self.request_timeout = request_timeout
+        self.pools: Dict[Tuple[str, str, int], HostPool] = {}
+        self.ssl_context = ssl.create_default_context()
+        if not verify_tls:
+            self.ssl_context.check_hostname = False
+            self.ssl_context.verify_mode = ssl.CERT_NONE
+        self.requests = 0
+
+    def pool_for(self, scheme: str, host: str, port: int) -> HostPool:
+        key = (scheme, host, port)
+        if key not in self.pools:
+            self.pools[key] = HostPool(scheme, host, port, self.per_host, self.ssl_context)
+        return self.pools[key]
+
+    @property
+    def connections_opened(self) -> int:
+        return sum(pool.opened for pool in self.pools.values())
+
+    async def close(self):
+        await asyncio.gather(*(pool.close() for pool in self.pools.values()))
+
+    async def request(self, method: str, url: str, headers: Dict[str, str]) -> Response:
+        """One HTTP request over a pooled connection (retried once on a stale connection)."""
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == 'https' else 80)
+        host = parts.hostname or ''
+        pool = self.pool_for(scheme, host, port)
+
+        target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        host_header = parts.netloc.rsplit('@', 1)[-1]
+        lines = [f'{method} {target} HTTP/1.1', f'Host: {host_header}', f'User-Agent: {USER_AGENT}',
+                 'Accept: */*', 'Connection: keep-alive']
+        lines.extend(f'{name}: {value}' for name, value in headers.items())
+        payload = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        # Waiting for a free slot on a busy host is not part of the timeout
+        async with pool.semaphore:
+            return await asyncio.wait_for(self.exchange(pool, method, payload), self.request_timeout)
+
+    async def exchange(self, pool: HostPool, method: str, payload: bytes) -> Response:
+        """Send 'payload' and read the response on a connection of 'pool' (connect and I/O)."""
+        for attempt in range(2):
+            connection, reused = await pool.connect()
+            reader, writer = connection
+            try:
+                self.requests += 1
+                writer.write(payload)
+                await writer.drain()
+                response = await read_response_head(reader)
+                reusable = await drain_body(reader, response, method)
+                reusable = reusable and response.headers.get('connection', '').lower() != 'close'
+                pool.release(connection, reusable)
+                return response
+            except (HttpError, ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                # A kept-alive connection may have been closed by the server: retry once
+                if attempt == 1 or not reused:
+                    raise
+            except BaseException:
+                writer.close()
+                raise
+        raise HttpError('unreachable')
+
+    async def follow(self, method: str, url: str, headers: Dict[str, str]) -> Tuple[Response, str]:
+        """Request following redirects; returns (final response, final URL)."""
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await self.request(method, url, headers)
+            location = response.headers.get('location')
+            if response.status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                # Validators belong to the original URL
+                headers = {k: v for k, v in headers.items() if k not in ('If-None-Match', 'If-Modified-Since')}
+                continue
+            return response, url
+        raise HttpError('too many redirects')
+
+    async def check(self, url: str, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Check one URL; 'previous' is its stored result from the last run."""
+        conditional = {}
+        if previous and previous.get('ok'):
+            if previous.get('etag'):
+                conditional['If-None-Match'] = previous['etag']
+            if previous.get('lastModified'):
+                conditional['If-Modified-Since'] = previous['lastModified']
+
+        started = time.perf_counter()
+        result = {'url': url, 'checkedAt': int(time.time())}
+        async with self.semaphore:
+            try:
+                method = 'HEAD'
+                response, final_url = await self.follow(method, url, conditional)
+                if response.status >= 400 and response.status not in HEAD_TRUSTED:
+                    method = 'GET'
+                    response, final_url = await self.follow(method, url, {**conditional, 'Range': 'bytes=0-0'})
+            except (OSError, HttpError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as error:
+                result.update(ok=False, status=None, error=f'{type(error).__name__}: {error}'.strip(': '))
+                result['elapsedMs'] = round((time.perf_counter() - started) * 1000)
+                return result
+
+        if response.status == 304 and previous:
+            result.update(ok=True, status=previous.get('status'), notModified=True,
+                          finalUrl=previous.get('finalUrl', url),
+                          etag=previous.get('etag'), lastModified=previous.get('lastModified'))
+        else:
+            result.update(ok=200 <= response.status < 400, status=response.status, finalUrl=final_url,
+                          etag=response.headers.get('etag'), lastModified=response.headers.get('last-modified'))
+        result['method'] = method
+        result['elapsedMs'] = round((time.perf_counter() - started) * 1000)
+        return result
+
+    async def check_all(self, urls: List[str], store: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        results = await asyncio.gather(*(self.check(url, store.get(url)) for url in urls))
+        return {result['url']: result for result in results}
+
+
+# ============================================================================
+# STAND-IN SERVER
+# ============================================================================
+
+class StandInServer:
+    """
+    Local HTTP/1.1 server with keep-alive that mimics the behaviours the
+    checker has to handle. Routes:
+
+        /ok/...         200, ETag and Last-Modified; 304 when they match
+        /missing        404
+        /no-head        405 to HEAD, 200 to GET
+        /redirect       301 to /ok/redirected
+        /relative       302 with a relative Location to /ok/relative
+        /chunked        405 to HEAD, chunked 200 to GET
+        /close          200 with Connection: close
+        /slow/...       200 after 'delay' seconds
+    """
+
+    ETAG = '"stand-in-v1"'
+    LAST_MODIFIED = formatdate(0, usegmt=True)
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.connections = 0
+        self.requests = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.port = 0
+
+    async def __aenter__(self) -> 'StandInServer':
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def url(self, path: str) -> str:
+        return f'http://127.0.0.1:{self.port}{path}'
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                self.requests += 1
+                keep_alive = await self.respond(writer, method, path, headers)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.CancelledError):
+            # CancelledError: the server is shutting down with the connection still open
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer: asyncio.StreamWriter, method: str, path: str,
+                      headers: Dict[str, str]) -> bool:
+        def send(status: int, reason: str, extra: Dict[str, str] = None, body: bytes = b''):
+            head = [f'HTTP/1.1 {status} {reason}', f'Content-Length: {len(body)}']
+            head.extend(f'{k}: {v}' for k, v in (extra or {}).items())
+            writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+            if method != 'HEAD':
+                writer.write(body)
+
+        if path.startswith('/slow'):
+            await asyncio.sleep(self.delay)
+            path = '/ok' + path[len('/slow'):]
+
+        if path.startswith('/ok'):
+            validators = {'ETag': self.ETAG, 'Last-Modified': self.LAST_MODIFIED}
+            if headers.get('if-none-match') == self.ETAG or headers.get('if-modified-since') == self.LAST_MODIFIED:
+                send(304, 'Not Modified', validators)
+            else:
+                send(200, 'OK', validators, b'<html>ok</html>')
+        elif path == '/missing':
+            send(404, 'Not Found', body=b'missing')
+        elif path in ('/no-head', '/chunked') and method == 'HEAD':
+            send(405, 'Method Not Allowed')
+        elif path == '/no-head':
+            send(200, 'OK', body=b'x' * 100)
+        elif path == '/chunked':
+            writer.write(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n'
+                         b'5\r\nhello\r\n6\r\n world\r\n0\r\n\r\n')
+        elif path == '/redirect':
+            send(301, 'Moved Permanently', {'Location': self.url('/ok/redirected')})
+        elif path == '/relative':
+            send(302, 'Found', {'Location': '/ok/relative'})
+        elif path == '/close':
+            send(200, 'OK', {'Connection': 'close'}, b'bye')
+            return False
+        else:
+            send(404, 'Not Found')
+        return True
+
+
+async def self_test() -> bool:
+    """Check every stand-in route and the conditional second pass."""
+    expected = {
+        '/ok/a': (True, 200, 'HEAD'), '/missing': (False, 404, 'HEAD'),
+        '/no-head': (True, 200, 'GET'), '/redirect': (True, 200, 'HEAD'),
+        '/relative': (True, 200, 'HEAD'), '/chunked': (True, 200, 'GET'),
+        '/close': (True, 200, 'HEAD'), '/slow/b': (True, 200, 'HEAD'),
+    }
+    async with StandInServer() as server:
+        urls = [server.url(path) for path in expected] + ['http://127.0.0.1:9/refused']
+        checker = LinkChecker()
+        first = await checker.check_all(urls, {})
+        second = await checker.check_all(urls, first)
+        await checker.close()
+
+    passed = True
+    for path, (ok, status, method) in expected.items():
+        result = first[server.url(path)]
+        good = (result['ok'], result['status'], result['method']) == (ok, status, method)
+        passed &= good
+        print(f"  {'✓' if good else '✗'} {path:12} → {result['status']} via {result['method']}")
+
+    refused = first['http://127.0.0.1:9/refused']
+    passed &= not refused['ok'] and refused['status'] is None
+    print(f"  {'✓' if not refused['ok'] else '✗'} connection refused → {refused.get('error')}")
+
+    # Only the routes that send validators themselves can answer 304
+    not_modified = {path for path in expected if second[server.url(path)].get('notModified')}
+    good = not_modified == {'/ok/a', '/slow/b'} and all(second[server.url(p)]['ok'] for p in not_modified)
+    passed &= good
+    print(f"  {'✓' if good else '✗'} second pass: {len(not_modified)} answered 304 Not Modified")
+
+    # Links queued behind a busy host wait longer than the timeout, but each request is quick
+    async with StandInServer(delay=0.2) as server:
+        urls = [server.url(f'/slow/{i}') for i in range(4 * PER_HOST_CONCURRENCY)]
+        checker = LinkChecker(request_timeout=0.5)
+        queued = await checker.check_all(urls, {})
+        await checker.close()
+    good = all(result['ok'] for result in queued.values())
+    passed &= good
+    print(f"  {'✓' if good else '✗'} {len(urls)} links on one busy host: "
+          f"{sum(r['ok'] for r in queued.values())} ok, none timed out while queued")
+    return passed
+
+
+async def benchmark(count: int, hosts: int = 8, delay: float = 0.05):
+    """Check 'count' slow URLs spread over 'hosts' stand-in servers."""
+    servers = [StandInServer(delay) for _ in range(hosts)]
+    for server in servers:
+        await server.__aenter__()
+    try:
+        urls = [servers[i % hosts].url(f'/slow/{i}') for i in range(count)]
+        checker = LinkChecker()
+        started = time.perf_counter()
+        results = await checker.check_all(urls, {})
+        elapsed = time.perf_counter() - started
+        await checker.close()
+    finally:
+        for server in servers:
+            await server.__aexit__()
+
+    serial = count * delay
+    print(f"{count} URLs on {hosts} hosts ({delay * 1000:.0f} ms each): {elapsed:.2f}s "
+          f"(serial would be ≥{serial:.1f}s)")
+    print(f"  requests: {checker.requests}, connections opened: {checker.connections_opened}, "
+          f"ok: {sum(r['ok'] for r in results.values())}")
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def load_store() -> Dict[str, Dict[str, Any]]:
+    if STORE_FILE.exists():
+        with open(STORE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def collect_links() -> Dict[str, List[Dict[str, str]]]:
+    """Unique URL -> every resource that references it."""
+    links: Dict[str, List[Dict[str, str]]] = {}
+    for entry in iter_resources():
+        for field, url in resource_urls(entry['resource']):
+            links.setdefault(url, []).append({
+                'book': entry['book'], 'id': entry['resource'].get('id'),
+                'category': entry['category'], 'field': field
+            })
+    return links
+
+
+async def check_library(max_age_hours: float, verify_tls: bool) -> Tuple[Dict, Dict, int]:
+    links = collect_links()
+    store = load_store()
+    now = time.time()
+    to_check = [
+        url for url in links
+        if not (store.get(url, {}).get('ok') and now - store[url].get('checkedAt', 0) < max_age_hours * 3600)
+    ]
+
+    checker = LinkChecker(verify_tls=verify_tls)
+    try:
+        store.update(await checker.check_all(to_check, store))
+    finally:
+        await checker.close()
+    return links, store, len(to_check)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the links of every resources.json')
+    parser.add_argument('--max-age', type=float, default=0,
+                        help='Skip links that were OK less than this many hours ago')
+    parser.add_argument('--strict', action='store_true', help='Exit with code 1 if any link is broken')
+    parser.add_argument('--insecure', action='store_true', help='Do not verify TLS certificates')
+    parser.add_argument('--self-test', action='store_true', help='Run against the local stand-in server')
+    parser.add_argument('--benchmark', type=int, metavar='N', help='Benchmark N URLs on stand-in servers')
+    args = parser.parse_args()
+
+    if args.self_test:
+        sys.exit(0 if asyncio.run(self_test()) else 1)
+    if args.benchmark:
+        asyncio.run(benchmark(args.benchmark))
+        return
+
+    print("=== RESOURCE LINK CHECK ===\n")
+    started = time.perf_counter()
+    links, store, checked = asyncio.run(check_library(args.max_age, not args.insecure))
+    elapsed = time.perf_counter() - started
+
+    escribir_json_si_cambia(STORE_FILE, dict(sorted(store.items())))
+
+    broken = {url: {**store[url], 'references': refs} for url, refs in links.items() if not store[url]['ok']}
+    escribir_json_si_cambia(REPORT_FILE, {
+        'links': len(links), 'checked': checked, 'broken': len(broken), 'results': broken
+    })
+
+    for url, result in sorted(broken.items()):
+        where = ', '.join(f"{r['book']}/{r['id']}" for r in result['references'])
+        print(f"✗ {result['status'] or result.get('error')}  {url}  ({where})")
+
+    print(f"\n{len(links)} enlaces únicos, {checked} comprobados en {elapsed:.1f}s, {len(broken)} rotos")
+    print(f"✓ Reporte guardado en: {REPORT_FILE}")
+
+    if args.strict and broken:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
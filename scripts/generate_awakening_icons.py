@@ -4,18 +4,7 @@ Generate Android launcher icons for Awakening Protocol flavor.
 Tech-cyber style: deep blue/purple background, cyan glow, eye + circuit pattern.
 """
 
-from PIL import Image, ImageDraw, ImageFilter
-import os
-
-BASE_PATH = "mobile-game/mobile-app/android/app/src/awakening/res"
-
-SIZES = {
-    "mdpi": 48,
-    "hdpi": 72,
-    "xhdpi": 96,
-    "xxhdpi": 144,
-    "xxxhdpi": 192
-}
+from icon_render import Canvas, round_icon
 
 # Awakening color scheme - tech/cyber
 COLOR_BG_TOP = "#0a0f1a"
@@ -28,54 +17,19 @@ COLOR_NODE = "#67e8f9"
 COLOR_ACCENT = "#f59e0b"
 
 
-def hex_to_rgb(hex_color):
-    hex_color = hex_color.lstrip("#")
-    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-
-
-def lerp(a, b, t):
-    return int(a + (b - a) * t)
-
-
-def lerp_color(c1, c2, t):
-    r1, g1, b1 = hex_to_rgb(c1)
-    r2, g2, b2 = hex_to_rgb(c2)
-    return (lerp(r1, r2, t), lerp(g1, g2, t), lerp(b1, b2, t))
-
-
-def draw_vertical_gradient(size, top_color, bottom_color):
-    img = Image.new("RGB", (size, size), top_color)
-    draw = ImageDraw.Draw(img)
-    for y in range(size):
-        t = y / (size - 1)
-        color = lerp_color(top_color, bottom_color, t)
-        draw.line([(0, y), (size, y)], fill=color)
-    return img
-
-
 def create_eye_icon(size):
-    base = draw_vertical_gradient(size, COLOR_BG_TOP, COLOR_BG_BOTTOM).convert("RGBA")
-
-    # Soft glow
-    glow = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-    glow_draw = ImageDraw.Draw(glow)
-    glow_radius = int(size * 0.35)
+    canvas = Canvas(size)
+    canvas.vertical_gradient(COLOR_BG_TOP, COLOR_BG_BOTTOM)
     center = (size // 2, size // 2)
-    glow_draw.ellipse(
-        [center[0] - glow_radius, center[1] - glow_radius,
-         center[0] + glow_radius, center[1] + glow_radius],
-        fill=(59, 130, 246, 50)
-    )
-    glow = glow.filter(ImageFilter.GaussianBlur(radius=int(size * 0.08)))
-    base = Image.alpha_composite(base, glow)
 
-    draw = ImageDraw.Draw(base)
+    # Soft glow
+    canvas.glow(center, int(size * 0.35), int(size * 0.08), (59, 130, 246, 50))
 
     # Outer ring
     ring_margin = int(size * 0.10)
-    draw.ellipse(
+    canvas.ellipse(
         [ring_margin, ring_margin, size - ring_margin, size - ring_margin],
-        outline=hex_to_rgb(COLOR_RING),
+        outline=COLOR_RING,
         width=max(2, int(size * 0.03))
     )
 
@@ -88,28 +42,28 @@ def create_eye_icon(size):
         center[0] + eye_w // 2,
         center[1] + eye_h // 2
     ]
-    draw.ellipse(eye_box, fill=hex_to_rgb(COLOR_EYE_OUTER), outline=hex_to_rgb(COLOR_EYE_INNER), width=max(1, int(size * 0.02)))
+    canvas.ellipse(eye_box, fill=COLOR_EYE_OUTER, outline=COLOR_EYE_INNER, width=max(1, int(size * 0.02)))
 
     # Iris
     iris_r = int(size * 0.12)
-    draw.ellipse(
+    canvas.ellipse(
         [center[0] - iris_r, center[1] - iris_r,
          center[0] + iris_r, center[1] + iris_r],
-        fill=hex_to_rgb(COLOR_EYE_INNER)
+        fill=COLOR_EYE_INNER
     )
 
     # Pupil
     pupil_r = int(size * 0.06)
-    draw.ellipse(
+    canvas.ellipse(
         [center[0] - pupil_r, center[1] - pupil_r,
          center[0] + pupil_r, center[1] + pupil_r],
-        fill=hex_to_rgb(COLOR_PUPIL)
+        fill=COLOR_PUPIL
     )
 
     # Light reflection
     ref_r = int(size * 0.025)
     ref_offset = int(size * 0.03)
-    draw.ellipse(
+    canvas.ellipse(
         [center[0] - ref_offset - ref_r, center[1] - ref_offset - ref_r,
          center[0] - ref_offset + ref_r, center[1] - ref_offset + ref_r],
         fill=(255, 255, 255, 200)
@@ -124,52 +78,39 @@ def create_eye_icon(size):
         (center[0] - int(size * 0.22), center[1] + int(size * 0.20))
     ]
     for node in nodes:
-        draw.ellipse(
+        canvas.ellipse(
             [node[0] - node_radius, node[1] - node_radius,
              node[0] + node_radius, node[1] + node_radius],
-            fill=hex_to_rgb(COLOR_NODE),
-            outline=hex_to_rgb(COLOR_ACCENT),
-            width=1
+            fill=COLOR_NODE,
+            outline=COLOR_ACCENT,
+            width=max(1, size / 192)
         )
 
     # Circuit lines
     line_width = max(1, int(size * 0.015))
-    draw.line([(center[0] + int(size * 0.20), center[1]), nodes[0]], fill=hex_to_rgb(COLOR_NODE), width=line_width)
-    draw.line([(center[0] - int(size * 0.20), center[1]), nodes[1]], fill=hex_to_rgb(COLOR_NODE), width=line_width)
-    draw.line([(center[0] + int(size * 0.15), center[1] + int(size * 0.10)), nodes[2]], fill=hex_to_rgb(COLOR_NODE), width=line_width)
-    draw.line([(center[0] - int(size * 0.12), center[1] + int(size * 0.12)), nodes[3]], fill=hex_to_rgb(COLOR_NODE), width=line_width)
+    canvas.line((center[0] + int(size * 0.20), center[1]), nodes[0], COLOR_NODE, line_width)
+    canvas.line((center[0] - int(size * 0.20), center[1]), nodes[1], COLOR_NODE, line_width)
+    canvas.line((center[0] + int(size * 0.15), center[1] + int(size * 0.10)), nodes[2], COLOR_NODE, line_width)
+    canvas.line((center[0] - int(size * 0.12), center[1] + int(size * 0.12)), nodes[3], COLOR_NODE, line_width)
 
-    return base
+    return canvas.to_image()
 
 
-def main():
-    # Change to project root
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(script_dir)
-    os.chdir(project_root)
+def variants(size):
+    """Launcher, round and foreground icons at 'size' px, by file name."""
+    icon = create_eye_icon(size)
+    return {
+        "ic_launcher": icon,
+        "ic_launcher_round": round_icon(icon),
+        # Same icon, it already carries its alpha
+        "ic_launcher_foreground": icon
+    }
 
-    for density, size in SIZES.items():
-        output_dir = os.path.join(BASE_PATH, f"mipmap-{density}")
-        os.makedirs(output_dir, exist_ok=True)
 
-        icon = create_eye_icon(size)
-        icon.save(os.path.join(output_dir, "ic_launcher.png"), "PNG")
-
-        # Round icon
-        round_icon = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-        mask = Image.new("L", (size, size), 0)
-        mask_draw = ImageDraw.Draw(mask)
-        mask_draw.ellipse([0, 0, size - 1, size - 1], fill=255)
-        round_icon.paste(icon, (0, 0), mask)
-        round_icon.save(os.path.join(output_dir, "ic_launcher_round.png"), "PNG")
-
-        # Foreground icon (same icon on transparent bg)
-        fg = icon.copy()
-        fg.putalpha(icon.split()[-1])
-        fg.save(os.path.join(output_dir, "ic_launcher_foreground.png"), "PNG")
-
-        print(f"✓ Awakening icons generated for {density} ({size}x{size})")
+def main():
+    from build_icons import build_flavors
 
+    build_flavors(["awakening"])
     print("✓ All Awakening Protocol icons generated")
 
 
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Visual Regression and Benchmark Harness for the launcher icon designs
+
+Renders every design (create_library_icon, create_eye_icon,
+create_leaf_icon) once at build_icons.MASTER_SIZE and reduces it to every
+density of build_icons.SIZES with build_icons.downsample(), the same path
+the shipped icons take, and checks two things:
+
+- Pixels: each render is compared with its golden image in
+  scripts/icon-goldens/ (<design>-<size>.png, stored losslessly) in
+  premultiplied RGBA, so colour under fully transparent pixels doesn't
+  count. A pixel differs when any channel is off by more than TOLERANCE
+  (0-255); a render regresses when more than MAX_CHANGED of its pixels
+  differ.
+- Time: each master render and each downsample is repeated (after a
+  warm-up run) and the median is compared with the median stored for this machine in
+  .cache/icon-timings.json; it regresses when it is more than
+  TIME_TOLERANCE slower and at least MIN_SLOWDOWN_MS in absolute terms.
+  Timings depend on the machine, so they are not kept in the repository.
+
+The table lists every design/size, and the report (REPORTE-ICONOS.json)
+the same rows. The exit status is 1 if anything regressed.
+
+Usage:
+    python3 scripts/icon_regression.py                 # compare
+    python3 scripts/icon_regression.py --update        # accept the current output as golden
+    python3 scripts/icon_regression.py eye --runs 10   # one design, more repetitions
+"""
+
+import argparse
+import importlib
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional
+
+import numpy as np
+from PIL import Image
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+from biblioteca_quizzes import escribir_si_cambia, escribir_json_si_cambia
+from build_icons import MASTER_SIZE, SIZES, downsample
+from optimize_pngs import optimize_image, premultiplied
+
+GOLDEN_DIR = SCRIPTS_DIR / 'icon-goldens'
+TIMINGS_FILE = REPO_ROOT / '.cache' / 'icon-timings.json'
+REPORT_FILE = REPO_ROOT / 'REPORTE-ICONOS.json'
+
+# Design: (module, function)
+DESIGNS = {
+    'library': ('generate_icons', 'create_library_icon'),
+    'eye': ('generate_awakening_icons', 'create_eye_icon'),
+    'leaf': ('generate_trascendencia_icons', 'create_leaf_icon')
+}
+DENSITY_SIZES = sorted(set(SIZES.values()))
+
+# Largest per-channel difference (premultiplied, 0-255) still counted as equal
+TOLERANCE = 2
+# Fraction of differing pixels a render may have
+MAX_CHANGED = 0.0
+RUNS = 5
+TIME_TOLERANCE = 0.25
+MIN_SLOWDOWN_MS = 1.0
+
+
+def design_function(design: str) -> Callable[[int], Image.Image]:
+    module, function = DESIGNS[design]
+    return getattr(importlib.import_module(module), function)
+
+
+def golden_file(design: str, size: int) -> Path:
+    return GOLDEN_DIR / f'{design}-{size}.png'
+
+
+def time_call(function: Callable[[], Image.Image], runs: int):
+    """(image, median ms, fastest ms) of 'runs' calls after a warm-up."""
+    image = function()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return image, statistics.median(times), min(times)
+
+
+def timed_renders(render: Callable[[int], Image.Image], runs: int):
+    """(size, step, image, median ms, fastest ms) of every density and of the master."""
+    master, median_ms, fastest_ms = time_call(lambda: render(MASTER_SIZE), runs)
+    for size in DENSITY_SIZES:
+        yield (size, 'downsample') + time_call(lambda: downsample(master, size), runs)
+    yield MASTER_SIZE, 'render', master, median_ms, fastest_ms
+
+
+def compare(image: Image.Image, golden: Image.Image) -> Dict[str, Any]:
+    """Pixel differences between a render and its golden image."""
+    if image.size != golden.size:
+        return {'max_diff': 255, 'changed': image.width * image.height, 'changed_fraction': 1.0}
+    diff = np.abs(premultiplied(image) - premultiplied(golden)).max(axis=2)
+    changed = int(np.count_nonzero(diff > TOLERANCE))
+    return {
+        'max_diff': int(diff.max()),
+        'changed': changed,
+        'changed_fraction': changed / diff.size
+    }
+
+
+def run(designs: List[str], runs: int = RUNS, update: bool = False) -> List[Dict[str, Any]]:
+    """One row per design and size; goldens and timings are rewritten if 'update'."""
+    timings = {}
+    if TIMINGS_FILE.exists():
+        with open(TIMINGS_FILE, 'r', encoding='utf-8') as f:
+            timings = json.load(f)
+
+    rows = []
+    for design in designs:
+        for size, step, image, median_ms, fastest_ms in timed_renders(design_function(design), runs):
+            key = f'{design}-{step}-{size}'
+            row = {'design': design, 'size': size, 'step': step,
+                   'ms': round(median_ms, 2), 'fastest_ms': round(fastest_ms, 2)}
+
+            golden = golden_file(design, size)
+            if update:
+                # Lossless only: a golden must keep every pixel
+                escribir_si_cambia(golden, optimize_image(image, max_error_allowed=0)[0])
+            if golden.exists():
+                with Image.open(golden) as reference:
+                    row.update(compare(image, reference))
+                row['pixels_ok'] = row['changed_fraction'] <= MAX_CHANGED
+            else:
+                row['pixels_ok'] = None
+
+            baseline = timings.get(key)
+            if update or baseline is None:
+                timings[key] = row['ms']
+                baseline = row['ms']
+            row['baseline_ms'] = baseline
+            slowdown = row['ms'] - baseline
+            row['time_ok'] = not (slowdown > baseline * TIME_TOLERANCE and slowdown >= MIN_SLOWDOWN_MS)
+            rows.append(row)
+
+    escribir_json_si_cambia(TIMINGS_FILE, timings)
+    return rows
+
+
+def print_table(rows: List[Dict[str, Any]]):
+    print(f"  {'diseño':8} {'px':>5}  {'máx Δ':>6} {'píxeles Δ':>15}  {'ms':>8} {'base':>8} {'Δ%':>7}  estado")
+    for row in rows:
+        if row['pixels_ok'] is None:
+            pixels = f"{'-':>6} {'sin golden':>15}"
+        else:
+            pixels = f"{row['max_diff']:>6} {row['changed']:>7} {row['changed_fraction']:>7.2%}"
+        change = (row['ms'] - row['baseline_ms']) / max(row['baseline_ms'], 1e-9)
+        problems = [label for label, ok in (('píxeles', row['pixels_ok']), ('tiempo', row['time_ok'])) if ok is False]
+        status = '✗ ' + ', '.join(problems) if problems else '✓'
+        print(f"  {row['design']:8} {row['size']:>5}  {pixels}  {row['ms']:>8.2f} {row['baseline_ms']:>8.2f} "
+              f"{change:>+7.0%}  {status}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Compare the icon designs with their golden images and timings')
+    parser.add_argument('designs', nargs='*', metavar='DESIGN',
+                        help=f"Designs to check ({', '.join(DESIGNS)}); all by default")
+    parser.add_argument('--update', action='store_true',
+                        help='Store the current renders as golden and their timings as baseline')
+    parser.add_argument('--runs', type=int, default=RUNS, help=f'Timed repetitions per render (default {RUNS})')
+    args = parser.parse_args(argv)
+    unknown = [design for design in args.designs if design not in DESIGNS]
+    if unknown:
+        parser.error(f"unknown design: {', '.join(unknown)}")
+
+    rows = run(args.designs or list(DESIGNS), args.runs, args.update)
+    print_table(rows)
+    escribir_json_si_cambia(REPORT_FILE, {'tolerance': TOLERANCE, 'time_tolerance': TIME_TOLERANCE, 'rows': rows})
+
+    pixel_regressions = sum(row['pixels_ok'] is False for row in rows)
+    time_regressions = sum(not row['time_ok'] for row in rows)
+    missing = sum(row['pixels_ok'] is None for row in rows)
+    print(f"\n{len(rows)} renders: {pixel_regressions} con cambios de píxeles, {time_regressions} más lentos"
+          + (f", {missing} sin golden (usa --update)" if missing else ""))
+    print(f"Informe: {REPORT_FILE}")
+    return 1 if pixel_regressions or time_regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
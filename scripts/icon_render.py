@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+NumPy rendering core for the launcher icon generators.
+
+A Canvas is one planar float32 RGBA array (4 × size × size, straight
+alpha, 0..1); per-channel planes keep every operation on contiguous memory,
+several times faster than strided access into interleaved RGBA. Gradients
+are built as a single broadcast column, shapes (ellipses, rings, rotated
+ellipses, line segments) as antialiased coverage masks from their distance
+to the pixel centres, and glows as a Gaussian-blurred disc (a 1-D radial
+profile looked up by distance). Every layer is composited "over" the canvas
+in place and only inside its bounding box, or only on the pixels it touches
+for thin shapes, so a layer costs an array the size of the shape instead of
+a full-size RGBA image, a blur and a copy.
+
+Coordinates follow ImageDraw: ellipse boxes are [x0, y0, x1, y1] with x1/y1
+inclusive, line endpoints are pixel coordinates, and rotation angles are
+degrees counter-clockwise like Image.rotate().
+"""
+
+import math
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Below this fraction of painted pixels in its box a layer is composited sparsely
+SPARSE_FRACTION = 0.35
+
+
+@lru_cache(maxsize=None)
+def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
+    hex_color = hex_color.lstrip("#")
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+
+def rgba(color) -> np.ndarray:
+    """Hex string or (r, g, b[, a]) tuple as a float32 RGBA vector in 0..1."""
+    if isinstance(color, str):
+        color = hex_to_rgb(color)
+    values = tuple(color) + (255,) * (4 - len(color))
+    return np.array(values, dtype=np.float32) / 255
+
+
+def blurred_disc_profile(radius: float, sigma: float, length: int) -> np.ndarray:
+    """
+    Value of a unit disc blurred with a Gaussian of 'sigma' at distances
+    0..length-1 from its centre. The blur is separable and the disc's
+    vertical blur has a closed form (erf of the chord half-height over
+    sigma·√2), so only a 1-D convolution is left.
+    """
+    offsets = np.arange(-length + 1, length, dtype=np.float64)
+    chord = np.sqrt(np.clip(radius ** 2 - offsets ** 2, 0, None))
+    columns = np.array([math.erf(h / (sigma * math.sqrt(2))) for h in chord])
+    kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+    kernel /= kernel.sum()
+    blurred = np.convolve(columns, kernel, mode='same')
+    return blurred[length - 1:].astype(np.float32)
+
+
+def lookup(profile: np.ndarray, distance: np.ndarray) -> np.ndarray:
+    """Linear interpolation of a radial 'profile' (one sample per pixel) at 'distance'."""
+    index = np.minimum(distance, len(profile) - 1.001).astype(np.int32)
+    values = profile[index]
+    values += (profile[index + 1] - values) * (distance - index)
+    return values
+
+
+def ellipse_distance(xs, ys, cx, cy, rx, ry, angle=0.0, pivot=None):
+    """
+    Approximate signed distance (pixels, negative inside) from each pixel
+    centre to an ellipse, optionally rotated 'angle' degrees CCW about 'pivot'.
+    """
+    dx, dy = xs - cx, ys - cy
+    if angle:
+        px, py = pivot if pivot is not None else (cx, cy)
+        theta = np.radians(angle)
+        # Undo the rotation: measure against the unrotated ellipse
+        ox, oy = xs - px, ys - py
+        dx = ox * np.cos(theta) - oy * np.sin(theta) + px - cx
+        dy = ox * np.sin(theta) + oy * np.cos(theta) + py - cy
+    # Normalised radius r (1 on the ellipse) over the length of its gradient:
+    # exact for circles and along the axes, and stable far from the edge
+    radius = np.sqrt((dx / rx) ** 2 + (dy / ry) ** 2)
+    slope = np.sqrt((dx / rx ** 2) ** 2 + (dy / ry ** 2) ** 2)
+    scale = np.divide(radius, slope, out=np.full_like(radius, min(rx, ry)), where=slope > 0)
+    return (radius - 1) * scale
+
+
+def ellipse_coverage(xs, ys, cx, cy, rx, ry, angle=0.0, pivot=None):
+    """Antialiased coverage of an ellipse, optionally rotated 'angle' degrees CCW about 'pivot'."""
+    if rx <= 0 or ry <= 0:
+        return np.zeros(np.broadcast(xs, ys).shape, dtype=np.float32)
+    return np.clip(0.5 - ellipse_distance(xs, ys, cx, cy, rx, ry, angle, pivot), 0, 1).astype(np.float32)
+
+
+class Canvas:
+    """Square float32 RGBA canvas; every drawing method composites in place."""
+
+    def __init__(self, size: int, background=None):
+        self.size = size
+        self.pixels = np.zeros((4, size, size), dtype=np.float32)
+        # True once every pixel has alpha 1 (opaque background or gradient)
+        self.opaque = False
+        if background is not None:
+            self.pixels[:] = rgba(background)[:, None, None]
+            self.opaque = bool(self.pixels[3, 0, 0] == 1)
+
+    def _window(self, x0: float, y0: float, x1: float, y1: float, pad: float = 1.0):
+        """Pixel slices covering [x0, x1] × [y0, y1] (continuous coords) plus 'pad', and their centres."""
+        left, top = max(0, int(np.floor(x0 - pad))), max(0, int(np.floor(y0 - pad)))
+        right, bottom = min(self.size, int(np.ceil(x1 + pad))), min(self.size, int(np.ceil(y1 + pad)))
+        if left >= right or top >= bottom:
+            return None
+        ys = np.arange(top, bottom, dtype=np.float32)[:, None] + 0.5
+        xs = np.arange(left, right, dtype=np.float32)[None, :] + 0.5
+        return (slice(top, bottom), slice(left, right)), xs, ys
+
+    def composite(self, region, coverage: np.ndarray, color, opacity: float = 1.0,
+                  shade: Optional[np.ndarray] = None):
+        """
+        Paint 'color' over the canvas inside 'region' with per-pixel 'coverage';
+        'shade' (per pixel, 0..1) scales the colour towards black.
+        """
+        paint = rgba(color)
+        alpha = coverage * (paint[3] * opacity)
+        target = self.pixels[(slice(None),) + region]
+        # Less than half an 8-bit step never shows in the output
+        painted = alpha >= 0.5 / 255
+        sparse = np.count_nonzero(painted) < SPARSE_FRACTION * painted.size
+        if sparse:
+            # Rings, strokes and glows touch few pixels of their box: work on those only
+            alpha, pixels = alpha[painted], target[:, painted]
+            if shade is not None:
+                shade = shade[painted]
+        else:
+            pixels = target
+
+        if self.opaque:
+            # Over an opaque canvas the result stays opaque: a plain lerp
+            weight = alpha
+        else:
+            out_alpha = alpha + pixels[3] * (1 - alpha)
+            # Straight alpha: weight the destination colour by what shows through
+            weight = np.divide(alpha, out_alpha, out=np.zeros_like(alpha), where=out_alpha > 0)
+            pixels[3] = out_alpha
+        for channel in range(3):
+            plane = pixels[channel]
+            value = paint[channel] if shade is None else paint[channel] * shade
+            plane += (value - plane) * weight
+
+        if sparse:
+            target[:, painted] = pixels
+
+    def vertical_gradient(self, top_color, bottom_color):
+        """Replace the canvas with an opaque top-to-bottom gradient."""
+        top, bottom = rgba(top_color) * 255, rgba(bottom_color) * 255
+        t = np.linspace(0, 1, self.size)[:, None]
+        # Same 8-bit steps as interpolating integer channels per row
+        column = np.floor(top + (bottom - top) * t + 1e-6) / 255
+        self.pixels[:] = column.T[:, :, None].astype(np.float32)
+        self.opaque = bool((column[:, 3] == 1).all())
+
+    @staticmethod
+    def _box_geometry(box: Sequence[float]):
+        x0, y0, x1, y1 = box
+        return (x0 + x1 + 1) / 2, (y0 + y1 + 1) / 2, (x1 - x0 + 1) / 2, (y1 - y0 + 1) / 2
+
+    def ellipse(self, box: Sequence[float], fill=None, outline=None, width: float = 1,
+                angle: float = 0.0, pivot: Optional[Tuple[float, float]] = None, opacity: float = 1.0):
+        """Filled and/or outlined ellipse in 'box'; the outline is drawn inside the box like ImageDraw."""
+        cx, cy, rx, ry = self._box_geometry(box)
+        reach = max(rx, ry)
+        if angle and pivot is not None:
+            reach += np.hypot(cx - pivot[0], cy - pivot[1])
+            cx_w, cy_w = pivot
+        else:
+            cx_w, cy_w = cx, cy
+        window = self._window(cx_w - reach, cy_w - reach, cx_w + reach, cy_w + reach)
+        if window is None:
+            return
+        region, xs, ys = window
+        if fill is not None:
+            self.composite(region, ellipse_coverage(xs, ys, cx, cy, rx, ry, angle, pivot), fill, opacity)
+        if outline is not None and width > 0:
+            # A band of 'width' around the ellipse halfway between the box and the inner edge
+            half = min(width, rx, ry) / 2
+            middle = ellipse_distance(xs, ys, cx, cy, rx - half, ry - half, angle, pivot)
+            band = np.clip(half + 0.5 - np.abs(middle), 0, 1).astype(np.float32)
+            self.composite(region, band, outline, opacity)
+
+    def line(self, start: Tuple[float, float], end: Tuple[float, float], color, width: float = 1):
+        """Straight segment with flat ends, 'width' pixels wide."""
+        (x0, y0), (x1, y1) = (start[0] + 0.5, start[1] + 0.5), (end[0] + 0.5, end[1] + 0.5)
+        half = width / 2
+        window = self._window(min(x0, x1) - half, min(y0, y1) - half, max(x0, x1) + half, max(y0, y1) + half)
+        if window is None:
+            return
+        region, xs, ys = window
+        length = max(np.hypot(x1 - x0, y1 - y0), 1e-6)
+        ux, uy = (x1 - x0) / length, (y1 - y0) / length
+        along = (xs - x0) * ux + (ys - y0) * uy
+        across = np.abs((xs - x0) * -uy + (ys - y0) * ux)
+        coverage = (np.clip(half - across + 0.5, 0, 1)
+                    * np.clip(np.minimum(along, length - along) + 0.5, 0, 1))
+        self.composite(region, coverage.astype(np.float32), color)
+
+    def glow(self, center: Tuple[float, float], radius: float, blur: float, color, opacity: float = 1.0):
+        """
+        Disc of 'radius' blurred with a Gaussian of standard deviation 'blur'
+        (GaussianBlur radius). Like GaussianBlur on a straight-alpha layer, the
+        colour is blurred against the transparent black around the disc, so
+        it darkens towards the edge as the alpha fades.
+        """
+        cx, cy = center[0] + 0.5, center[1] + 0.5
+        # Same disc as ImageDraw's [c - radius, c + radius] box, which spans 2·radius + 1 pixels
+        radius += 0.5
+        reach = radius + 3 * blur
+        window = self._window(cx - reach, cy - reach, cx + reach, cy + reach)
+        if window is None:
+            return
+        region, xs, ys = window
+        distance = np.sqrt((xs - cx) ** 2 + (ys - cy) ** 2)
+        if blur > 0:
+            coverage = lookup(blurred_disc_profile(radius, blur, int(distance.max()) + 2), distance)
+        else:
+            coverage = ellipse_coverage(xs, ys, cx, cy, radius, radius)
+        self.composite(region, coverage, color, opacity, shade=coverage)
+
+    def to_image(self) -> Image.Image:
+        """Canvas as an 8-bit RGBA PIL image."""
+        pixels = np.empty((self.size, self.size, 4), dtype=np.uint8)
+        for channel in range(4):
+            pixels[..., channel] = self.pixels[channel] * 255 + 0.5
+        return Image.fromarray(pixels, "RGBA")
+
+
+def circle_mask(size: int) -> np.ndarray:
+    """Antialiased coverage of the circle inscribed in a size × size square."""
+    centres = np.arange(size, dtype=np.float32) + 0.5
+    return ellipse_coverage(centres[None, :], centres[:, None], size / 2, size / 2, size / 2, size / 2)
+
+
+def round_icon(icon: Image.Image) -> Image.Image:
+    """'icon' clipped to its inscribed circle (ic_launcher_round)."""
+    pixels = np.asarray(icon.convert("RGBA")).copy()
+    alpha = pixels[..., 3].astype(np.float32) * circle_mask(icon.width)
+    pixels[..., 3] = np.rint(alpha).astype(np.uint8)
+    return Image.fromarray(pixels, "RGBA")
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+PNG Optimizer for launcher and web icons
+
+Re-encodes every mipmap-*/ launcher icon under android/ (and the flavor res
+directories of build_icons.py, when present) and every PNG in
+www/assets/icons at the smallest size that still looks the same:
+
+- Lossless reductions first: fully opaque images lose their alpha channel,
+  gray images become L/LA, and images with at most 256 colours become an
+  exact palette (with tRNS for alpha).
+- Palette quantization (256 colours, no dithering) is tried too, and kept
+  only if every decoded pixel stays within MAX_ERROR of the original in
+  premultiplied RGBA, so transparent pixels' colours don't count and
+  semi-transparent ones count in proportion to their alpha.
+- Each candidate is compressed at zlib level 9 with every strategy
+  (default, filtered, huffman-only, RLE) and the smallest wins.
+- Metadata is dropped (text, ICC, gAMA/cHRM, dpi, time); 16-bit files are
+  written at 8 bits, which is what Pillow decodes them to anyway.
+
+A file is only replaced when the result is smaller. Files are processed in
+a process pool; the report lists bytes saved per file and in total.
+
+Usage:
+    python3 scripts/optimize_pngs.py              # optimize in place
+    python3 scripts/optimize_pngs.py --dry-run    # report only
+    python3 scripts/optimize_pngs.py path/to/icon.png other/dir
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+from biblioteca_quizzes import escribir_si_cambia
+
+WEB_ICONS_DIR = REPO_ROOT / 'www' / 'assets' / 'icons'
+# Largest per-channel error (0-255, premultiplied) a lossy palette may introduce
+MAX_ERROR = 6
+# zlib strategies: default, filtered, huffman only, RLE
+STRATEGIES = (0, 1, 2, 3)
+
+
+def default_targets() -> List[Path]:
+    """Launcher icons of every Android res directory plus the web icons."""
+    from build_icons import FLAVORS
+
+    res_dirs = [REPO_ROOT / spec['res'] for spec in FLAVORS.values()]
+    res_dirs.extend(p for p in (REPO_ROOT / 'android' / 'app' / 'src').glob('*/res') if p not in res_dirs)
+    files = [png for res in res_dirs if res.is_dir() for png in sorted(res.glob('mipmap-*/*.png'))]
+    files.extend(sorted(WEB_ICONS_DIR.glob('*.png')))
+    return files
+
+
+def expand(paths: List[Path]) -> Iterator[Path]:
+    for path in paths:
+        if path.is_dir():
+            yield from sorted(path.rglob('*.png'))
+        elif path.suffix.lower() == '.png':
+            yield path
+
+
+def premultiplied(image: Image.Image) -> np.ndarray:
+    """RGBA pixels as int16 with the colour channels multiplied by alpha (0-255)."""
+    pixels = np.asarray(image.convert('RGBA'), dtype=np.int32)
+    out = pixels.copy()
+    out[..., :3] = (pixels[..., :3] * pixels[..., 3:] + 127) // 255
+    return out.astype(np.int16)
+
+
+def max_error(reference: np.ndarray, candidate: Image.Image) -> int:
+    """Largest premultiplied per-channel difference between 'reference' and 'candidate'."""
+    return int(np.abs(premultiplied(candidate) - reference).max())
+
+
+def exact_palette(image: Image.Image) -> Optional[Image.Image]:
+    """The image as a P-mode image with the same pixels, if it has at most 256 colours."""
+    pixels = np.asarray(image.convert('RGBA'))
+    colours, indices = np.unique(pixels.reshape(-1, 4), axis=0, return_inverse=True)
+    if len(colours) > 256:
+        return None
+    # Opaque entries last, so tRNS only needs the translucent ones
+    order = np.argsort(colours[:, 3] == 255, kind='stable')
+    remap = np.empty(len(order), dtype=np.uint8)
+    remap[order] = np.arange(len(order), dtype=np.uint8)
+    colours = colours[order]
+
+    paletted = Image.fromarray(remap[indices.reshape(pixels.shape[:2])], 'P')
+    paletted.putpalette(colours[:, :3].tobytes())
+    translucent = colours[colours[:, 3] < 255, 3]
+    if len(translucent):
+        paletted.info['transparency'] = translucent.tobytes()
+    return paletted
+
+
+def candidates(image: Image.Image) -> Iterator[Tuple[str, Image.Image, bool]]:
+    """(label, image, lossless) encodings worth trying for 'image'."""
+    rgba = image.convert('RGBA')
+    pixels = np.asarray(rgba)
+    opaque = bool((pixels[..., 3] == 255).all())
+    gray = bool((pixels[..., 0] == pixels[..., 1]).all() and (pixels[..., 1] == pixels[..., 2]).all())
+
+    base = rgba.convert('RGB') if opaque else rgba
+    yield ('RGB' if opaque else 'RGBA'), base, True
+    if gray:
+        yield ('L' if opaque else 'LA'), base.convert('L' if opaque else 'LA'), True
+
+    paletted = exact_palette(rgba)
+    if paletted is not None:
+        yield 'P exact', paletted, True
+    else:
+        method = Image.Quantize.MEDIANCUT if opaque else Image.Quantize.FASTOCTREE
+        yield 'P 256', base.quantize(256, method=method, dither=Image.Dither.NONE), False
+
+
+def smallest_encoding(image: Image.Image) -> Tuple[bytes, int]:
+    """Smallest PNG bytes of 'image' over STRATEGIES, and the winning strategy."""
+    best, best_strategy = None, 0
+    for strategy in STRATEGIES:
+        buffer = io.BytesIO()
+        # Passing icc_profile=None keeps Pillow from copying it from im.info
+        image.save(buffer, 'PNG', optimize=True, compress_level=9, compress_type=strategy, icc_profile=None)
+        data = buffer.getvalue()
+        if best is None or len(data) < len(best):
+            best, best_strategy = data, strategy
+    return best, best_strategy
+
+
+def optimize_image(image: Image.Image, max_error_allowed: int = MAX_ERROR) -> Tuple[bytes, str]:
+    """Smallest acceptable PNG encoding of 'image' and a label of how it was obtained."""
+    reference = premultiplied(image)
+    best, label = None, ''
+    for name, candidate, lossless in candidates(image):
+        data, strategy = smallest_encoding(candidate)
+        if best is not None and len(data) >= len(best):
+            continue
+        if not lossless and max_error(reference, Image.open(io.BytesIO(data))) > max_error_allowed:
+            continue
+        best, label = data, f'{name}, z{strategy}'
+    return best, label
+
+
+def optimize_file(path: str, dry_run: bool = False, max_error_allowed: int = MAX_ERROR) -> Dict[str, Any]:
+    """Optimize one PNG in place (unless dry_run); sizes before and after."""
+    original = Path(path).read_bytes()
+    with Image.open(io.BytesIO(original)) as image:
+        image.load()
+        data, label = optimize_image(image, max_error_allowed)
+
+    keep = len(data) >= len(original)
+    if not keep and not dry_run:
+        escribir_si_cambia(Path(path), data)
+    return {
+        'path': path,
+        'before': len(original),
+        'after': len(original) if keep else len(data),
+        'method': 'sin cambios' if keep else label
+    }
+
+
+def optimize_files(paths: List[Path], dry_run: bool = False, jobs: Optional[int] = None,
+                   max_error_allowed: int = MAX_ERROR) -> List[Dict[str, Any]]:
+    paths = [str(p) for p in paths]
+    workers = min(len(paths), jobs or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(optimize_file, paths, [dry_run] * len(paths),
+                                 [max_error_allowed] * len(paths), chunksize=4))
+    return [optimize_file(p, dry_run, max_error_allowed) for p in paths]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shrink launcher and web icon PNGs')
+    parser.add_argument('paths', nargs='*', type=Path, help='PNG files or directories (default: all icons)')
+    parser.add_argument('--dry-run', action='store_true', help='Report savings without writing')
+    parser.add_argument('--max-error', type=int, default=MAX_ERROR,
+                        help=f'Largest per-channel error for palette quantization (default {MAX_ERROR})')
+    parser.add_argument('--jobs', type=int, help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    files = list(expand(args.paths)) if args.paths else default_targets()
+    start = time.perf_counter()
+    results = optimize_files(files, args.dry_run, args.jobs, args.max_error)
+
+    for r in results:
+        saved = r['before'] - r['after']
+        name = os.path.relpath(r['path'], REPO_ROOT)
+        print(f"  {name[:62]:62} {r['before']:>8} → {r['after']:>8}  -{saved / r['before']:5.1%}  {r['method']}")
+
+    before = sum(r['before'] for r in results)
+    after = sum(r['after'] for r in results)
+    print(f"\n{len(results)} PNG: {before:,} → {after:,} bytes ({before - after:,} ahorrados, "
+          f"{(before - after) / max(before, 1):.1%}) en {time.perf_counter() - start:.1f}s"
+          + (" [simulación]" if args.dry_run else ""))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Ambient Loop Preparation for the AudioMixer soundscapes
+
+The tracks in www/assets/audio/ambient/ are whole recordings (forest.mp3
+alone is 2.3 MB) that the mixer fetches completely and loops. This tool
+cuts each one down to a short seamless loop at a lower bitrate:
+
+1. Decode to float PCM: with ffmpeg when it is on the PATH (any format),
+   or with the standard wave module for 8/16/24/32-bit PCM .wav files.
+2. Find the loop: after LEAD_IN (skipping fade-ins), the first
+   MATCH_SECONDS of the loop are cross-correlated (FFT, normalised by the
+   sliding energy) against every possible end point between
+   LOOP_SECONDS[0] and LOOP_SECONDS[1] later; the best match is where the
+   loop wraps, and an equal-power crossfade of CROSSFADE_SECONDS blends the
+   audio that follows the end into the start, so the wrap is continuous.
+3. Normalise loudness: gated RMS (the gating of ITU-R BS.1770, without its
+   K-weighting filter) is brought to TARGET_DB, limited so the sample peak
+   stays under PEAK_DB.
+4. Encode with ffmpeg (MP3 at BITRATE, with the LAME header browsers use for
+   gapless playback) or as 16-bit WAV when ffmpeg is missing or --wav is
+   given.
+5. Index the bytes: the offset of the first frame at every SEEK_STEP
+   seconds and the bytes needed for the first START_SECONDS, so the client
+   can fetch that range first and start playing before the rest arrives.
+
+Loops go to www/assets/audio/ambient/loops/ with an index.json:
+    {"version": 1, "tracks": {"forest": {
+        "file": "assets/audio/ambient/loops/forest.mp3", "bytes", "duration",
+        "sample_rate", "channels", "rms_db", "gain_db",
+        "loop": {"start", "end", "correlation"},
+        "start_bytes", "seek": [[seconds, byte offset], ...]}}}
+
+Tracks are processed in a process pool; a hash of each source and the
+settings is kept in .cache/ambient-loops.json so unchanged tracks are
+skipped.
+
+Usage:
+    python3 scripts/prepare_ambient_loops.py
+    python3 scripts/prepare_ambient_loops.py forest.mp3 rain.mp3 --bitrate 64k
+    python3 scripts/prepare_ambient_loops.py /tmp/test.wav --wav --out /tmp/loops
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+from biblioteca_quizzes import escribir_si_cambia, escribir_json_si_cambia
+
+WWW_DIR = REPO_ROOT / 'www'
+AMBIENT_DIR = WWW_DIR / 'assets' / 'audio' / 'ambient'
+LOOPS_DIR = AMBIENT_DIR / 'loops'
+INDEX_VERSION = 1
+# Bump when the encoded loops change for the same settings
+PIPELINE_VERSION = 2
+CACHE_FILE = REPO_ROOT / '.cache' / 'ambient-loops.json'
+
+SAMPLE_RATE = 44100
+CHANNELS = 2
+BITRATE = '96k'
+# Shortest and longest loop (seconds)
+LOOP_SECONDS = (20.0, 40.0)
+LEAD_IN = 1.0
+MATCH_SECONDS = 0.5
+CROSSFADE_SECONDS = 0.25
+# Loudness target (gated RMS) and sample peak ceiling, dBFS
+TARGET_DB = -20.0
+PEAK_DB = -1.0
+# Block size and gates of the loudness measurement (BS.1770)
+LOUDNESS_BLOCK = 0.4
+ABSOLUTE_GATE_DB = -70.0
+RELATIVE_GATE_DB = -10.0
+SEEK_STEP = 1.0
+START_SECONDS = 3.0
+
+
+def db(value: float) -> float:
+    return float(20 * np.log10(max(value, 1e-10)))
+
+
+# ---------------------------------------------------------------------------
+# Decoding and encoding
+# ---------------------------------------------------------------------------
+
+def has_ffmpeg() -> bool:
+    return shutil.which('ffmpeg') is not None
+
+
+def read_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """(channels × samples float32 in -1..1, sample rate) of a PCM WAV file."""
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 3:
+        # Little-endian 24-bit: pad each sample to 32 bits in the top bytes
+        triples = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((len(triples), 4), dtype=np.uint8)
+        padded[:, 1:] = triples
+        samples = padded.view('<i4').ravel().astype(np.float32) / 2 ** 31
+    else:
+        dtype = {2: '<i2', 4: '<i4'}[width]
+        samples = np.frombuffer(raw, dtype=dtype).astype(np.float32) / 2 ** (8 * width - 1)
+    return samples.reshape(-1, channels).T.copy(), rate
+
+
+def write_wav(samples: np.ndarray, rate: int) -> bytes:
+    """16-bit PCM WAV bytes of a channels × samples float array."""
+    pcm = np.clip(np.rint(samples.T * 32767), -32768, 32767).astype('<i2')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(samples.shape[0])
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def decode(path: Path) -> Tuple[np.ndarray, int]:
+    """Samples (channels × samples float32) and sample rate of an audio file."""
+    if path.suffix.lower() == '.wav' and not has_ffmpeg():
+        return read_wav(path.read_bytes())
+    if not has_ffmpeg():
+        raise RuntimeError(f'hace falta ffmpeg para decodificar {path.name}')
+    # Raw float samples: a WAV written to a pipe has no sizes in its header
+    result = subprocess.run(['ffmpeg', '-v', 'error', '-i', str(path), '-f', 'f32le', '-ac', str(CHANNELS),
+                             '-ar', str(SAMPLE_RATE), '-'], capture_output=True, check=True)
+    samples = np.frombuffer(result.stdout, dtype='<f4').reshape(-1, CHANNELS).T.copy()
+    return samples, SAMPLE_RATE
+
+
+def encode(samples: np.ndarray, rate: int, fmt: str, bitrate: str) -> bytes:
+    """Encoded bytes of 'samples' as 'mp3' (ffmpeg) or 'wav'."""
+    pcm = write_wav(samples, rate)
+    if fmt == 'wav':
+        return pcm
+    # ffmpeg writes the Xing/LAME header (frame count, encoder delay and padding,
+    # needed for gapless looping) by seeking back to the start, which a pipe can't do
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / 'loop.mp3'
+        subprocess.run(['ffmpeg', '-v', 'error', '-f', 'wav', '-i', '-', '-codec:a', 'libmp3lame',
+                        '-b:a', bitrate, '-id3v2_version', '0', '-write_xing', '1', '-f', 'mp3', str(target)],
+                       input=pcm, capture_output=True, check=True)
+        return target.read_bytes()
+
+
+# ---------------------------------------------------------------------------
+# Analysis
+# ---------------------------------------------------------------------------
+
+def gated_rms_db(samples: np.ndarray, rate: int) -> float:
+    """Gated RMS level in dBFS: BS.1770 absolute and relative gates over 400 ms blocks."""
+    block = max(1, int(LOUDNESS_BLOCK * rate))
+    count = samples.shape[1] // block
+    if count == 0:
+        return db(float(np.sqrt(np.mean(samples ** 2))))
+    power = (samples[:, :count * block] ** 2).reshape(samples.shape[0], count, block).mean(axis=(0, 2))
+    gated = power[power > 10 ** (ABSOLUTE_GATE_DB / 10)]
+    if len(gated) == 0:
+        return ABSOLUTE_GATE_DB
+    gated = gated[gated > gated.mean() * 10 ** (RELATIVE_GATE_DB / 10)]
+    return float(10 * np.log10(gated.mean()))
+
+
+def find_loop(samples: np.ndarray, rate: int) -> Tuple[int, int, float]:
+    """
+    (start, end, correlation) of the best loop: the end whose following
+    MATCH_SECONDS look most like the loop's first MATCH_SECONDS.
+    """
+    mono = samples.mean(axis=0).astype(np.float64)
+    match = int(MATCH_SECONDS * rate)
+    # The crossfade reads past the end, so leave room for it
+    tail = max(match, int(CROSSFADE_SECONDS * rate))
+    shortest, longest = (int(seconds * rate) for seconds in LOOP_SECONDS)
+
+    start = int(LEAD_IN * rate)
+    if start + shortest + tail > len(mono):
+        # Short recording: loop all of it, ending anywhere in its second half
+        start = 0
+        shortest = len(mono) // 2
+    longest = min(longest, len(mono) - tail - start)
+    if longest < shortest or shortest < match:
+        raise ValueError(f'pista demasiado corta ({len(mono) / rate:.1f}s)')
+
+    template = mono[start:start + match]
+    region = mono[start + shortest:start + longest + match]
+    size = 1 << int(np.ceil(np.log2(len(region) + match)))
+    # Correlation of the template at every offset of the region in one FFT
+    correlation = np.fft.irfft(np.fft.rfft(region, size) * np.conj(np.fft.rfft(template, size)), size)
+    correlation = correlation[:len(region) - match + 1]
+    energy = np.concatenate(([0.0], np.cumsum(region ** 2)))
+    window_energy = energy[match:] - energy[:-match]
+    scores = correlation / np.sqrt(np.maximum(window_energy * np.dot(template, template), 1e-20))
+
+    best = int(np.argmax(scores))
+    return start, start + shortest + best, float(scores[best])
+
+
+def crossfaded_loop(samples: np.ndarray, start: int, end: int, rate: int) -> np.ndarray:
+    """samples[start:end] with what follows 'end' faded out over its first CROSSFADE_SECONDS."""
+    loop = samples[:, start:end].copy()
+    fade = min(int(CROSSFADE_SECONDS * rate), loop.shape[1] // 2)
+    # Equal power: the two halves are only partly correlated
+    t = np.linspace(0, np.pi / 2, fade, dtype=np.float32)
+    loop[:, :fade] = loop[:, :fade] * np.sin(t) + samples[:, end:end + fade] * np.cos(t)
+    return loop
+
+
+def normalize(samples: np.ndarray, rate: int) -> Tuple[np.ndarray, float, float]:
+    """'samples' at TARGET_DB gated RMS (peak-limited to PEAK_DB); with the level and gain in dB."""
+    level = gated_rms_db(samples, rate)
+    peak = float(np.abs(samples).max())
+    gain = min(TARGET_DB - level, PEAK_DB - db(peak))
+    return samples * np.float32(10 ** (gain / 20)), level, gain
+
+
+# ---------------------------------------------------------------------------
+# Byte-range index
+# ---------------------------------------------------------------------------
+
+MP3_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+}
+MP3_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def mp3_frames(data: bytes) -> List[Tuple[int, float]]:
+    """(byte offset, start time) of every MPEG Layer III audio frame in 'data'."""
+    pos = 0
+    if data[:3] == b'ID3':
+        size = data[6:10]
+        pos = 10 + (size[0] << 21 | size[1] << 14 | size[2] << 7 | size[3])
+
+    frames, elapsed, first = [], 0.0, True
+    while pos + 4 <= len(data):
+        header = int.from_bytes(data[pos:pos + 4], 'big')
+        version, layer = (header >> 19) & 3, (header >> 17) & 3
+        bitrate_index, rate_index = (header >> 12) & 15, (header >> 10) & 3
+        if header >> 21 != 0x7FF or version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+            pos += 1
+            continue
+        rate = MP3_RATES[version][rate_index]
+        bitrate = MP3_BITRATES[1 if version == 3 else 2][bitrate_index] * 1000
+        samples = 1152 if version == 3 else 576
+        length = samples // 8 * bitrate // rate + ((header >> 9) & 1)
+        # The first frame may be the Xing/Info header, which holds no audio
+        is_header = first and (b'Xing' in data[pos:pos + 64] or b'Info' in data[pos:pos + 64])
+        first = False
+        if is_header:
+            pos += length
+            continue
+        frames.append((pos, elapsed))
+        elapsed += samples / rate
+        pos += length
+    return frames
+
+
+def byte_index(data: bytes, fmt: str, rate: int, samples: np.ndarray) -> Dict[str, Any]:
+    """Bytes for the first START_SECONDS and the offset of every SEEK_STEP seconds."""
+    steps = np.arange(0, samples.shape[1] / rate, SEEK_STEP)
+    if fmt == 'wav':
+        block_align = 2 * samples.shape[0]
+        header = len(data) - samples.shape[1] * block_align
+
+        def offset(seconds):
+            return header + int(seconds * rate) * block_align
+    else:
+        frames = mp3_frames(data)
+        starts = np.array([time for _, time in frames])
+
+        def offset(seconds):
+            i = int(np.searchsorted(starts, seconds - 1e-9))
+            return frames[i][0] if i < len(frames) else len(data)
+
+    return {
+        'start_bytes': min(len(data), offset(START_SECONDS)),
+        'seek': [[round(float(t), 3), offset(t)] for t in steps]
+    }
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+def prepare_track(path: str, out_dir: str, fmt: str, bitrate: str) -> Dict[str, Any]:
+    """Loop, normalise, encode and index one track."""
+    source = Path(path)
+    samples, rate = decode(source)
+    start, end, correlation = find_loop(samples, rate)
+    loop, level, gain = normalize(crossfaded_loop(samples, start, end, rate), rate)
+    data = encode(loop, rate, fmt, bitrate)
+
+    target = Path(out_dir) / f'{source.stem}.{fmt}'
+    changed = escribir_si_cambia(target, data)
+    duration = loop.shape[1] / rate
+    entry = {
+        'bytes': len(data),
+        'duration': round(duration, 3),
+        'sample_rate': rate,
+        'channels': int(loop.shape[0]),
+        'rms_db': round(level, 2),
+        'gain_db': round(gain, 2),
+        'loop': {'start': round(start / rate, 3), 'end': round(end / rate, 3),
+                 'correlation': round(correlation, 3)},
+        **byte_index(data, fmt, rate, loop)
+    }
+    return {'name': source.stem, 'source': path, 'target': str(target), 'changed': changed, 'entry': entry}
+
+
+def settings_hash(data: bytes, fmt: str, bitrate: str) -> str:
+    digest = hashlib.sha256(json.dumps([
+        INDEX_VERSION, PIPELINE_VERSION, fmt, bitrate, SAMPLE_RATE, CHANNELS, LOOP_SECONDS, LEAD_IN, MATCH_SECONDS,
+        CROSSFADE_SECONDS, TARGET_DB, PEAK_DB, SEEK_STEP, START_SECONDS
+    ]).encode())
+    digest.update(data)
+    return digest.hexdigest()[:16]
+
+
+def default_sources() -> List[Path]:
+    return sorted(p for p in AMBIENT_DIR.iterdir() if p.suffix.lower() in ('.mp3', '.wav'))
+
+
+def file_ref(path: Path) -> str:
+    """Path as the frontend sees it (relative to www/) when it is inside www/."""
+    path = path.resolve()
+    return path.relative_to(WWW_DIR).as_posix() if path.is_relative_to(WWW_DIR) else str(path)
+
+
+def prepare_all(sources: List[Path], out_dir: Path = LOOPS_DIR, fmt: Optional[str] = None,
+                bitrate: str = BITRATE, force: bool = False, jobs: Optional[int] = None) -> Dict[str, Any]:
+    """Prepare the stale 'sources' and update out_dir/index.json; the results and skipped tracks."""
+    fmt = fmt or ('mp3' if has_ffmpeg() else 'wav')
+    if fmt == 'mp3' and not has_ffmpeg():
+        raise SystemExit('✗ Hace falta ffmpeg para codificar MP3 (usa --wav para la ruta sin códec)')
+    if not has_ffmpeg():
+        skipped = [p for p in sources if p.suffix.lower() != '.wav']
+        sources = [p for p in sources if p.suffix.lower() == '.wav']
+    else:
+        skipped = []
+    if not sources:
+        return {'results': [], 'skipped': skipped, 'format': fmt}
+
+    index_file = out_dir / 'index.json'
+    index = {'version': INDEX_VERSION, 'tracks': {}}
+    if index_file.exists():
+        with open(index_file, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    cache = {}
+    if CACHE_FILE.exists():
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+
+    hashes = {str(p.resolve()): settings_hash(p.read_bytes(), fmt, bitrate) for p in sources}
+    stale = [path for path, digest in hashes.items()
+             if force or cache.get(path) != digest
+             or Path(path).stem not in index['tracks']
+             or not (out_dir / f'{Path(path).stem}.{fmt}').exists()]
+
+    workers = min(len(stale), jobs or os.cpu_count() or 1)
+    args = ([str(out_dir)] * len(stale), [fmt] * len(stale), [bitrate] * len(stale))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(prepare_track, stale, *args))
+    else:
+        results = list(map(prepare_track, stale, *args))
+
+    for result in results:
+        index['tracks'][result['name']] = {'file': file_ref(Path(result['target'])), **result['entry']}
+        cache[result['source']] = hashes[result['source']]
+    index['tracks'] = dict(sorted(index['tracks'].items()))
+    escribir_json_si_cambia(index_file, index)
+    escribir_json_si_cambia(CACHE_FILE, cache)
+    return {'results': results, 'skipped': skipped, 'format': fmt}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cut the ambient tracks into short seamless loops')
+    parser.add_argument('sources', nargs='*', type=Path,
+                        help='Tracks (names inside the ambient folder or paths); all by default')
+    parser.add_argument('--out', type=Path, default=LOOPS_DIR, help='Output folder for loops and index.json')
+    parser.add_argument('--wav', action='store_true', help='Write 16-bit WAV instead of MP3 (no ffmpeg needed)')
+    parser.add_argument('--bitrate', default=BITRATE, help=f'MP3 bitrate (default {BITRATE})')
+    parser.add_argument('--force', action='store_true', help='Process even unchanged tracks')
+    parser.add_argument('--jobs', type=int, help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    sources = [s if s.exists() else AMBIENT_DIR / s for s in args.sources] or default_sources()
+    missing = [str(s) for s in sources if not s.exists()]
+    if missing:
+        parser.error(f"no existe: {', '.join(missing)}")
+
+    start = time.perf_counter()
+    outcome = prepare_all(sources, args.out, 'wav' if args.wav else None, args.bitrate, args.force, args.jobs)
+    for result in outcome['results']:
+        entry = result['entry']
+        before = os.path.getsize(result['source'])
+        print(f"  {result['name']:12} {before / 1024:8.1f} KB → {entry['bytes'] / 1024:7.1f} KB  "
+              f"bucle {entry['loop']['start']:.2f}–{entry['loop']['end']:.2f}s "
+              f"(r={entry['loop']['correlation']:.2f})  {entry['rms_db']:+.1f} dB → {entry['gain_db']:+.1f} dB  "
+              f"inicio {entry['start_bytes'] / 1024:.1f} KB")
+    for path in outcome['skipped']:
+        print(f"  ⚠ {path.name}: hace falta ffmpeg para decodificarlo")
+    print(f"\n✓ {len(outcome['results'])} bucles ({outcome['format']}) en {args.out} "
+          f"en {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,80 +2,200 @@
 """
 Resource Finder System for Colección Nuevo Ser
 Extracts chapter themes and generates search queries for resources.
+
+Theme extraction runs in a process pool (one book per task) and is cached
+per book in .cache/resource-themes.json, keyed by a hash of book.json, so
+re-running after editing only resources.json recomputes coverage without
+re-extracting any themes.
+
+Key concepts are ranked by TF-IDF against the whole library
+(conceptos_clave.py), so they are computed in one pass over all books
+rather than per book, and feed both the search queries and the gap report.
+The same corpus scores existing resources against the chapters
+(resource_relevance.py), so gap chapters also list resources of the book
+that look relevant but don't link to them yet. The concepts and the corpus
+depend on every book.json, so they are cached in .cache/resource-concepts.json
+and .cache/resource-corpus.npz under a hash of all of them; each book's
+suggestions are cached there too under that hash plus the book's
+resources.json, so editing one resources.json only re-scores that book.
 """
 
+import hashlib
 import json
 import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+
+# Shared helpers from the repository root (corpus_libros.py, biblioteca_quizzes.py)
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+from biblioteca_quizzes import escribir_si_cambia, escribir_json_si_cambia
+from conceptos_clave import CorpusConceptos, construir_corpus
+from corpus_libros import cargar_libro
+from resource_relevance import score_library, suggest_links
 
 BOOKS_DIR = Path('/home/josu/Documentos/guiaIT/25-11-25-version/coleccion-nuevo-ser/www/books')
 
+THEMES_CACHE_FILE = REPO_ROOT / '.cache' / 'resource-themes.json'
+# Bump when extract_chapter_themes() changes its output
+THEMES_VERSION = 2
+
+CONCEPTS_CACHE_FILE = REPO_ROOT / '.cache' / 'resource-concepts.json'
+CORPUS_CACHE_FILE = REPO_ROOT / '.cache' / 'resource-corpus.npz'
+# Bump when the concepts or the link suggestions change their output
+CONCEPTS_VERSION = 2
+
+CHAPTER_CONCEPTS = 8
+BOOK_CONCEPTS = 4
+
 def extract_chapter_themes(book_id: str) -> Dict[str, Dict]:
-    """Extract key themes and concepts from each chapter."""
-    book_file = BOOKS_DIR / book_id / 'book.json'
+    """Extract the structure of each chapter (concepts come from add_key_concepts)."""
+    book = cargar_libro(BOOKS_DIR / book_id / 'book.json')
 
-    if not book_file.exists():
+    if book is None:
         return {}
 
-    with open(book_file, 'r', encoding='utf-8') as f:
-        book = json.load(f)
-
     chapters = {}
 
-    for section in book.get('sections', []):
-        section_title = section.get('title', '')
-
-        for chapter in section.get('chapters', []):
-            cap_id = chapter.get('id', '')
-            cap_title = chapter.get('title', '')
-            content = chapter.get('content', '')
-            epigraph_obj = chapter.get('epigraph') or {}
-            epigraph = epigraph_obj.get('text', '') if isinstance(epigraph_obj, dict) else ''
-
-            # Extract key concepts (words in bold or headers)
-            bold_concepts = re.findall(r'\*\*([^*]+)\*\*', content)
-            headers = re.findall(r'###?\s*([^\n]+)', content)
-
-            # Extract key terms (capitalized phrases, technical terms)
-            key_terms = set()
-            for concept in bold_concepts[:10]:  # Limit to 10
-                if len(concept) > 3:
-                    key_terms.add(concept.strip())
-
-            chapters[cap_id] = {
-                'title': cap_title,
-                'section': section_title,
-                'epigraph': epigraph[:200] if epigraph else '',
-                'key_concepts': list(key_terms)[:8],
-                'headers': headers[:5],
-                'content_preview': content[:500] if content else ''
-            }
+    for chapter in book.capitulos:
+        section_title = chapter.seccion
+        cap_id = chapter.id
+        cap_title = chapter.title
+        content = chapter.content
+        epigraph_obj = chapter.get('epigraph') or {}
+        epigraph = epigraph_obj.get('text', '') if isinstance(epigraph_obj, dict) else ''
+
+        headers = re.findall(r'###?\s*([^\n]+)', content)
+
+        chapters[cap_id] = {
+            'title': cap_title,
+            'section': section_title,
+            'epigraph': epigraph[:200] if epigraph else '',
+            'headers': headers[:5],
+            'content_preview': content[:500] if content else ''
+        }
 
     return chapters
 
 
-def generate_search_queries(book_id: str, chapter_data: Dict) -> Dict[str, List[str]]:
-    """Generate optimized search queries for each chapter."""
-
-    # Book-specific context
-    book_contexts = {
-        'nacimiento': 'colapso civilizatorio transición sistémica nuevo paradigma',
-        'filosofia-nuevo-ser': 'filosofía ontología conciencia realidad',
-        'codigo-despertar': 'conciencia despertar transformación personal',
-        'manual-transicion': 'transición ecológica comunidades sostenibilidad',
-        'manual-practico': 'prácticas transformación personal ejercicios',
-        'toolkit-transicion': 'herramientas transición metodologías cambio',
-        'guia-acciones': 'acción social activismo cambio sistémico',
-        'tierra-que-despierta': 'ecología profunda tierra naturaleza',
-        'dialogos-maquina': 'inteligencia artificial IA humanidad tecnología',
-        'practicas-radicales': 'prácticas transformadoras cambio radical',
-        'manifiesto': 'manifiesto nuevo ser paradigma civilización',
-        'ahora-instituciones': 'instituciones transformación organizaciones'
+def book_hash(book_id: str) -> str:
+    """Content hash of a book's book.json."""
+    return hashlib.sha256((BOOKS_DIR / book_id / 'book.json').read_bytes()).hexdigest()
+
+
+def load_themes_cache() -> Dict[str, Dict]:
+    """Load cached chapter themes ({book_id: {hash, version, chapters}})."""
+    if THEMES_CACHE_FILE.exists():
+        with open(THEMES_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def cached_chapter_themes(book_ids: List[str], cache: Dict[str, Dict],
+                          workers: int = None) -> Tuple[Dict[str, Dict[str, Dict]], List[str]]:
+    """
+    Chapter themes for several books, extracting only those whose book.json
+    changed since they were cached. Misses are extracted in a process pool.
+    Updates 'cache' in place; returns (themes by book, re-extracted book ids).
+    """
+    hashes = {book_id: book_hash(book_id) for book_id in book_ids}
+    stale = [
+        book_id for book_id in book_ids
+        if cache.get(book_id, {}).get('hash') != hashes[book_id]
+        or cache.get(book_id, {}).get('version') != THEMES_VERSION
+    ]
+
+    if len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(stale))) as pool:
+            extracted = dict(zip(stale, pool.map(extract_chapter_themes, stale)))
+    else:
+        extracted = {book_id: extract_chapter_themes(book_id) for book_id in stale}
+
+    for book_id, chapters in extracted.items():
+        cache[book_id] = {'hash': hashes[book_id], 'version': THEMES_VERSION, 'chapters': chapters}
+
+    return {book_id: cache[book_id]['chapters'] for book_id in book_ids}, stale
+
+
+def resources_hash(book_id: str) -> str:
+    """Content hash of a book's resources.json ('' if it has none)."""
+    resources_file = BOOKS_DIR / book_id / 'assets' / 'resources.json'
+    return hashlib.sha256(resources_file.read_bytes()).hexdigest() if resources_file.exists() else ''
+
+
+def concepts_key(book_hashes: Dict[str, str]) -> str:
+    """Hash of every book.json of the library (what the corpus depends on)."""
+    parts = [[book_id, book_hashes[book_id]] for book_id in sorted(book_hashes)]
+    parts.append([CONCEPTS_VERSION, CHAPTER_CONCEPTS, BOOK_CONCEPTS])
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+def cached_library_analysis(book_hashes: Dict[str, str]) -> Tuple[Tuple[Dict, Dict], Dict[str, List], bool, List[str]]:
+    """
+    (library_concepts() output, suggest_links() output, concepts rebuilt,
+    re-scored book ids). The concepts and the corpus are cached under the
+    hash of every book.json; each book's suggestions under that hash plus
+    its resources.json, so editing one resources.json re-scores only that
+    book against the cached corpus.
+    """
+    key = concepts_key(book_hashes)
+    cached = {}
+    if CONCEPTS_CACHE_FILE.exists():
+        with open(CONCEPTS_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+
+    corpus = None
+    rebuilt = cached.get('key') != key or not CORPUS_CACHE_FILE.exists()
+    if rebuilt:
+        corpus = construir_corpus(BOOKS_DIR, list(book_hashes))
+        escribir_si_cambia(CORPUS_CACHE_FILE, corpus.serializar())
+        cached = {'key': key, 'concepts': library_concepts(corpus=corpus), 'suggestions': {}}
+
+    resources = {book_id: resources_hash(book_id) for book_id in book_hashes}
+    stale = [book_id for book_id in book_hashes
+             if cached['suggestions'].get(book_id, {}).get('resources') != resources[book_id]]
+    if stale:
+        if corpus is None:
+            corpus = CorpusConceptos.deserializar(CORPUS_CACHE_FILE.read_bytes())
+        links = suggest_links(score_library(corpus, BOOKS_DIR, stale))
+        for book_id in stale:
+            cached['suggestions'][book_id] = {'resources': resources[book_id], 'links': links.get(book_id, [])}
+    escribir_json_si_cambia(CONCEPTS_CACHE_FILE, cached)
+
+    suggestions = {book_id: cached['suggestions'][book_id]['links'] for book_id in book_hashes}
+    return tuple(cached['concepts']), suggestions, rebuilt, stale
+
+
+def library_concepts(book_ids: List[str] = None,
+                     corpus: CorpusConceptos = None) -> Tuple[Dict[str, Dict[str, List]], Dict[str, List]]:
+    """
+    Ranked key concepts of every chapter and of every book, by TF-IDF
+    against the rest of the library (one vectorized pass over all books).
+    Returns ({book_id: {cap_id: [(concept, weight)]}}, {book_id: [(concept, weight)]}).
+    """
+    if corpus is None:
+        corpus = construir_corpus(BOOKS_DIR, book_ids)
+    return corpus.conceptos_por_capitulo(CHAPTER_CONCEPTS), corpus.conceptos_por_libro(BOOK_CONCEPTS)
+
+
+def add_key_concepts(chapters: Dict[str, Dict], concepts: Dict[str, List]) -> Dict[str, Dict]:
+    """Copy of 'chapters' with 'key_concepts' (most distinctive first) and their weights."""
+    return {
+        cap_id: {**data,
+                 'key_concepts': [concept for concept, _ in concepts.get(cap_id, [])],
+                 'concept_weights': [weight for _, weight in concepts.get(cap_id, [])]}
+        for cap_id, data in chapters.items()
     }
 
-    context = book_contexts.get(book_id, '')
+
+def generate_search_queries(book_id: str, chapter_data: Dict, book_concepts: List[str]) -> Dict[str, List[str]]:
+    """Generate search queries for each chapter from its title and ranked concepts."""
+
+    # What sets the book apart from the rest of the library
+    context = ' '.join(book_concepts)
     queries = {}
 
     for cap_id, data in chapter_data.items():
@@ -116,9 +236,19 @@ def get_existing_resources(book_id: str) -> Dict:
     return {}
 
 
-def analyze_resource_gaps(book_id: str) -> Dict:
-    """Analyze which chapters need more resources."""
-    chapters = extract_chapter_themes(book_id)
+def analyze_resource_gaps(book_id: str, chapters: Dict[str, Dict] = None,
+                          concepts: Tuple[Dict, Dict] = None,
+                          suggestions: List[Dict] = None) -> Dict:
+    """
+    Analyze which chapters need more resources. Themes are extracted and
+    concepts (library_concepts() output) computed if not given;
+    'suggestions' are this book's suggest_links() entries.
+    """
+    if chapters is None:
+        chapters = extract_chapter_themes(book_id)
+    chapter_concepts, book_concepts = concepts or library_concepts()
+    chapters = add_key_concepts(chapters, chapter_concepts.get(book_id, {}))
+    book_terms = [concept for concept, _ in book_concepts.get(book_id, [])]
     existing = get_existing_resources(book_id)
 
     # Count resources per chapter
@@ -150,10 +280,21 @@ def analyze_resource_gaps(book_id: str) -> Dict:
     return {
         'book_id': book_id,
         'total_chapters': len(chapters),
+        'book_concepts': book_terms,
         'chapters': chapters,
         'coverage': chapter_coverage,
         'gaps': gaps,
-        'queries': generate_search_queries(book_id, chapters)
+        # What to look for in the chapters that need resources
+        'gap_concepts': {
+            cap_id: chapters[cap_id]['key_concepts'][:5]
+            for cap_id in gaps['no_resources'] + gaps['low_resources']
+        },
+        # Resources of the book whose text matches a gap chapter but don't link to it
+        'suggested_links': {
+            cap_id: [s['id'] for s in suggestions or [] if s['chapter'] == cap_id]
+            for cap_id in gaps['no_resources'] + gaps['low_resources']
+        },
+        'queries': generate_search_queries(book_id, chapters, book_terms)
     }
 
 
@@ -161,24 +302,35 @@ def main():
     """Analyze all books and output resource gaps."""
     print("=== RESOURCE GAP ANALYSIS ===\n")
 
+    book_ids = [d.name for d in sorted(BOOKS_DIR.iterdir()) if (d / 'book.json').exists()]
+
+    cache = load_themes_cache()
+    themes, extracted = cached_chapter_themes(book_ids, cache)
+    escribir_json_si_cambia(THEMES_CACHE_FILE, cache)
+    hashes = {book_id: cache[book_id]['hash'] for book_id in book_ids}
+    concepts, suggestions, rebuilt, rescored = cached_library_analysis(hashes)
+
     all_analysis = {}
 
-    for book_dir in sorted(BOOKS_DIR.iterdir()):
-        if (book_dir / 'book.json').exists():
-            book_id = book_dir.name
-            analysis = analyze_resource_gaps(book_id)
-            all_analysis[book_id] = analysis
+    for book_id in book_ids:
+        analysis = analyze_resource_gaps(book_id, themes[book_id], concepts, suggestions.get(book_id, []))
+        all_analysis[book_id] = analysis
+
+        no_res = len(analysis['gaps']['no_resources'])
+        low_res = len(analysis['gaps']['low_resources'])
+        total = analysis['total_chapters']
+        suggested = sum(1 for ids in analysis['suggested_links'].values() if ids)
 
-            no_res = len(analysis['gaps']['no_resources'])
-            low_res = len(analysis['gaps']['low_resources'])
-            total = analysis['total_chapters']
+        print(f"{book_id}: {total} caps, {no_res} sin recursos, {low_res} con pocos "
+              f"({suggested} con recursos sugeridos)")
 
-            print(f"{book_id}: {total} caps, {no_res} sin recursos, {low_res} con pocos")
+    print(f"\nTemas extraídos: {len(extracted)} libros (resto desde caché)")
+    print(f"Conceptos: {'recalculados' if rebuilt else 'desde caché'}; "
+          f"sugerencias: {len(rescored)} libros recalculados (resto desde caché)")
 
     # Save analysis
     output_file = BOOKS_DIR.parent / 'resource-analysis.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_analysis, f, ensure_ascii=False, indent=2)
+    escribir_json_si_cambia(output_file, all_analysis)
 
     print(f"\n✓ Análisis guardado en: {output_file}")
     return all_analysis
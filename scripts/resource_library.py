@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Shared access to the books' resources.json files.
+
+Resource files differ between books: categories usually sit at the top
+level ({"books": [...], "podcasts": [...]}) but some are nested, and some
+books add "by_chapter"/"by_section" maps that only hold ids. A resource is
+any object with an "id" and a "title" or "name"; its category is the key
+of the nearest list that contains it, or the id of the group object
+({"id", "name", "resources": [...]}) around that list.
+
+The same work often appears in several books with different ids and
+slightly different URLs; canonical_url() and fingerprints() give the keys
+used to recognise it (see build_resource_index.py).
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BOOKS_DIR = REPO_ROOT / 'www' / 'books'
+
+sys.path.insert(0, str(REPO_ROOT))
+from texto_es import normalizar
+
+# Fields that hold links to the resource itself, in order of preference
+URL_FIELDS = ('available', 'url', 'website', 'link', 'guide', 'how_to_join')
+TITLE_FIELDS = ('title', 'name', 'title_en', 'title_es', 'name_en')
+CHAPTER_FIELDS = ('relatedChapters', 'relevantChapters')
+
+# Query parameters that never change what a URL points to
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|ref|ref_|fbclid|gclid|mc_cid|mc_eid|igshid|si|tag)$')
+AMAZON_ASIN = re.compile(r'/(?:dp|gp/product)/([A-Z0-9]{10})', re.IGNORECASE)
+LEADING_ARTICLE = re.compile(r'^(the|a|an|el|la|los|las|le|les|un|una) ')
+
+# Category name -> kind of resource, so that title-only fingerprints don't
+# merge e.g. the "Mondragon" documentary with the Mondragon case study
+KINDS = {
+    'book': ('books', 'libros', 'related_books'),
+    'paper': ('papers', 'articles', 'academic', 'research'),
+    'video': ('documentaries', 'videos', 'multimedia', 'films'),
+    'podcast': ('podcasts',),
+    'organization': ('organizations', 'organizaciones', 'platforms', 'communities', 'comunidades'),
+    'tool': ('tools', 'apps', 'digital_tools', 'templates'),
+    'course': ('courses', 'online_courses', 'training'),
+    'practice': ('practices', 'methodologies', 'tactics'),
+}
+
+
+def is_group(value: Any) -> bool:
+    """True for named groups of resources ({"id", "name", "resources": [...]})."""
+    return isinstance(value, dict) and isinstance(value.get('resources'), list)
+
+
+def is_resource(value: Any) -> bool:
+    """True for resource entries (objects with an id and a title or name)."""
+    return (isinstance(value, dict) and 'id' in value and ('title' in value or 'name' in value)
+            and not is_group(value))
+
+
+def _walk(value: Any, pointer: str, category: str) -> Iterator[Tuple[str, str, Dict]]:
+    """(pointer, category, resource) below 'value'; category is the key of the enclosing list."""
+    if is_resource(value):
+        yield pointer, category, value
+    elif isinstance(value, dict):
+        for key, child in value.items():
+            if isinstance(child, list):
+                child_category = value['id'] if key == 'resources' and 'id' in value else key
+            else:
+                child_category = category
+            yield from _walk(child, f"{pointer}/{key}", child_category)
+    elif isinstance(value, list):
+        for i, child in enumerate(value):
+            yield from _walk(child, f"{pointer}/{i}", category)
+
+
+def load_resources(book_id: str, books_dir: Path = BOOKS_DIR) -> Optional[Any]:
+    """Parsed resources.json of a book, or None if it has none."""
+    resources_file = books_dir / book_id / 'assets' / 'resources.json'
+    if not resources_file.exists():
+        return None
+    with open(resources_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def iter_book_resources(book_id: str, books_dir: Path = BOOKS_DIR,
+                        data: Any = None) -> Iterator[Dict[str, Any]]:
+    """Resources of one book as {book, category, pointer, resource}."""
+    if data is None:
+        data = load_resources(book_id, books_dir)
+    if data is None:
+        return
+
+    for pointer, category, resource in _walk(data, '', ''):
+        yield {'book': book_id, 'category': category, 'pointer': pointer, 'resource': resource}
+
+
+def iter_resources(books_dir: Path = BOOKS_DIR) -> Iterator[Dict[str, Any]]:
+    """Resources of every book, in book order."""
+    for book_dir in sorted(books_dir.iterdir()):
+        if book_dir.is_dir():
+            yield from iter_book_resources(book_dir.name, books_dir)
+
+
+def resource_urls(resource: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(field, url) for every http(s) link of a resource, in URL_FIELDS order."""
+    urls = []
+    for field in URL_FIELDS:
+        value = resource.get(field)
+        if isinstance(value, str) and value.startswith(('http://', 'https://')):
+            urls.append((field, value.strip()))
+    return urls
+
+
+def resource_titles(resource: Dict[str, Any]) -> List[str]:
+    """Every title of a resource (translations included), main title first."""
+    titles = []
+    for field in TITLE_FIELDS:
+        value = resource.get(field)
+        values = value.values() if isinstance(value, dict) else [value]
+        titles.extend(v for v in values if isinstance(v, str) and v.strip() and v not in titles)
+    return titles
+
+
+def resource_chapters(resource: Dict[str, Any]) -> List[str]:
+    """Chapter ids listed on the resource itself."""
+    chapters = []
+    for field in CHAPTER_FIELDS:
+        value = resource.get(field)
+        if isinstance(value, list):
+            chapters.extend(c for c in value if isinstance(c, str) and c not in chapters)
+    return chapters
+
+
+def chapter_recommendations(data: Any) -> Dict[str, List[str]]:
+    """
+    Resource id -> chapter ids from a book's "by_chapter" / "by_section" maps.
+
+    by_chapter is keyed by chapter id; by_section entries list their own
+    "chapters", and each recommended resource applies to all of them.
+    """
+    recommended: Dict[str, List[str]] = {}
+    if not isinstance(data, dict):
+        return recommended
+
+    for key in ('by_chapter', 'by_section'):
+        for group_id, group in (data.get(key) or {}).items():
+            if not isinstance(group, dict):
+                continue
+            chapters = group.get('chapters') if key == 'by_section' else [group_id]
+            for resource_id in group.get('recommended') or []:
+                target = recommended.setdefault(resource_id, [])
+                target.extend(c for c in chapters or [] if c not in target)
+    return recommended
+
+
+def resource_kind(category: str) -> str:
+    """Coarse kind of a resource from its category name (the category itself if unknown)."""
+    lowered = category.lower()
+    for kind, prefixes in KINDS.items():
+        if lowered.startswith(prefixes) or any(f'-{p}' in lowered for p in prefixes):
+            return kind
+    return lowered
+
+
+def canonical_url(url: str) -> str:
+    """
+    Scheme-less key for a URL: lower-case host without "www.", no default
+    port, fragment or trailing slash, query sorted and without tracking
+    parameters. Amazon product pages reduce to their ASIN and youtu.be
+    links to the youtube.com watch form.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower().removeprefix('www.').removeprefix('m.')
+    path = re.sub(r'/{2,}', '/', parts.path).rstrip('/')
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not TRACKING_PARAMS.match(k))
+
+    if host.startswith('amazon.') and (asin := AMAZON_ASIN.search(path)):
+        return f"{host}/dp/{asin.group(1).upper()}"
+    if host == 'youtu.be' and path:
+        host, query, path = 'youtube.com', [('v', path.lstrip('/'))], '/watch'
+    if host == 'youtube.com' and path == '/watch':
+        query = [(k, v) for k, v in query if k == 'v']
+
+    port = f":{parts.port}" if parts.port and parts.port not in (80, 443) else ''
+    return f"{host}{port}{path}" + (f"?{urlencode(query)}" if query else '')
+
+
+def title_key(title: str, drop_subtitle: bool = True) -> str:
+    """Normalised title without leading article and, by default, without subtitle."""
+    if drop_subtitle:
+        title = re.split(r'[:—(]| - ', title, maxsplit=1)[0] or title
+    return LEADING_ARTICLE.sub('', normalizar(title))
+
+
+def author_surnames(resource: Dict[str, Any]) -> List[str]:
+    """Normalised surname of each author ("author", "authors" or "director")."""
+    names = []
+    for field in ('author', 'authors', 'director'):
+        value = resource.get(field)
+        for entry in value if isinstance(value, list) else [value]:
+            if isinstance(entry, str):
+                names.extend(re.split(r',| & | y | and |;', entry))
+    surnames = []
+    for name in names:
+        words = normalizar(name).split()
+        if words and words[-1] not in ('al', 'otros', 'others') and words[-1] not in surnames:
+            surnames.append(words[-1])
+    return surnames
+
+
+def fingerprints(resource: Dict[str, Any], category: str) -> Set[str]:
+    """
+    Title fingerprints of a resource: "title|surname" for each title and
+    author, or "full title#kind" when it has no author (without an author a
+    main title alone, like "Stanford Encyclopedia", says too little).
+    """
+    surnames = author_surnames(resource)
+    kind = resource_kind(category)
+    keys = set()
+    for title in resource_titles(resource):
+        key = title_key(title, drop_subtitle=bool(surnames))
+        if not key:
+            continue
+        if surnames:
+            keys.update(f"{key}|{surname}" for surname in surnames)
+        else:
+            keys.add(f"{key}#{kind}")
+    return keys
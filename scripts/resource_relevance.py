@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Resource-to-Chapter Relevance for Colección Nuevo Ser
+
+Scores every resource of a book against every chapter of that book and
+suggests relatedChapters links that are missing from resources.json.
+
+Chapters and resources are sparse TF-IDF vectors over the same vocabulary
+and IDF as the key concepts (conceptos_clave.CorpusConceptos: 1-3 word
+phrases, IDF over all chapters of the library). A resource is its title,
+description, "why" and "use" text. Unknown phrases (English descriptions,
+names) simply have no column, so they don't count.
+
+The resource × chapter cosine matrix of each book is computed in blocks of
+resources: the chapter rows are densified only on the columns that the
+block's resources use, gathered once per resource entry and summed per
+resource with np.add.reduceat. Memory stays proportional to the block, and
+the whole library (800+ resources, 300+ chapters) takes a couple of
+seconds, most of it building the chapter corpus.
+
+Raw cosines are small (chapters have thousands of terms): the median link
+already in resources.json scores about 0.01 and only ~1.5% of all pairs
+reach 0.05. A chapter is suggested for a resource when it is not linked
+yet (relatedChapters, relevantChapters, by_chapter or by_section) and its
+similarity reaches both --threshold and the resource's best existing link,
+i.e. the text matches it at least as well as a chapter the editors chose.
+The report goes to REPORTE-RELEVANCIA-RECURSOS.json.
+
+Usage:
+    python3 scripts/resource_relevance.py
+    python3 scripts/resource_relevance.py --book nacimiento --threshold 0.15
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from resource_library import (
+    BOOKS_DIR, REPO_ROOT, chapter_recommendations, iter_book_resources, load_resources,
+    resource_chapters, resource_titles
+)
+
+sys.path.insert(0, str(REPO_ROOT))
+from biblioteca_quizzes import escribir_json_si_cambia
+from conceptos_clave import CorpusConceptos, construir_corpus, frases_candidatas
+
+REPORT_FILE = REPO_ROOT / 'REPORTE-RELEVANCIA-RECURSOS.json'
+
+# Resource fields that describe what it is about (titles come from resource_titles)
+TEXT_FIELDS = ('description', 'why', 'use')
+THRESHOLD = 0.05
+MAX_SUGGESTIONS = 3
+BLOCK_SIZE = 128
+
+
+def resource_text(resource: Dict[str, Any]) -> str:
+    """Titles and descriptive fields of a resource, one per paragraph."""
+    parts = resource_titles(resource)
+    parts.extend(resource[field] for field in TEXT_FIELDS if isinstance(resource.get(field), str))
+    return '\n\n'.join(parts)
+
+
+def normalize_rows(indptr: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Weights of CSR rows scaled to unit L2 norm (empty rows stay empty)."""
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    norms = np.sqrt(np.bincount(rows, weights=weights.astype(np.float64) ** 2, minlength=len(indptr) - 1))
+    return (weights / norms[rows]).astype(np.float32)
+
+
+def resource_vectors(corpus: CorpusConceptos, texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """CSR (indptr, indices, unit weights) of 'texts' in the corpus vocabulary."""
+    indptr = [0]
+    indices: List[int] = []
+    counts: List[int] = []
+    for text in texts:
+        count = Counter(corpus.vocabulario[key] for key, _ in frases_candidatas(text)
+                        if key in corpus.vocabulario)
+        indices.extend(count.keys())
+        counts.extend(count.values())
+        indptr.append(len(indices))
+
+    indptr_array = np.array(indptr, dtype=np.int64)
+    indices_array = np.array(indices, dtype=np.int32)
+    weights = corpus.pesos_tfidf(np.array(counts, dtype=np.float32), indices_array)
+    return indptr_array, indices_array, normalize_rows(indptr_array, weights)
+
+
+def chapter_weights(corpus: CorpusConceptos) -> np.ndarray:
+    """Unit TF-IDF weights of every chapter row of the corpus (aligned with corpus.indices)."""
+    return normalize_rows(corpus.indptr, corpus.pesos_tfidf(corpus.frecuencias, corpus.indices))
+
+
+def similarity_matrix(corpus: CorpusConceptos, weights: np.ndarray, chapter_rows: List[int],
+                      indptr: np.ndarray, indices: np.ndarray, values: np.ndarray,
+                      block_size: int = BLOCK_SIZE) -> np.ndarray:
+    """
+    Cosine similarity of each resource row (indptr/indices/values) with each
+    corpus row in 'chapter_rows', as a (resources × chapters) array.
+    """
+    n_resources = len(indptr) - 1
+    scores = np.zeros((n_resources, len(chapter_rows)), dtype=np.float32)
+    if not chapter_rows or not len(indices):
+        return scores
+
+    # Chapter entries, as (column, chapter position, weight)
+    spans = [np.arange(corpus.indptr[row], corpus.indptr[row + 1]) for row in chapter_rows]
+    entries = np.concatenate(spans)
+    positions = np.repeat(np.arange(len(chapter_rows)), [len(span) for span in spans])
+    columns = corpus.indices[entries]
+
+    for start in range(0, n_resources, block_size):
+        end = min(start + block_size, n_resources)
+        low, high = indptr[start], indptr[end]
+        if low == high:
+            continue
+
+        # Dense chapters × (columns used by this block)
+        used, compact = np.unique(indices[low:high], return_inverse=True)
+        slot = np.searchsorted(used, columns)
+        hit = (slot < len(used)) & (used[np.minimum(slot, len(used) - 1)] == columns)
+        dense = np.zeros((len(used), len(chapter_rows)), dtype=np.float32)
+        dense[slot[hit], positions[hit]] = weights[entries[hit]]
+
+        # One row of products per resource entry, summed per resource
+        products = dense[compact] * values[low:high, None]
+        starts = indptr[start:end] - low
+        filled = np.diff(indptr[start:end + 1]) > 0
+        scores[start:end][filled] = np.add.reduceat(products, starts[filled], axis=0)
+
+    return scores
+
+
+def book_resources(book_id: str, books_dir: Path) -> List[Dict[str, Any]]:
+    """Resources of a book with the chapters they are already linked to."""
+    data = load_resources(book_id, books_dir)
+    if data is None:
+        return []
+    recommended = chapter_recommendations(data)
+    entries = []
+    for entry in iter_book_resources(book_id, books_dir, data=data):
+        resource = entry['resource']
+        linked = resource_chapters(resource)
+        linked.extend(c for c in recommended.get(resource['id'], []) if c not in linked)
+        entries.append({**entry, 'linked': linked})
+    return entries
+
+
+def score_library(corpus: CorpusConceptos, books_dir: Path = BOOKS_DIR,
+                  book_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    {book_id: {"chapters": [...], "resources": [entry, ...], "scores": array}}
+    for every book of the corpus that has resources.
+    """
+    weights = chapter_weights(corpus)
+    rows_by_book: Dict[str, List[int]] = {}
+    for row, (book_id, _) in enumerate(corpus.documentos):
+        rows_by_book.setdefault(book_id, []).append(row)
+
+    scored = {}
+    for book_id, rows in rows_by_book.items():
+        if book_ids is not None and book_id not in book_ids:
+            continue
+        entries = book_resources(book_id, books_dir)
+        if not entries:
+            continue
+        vectors = resource_vectors(corpus, [resource_text(e['resource']) for e in entries])
+        scored[book_id] = {
+            'chapters': [corpus.documentos[row][1] for row in rows],
+            'resources': entries,
+            'scores': similarity_matrix(corpus, weights, rows, *vectors)
+        }
+    return scored
+
+
+def suggest_links(scored: Dict[str, Dict[str, Any]], threshold: float = THRESHOLD,
+                  limit: int = MAX_SUGGESTIONS) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Missing links per book, best first: up to 'limit' chapters per resource
+    that it does not reference yet, scoring at least 'threshold' and at
+    least as much as its best existing link.
+    """
+    suggestions = {}
+    for book_id, book in scored.items():
+        chapters, scores = book['chapters'], book['scores']
+        found = []
+        for entry, row in zip(book['resources'], scores):
+            linked = [i for i, cap_id in enumerate(chapters) if cap_id in entry['linked']]
+            floor = max(threshold, float(row[linked].max()) if linked else 0.0)
+            candidates = [i for i in np.argsort(-row, kind='stable')
+                          if row[i] >= floor and chapters[i] not in entry['linked']][:limit]
+            found.extend({
+                'id': entry['resource']['id'],
+                'title': resource_titles(entry['resource'])[0],
+                'category': entry['category'],
+                'chapter': chapters[i],
+                'score': round(float(row[i]), 3)
+            } for i in candidates)
+        suggestions[book_id] = sorted(found, key=lambda s: -s['score'])
+    return suggestions
+
+
+def linked_scores(scored: Dict[str, Dict[str, Any]]) -> Dict[str, float]:
+    """Median similarity of the links already in resources.json, per book (for calibration)."""
+    medians = {}
+    for book_id, book in scored.items():
+        position = {cap_id: i for i, cap_id in enumerate(book['chapters'])}
+        values = [row[position[c]] for entry, row in zip(book['resources'], book['scores'])
+                  for c in entry['linked'] if c in position]
+        medians[book_id] = round(float(np.median(values)), 3) if values else 0.0
+    return medians
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Suggest missing resource → chapter links')
+    parser.add_argument('--book', help='Only this book (the IDF still uses the whole library)')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f'Minimum cosine similarity (default {THRESHOLD})')
+    parser.add_argument('--limit', type=int, default=MAX_SUGGESTIONS,
+                        help=f'Maximum suggestions per resource (default {MAX_SUGGESTIONS})')
+    parser.add_argument('--show', type=int, default=5, metavar='N', help='Print the N best suggestions per book')
+    args = parser.parse_args()
+
+    print("=== RESOURCE RELEVANCE ===\n")
+    start = time.perf_counter()
+    corpus = construir_corpus(BOOKS_DIR)
+    built = time.perf_counter()
+    scored = score_library(corpus, BOOKS_DIR, [args.book] if args.book else None)
+    suggestions = suggest_links(scored, args.threshold, args.limit)
+    medians = linked_scores(scored)
+    finished = time.perf_counter()
+
+    for book_id, found in suggestions.items():
+        book = scored[book_id]
+        print(f"{book_id}: {len(book['resources'])} recursos × {len(book['chapters'])} caps, "
+              f"{len(found)} enlaces sugeridos (mediana de los existentes {medians[book_id]})")
+        for s in found[:args.show]:
+            print(f"    {s['score']:.2f}  {s['id'][:30]:30} → {s['chapter']}")
+
+    total = sum(len(found) for found in suggestions.values())
+    pairs = sum(book['scores'].size for book in scored.values())
+    print(f"\n{pairs} pares recurso × capítulo: corpus {built - start:.2f}s, puntuación {finished - built:.2f}s")
+
+    escribir_json_si_cambia(REPORT_FILE, {
+        'threshold': args.threshold,
+        'linked_median': medians,
+        'suggestions': suggestions
+    })
+    print(f"✓ {total} sugerencias guardadas en: {REPORT_FILE}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Size Budget Analyzer for the APK and PWA payload
+
+Walks dist/, the folder npm run build fills and capacitor packs into the
+APK (or any other folder with --root), so it measures the minified scripts
+and styles and the generated data the app loads (quiz bundles and sets,
+resource index). Generated outputs the app never requests (responsive
+image derivatives, ambient loops, book patches; see NOT_SHIPPED) are
+skipped. For every file it measures its raw size and estimates its gzip
+(level 9) and brotli (quality 11) size. Files that are already compressed
+(audio, JPEG/PNG/WebP, fonts...) count their raw size for both. The
+estimates run in a process pool; brotli uses the brotli module when it is
+installed and otherwise Node's zlib, in one node process per chunk of
+files.
+
+Bytes are grouped by category (audio, images, book-data, downloads,
+scripts, styles, html, fonts, other) and by book (files under books/<id>/
+and downloads/<id>-premium.html), plus the first load: the STATIC_ASSETS
+precached by service-worker.js.
+
+gzip sizes approximate both what the APK stores (deflate) and what a
+browser downloads, so BUDGETS (KB) apply to them: to the total, the first
+load and each category. Any overrun makes the exit status 1, so the build
+fails.
+
+The per-file sizes are diffed against scripts/size-baseline.json (kept in
+the repository, rewritten with --update-baseline), showing what grew, what
+is new and what was removed. The full result goes to REPORTE-TAMANOS.json.
+
+Usage:
+    npm run build && python3 scripts/size_budget.py
+    python3 scripts/size_budget.py --root www
+    python3 scripts/size_budget.py --update-baseline
+"""
+
+import argparse
+import fnmatch
+import gzip
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+from biblioteca_quizzes import escribir_json_si_cambia
+
+WWW_DIR = REPO_ROOT / 'www'
+DIST_DIR = REPO_ROOT / 'dist'
+BASELINE_FILE = SCRIPTS_DIR / 'size-baseline.json'
+REPORT_FILE = REPO_ROOT / 'REPORTE-TAMANOS.json'
+SERVICE_WORKER = 'service-worker.js'
+
+# Budgets in KB of gzip size: today's sizes plus a little headroom
+BUDGETS = {
+    'total': 18500,
+    'first_load': 160,
+    'audio': 12000,
+    'images': 2400,
+    'book-data': 1450,
+    'downloads': 750,
+    'scripts': 1450,
+    'styles': 70,
+    'html': 75
+}
+
+# Generated next to the app but never loaded by it
+NOT_SHIPPED = [
+    'assets/backgrounds/responsive/*',
+    'books/*/assets/responsive/*',
+    'assets/responsive-images.json',
+    'assets/audio/ambient/loops/*',
+    'books/*/patches/*',
+]
+
+# (category, extensions, path prefix); the first match wins
+CATEGORIES = [
+    ('audio', {'.mp3', '.ogg', '.opus', '.m4a', '.wav'}, None),
+    ('downloads', None, 'downloads/'),
+    ('images', {'.png', '.jpg', '.jpeg', '.webp', '.avif', '.gif', '.svg', '.ico'}, None),
+    ('book-data', None, 'books/'),
+    ('scripts', {'.js', '.mjs'}, None),
+    ('styles', {'.css'}, None),
+    ('html', {'.html', '.htm'}, None),
+    ('fonts', {'.woff', '.woff2', '.ttf', '.otf'}, None),
+]
+# Formats that gzip/brotli can't shrink: their compressed size is their size
+PRECOMPRESSED = {'.mp3', '.ogg', '.opus', '.m4a', '.png', '.jpg', '.jpeg', '.webp', '.avif', '.gif',
+                 '.woff', '.woff2', '.apk', '.zip', '.gz', '.br'}
+CHUNK_SIZE = 32
+
+NODE_BROTLI = """
+const fs = require('fs'), zlib = require('zlib');
+const paths = JSON.parse(fs.readFileSync(0, 'utf8'));
+console.log(JSON.stringify(paths.map(p => {
+  const data = fs.readFileSync(p);
+  return zlib.brotliCompressSync(data, {params: {
+    [zlib.constants.BROTLI_PARAM_QUALITY]: 11,
+    [zlib.constants.BROTLI_PARAM_SIZE_HINT]: data.length
+  }}).length;
+})));
+"""
+
+
+def category(path: str) -> str:
+    suffix = Path(path).suffix.lower()
+    for name, extensions, prefix in CATEGORIES:
+        if (extensions is None or suffix in extensions) and (prefix is None or path.startswith(prefix)):
+            return name
+    return 'other'
+
+
+def book_of(path: str) -> Optional[str]:
+    parts = path.split('/')
+    if parts[0] == 'books' and len(parts) > 2:
+        return parts[1]
+    if parts[0] == 'downloads' and parts[-1].endswith('-premium.html'):
+        return parts[-1][:-len('-premium.html')]
+    return None
+
+
+def shipped_files(root: Path) -> List[str]:
+    """Every file under 'root' except hidden and NOT_SHIPPED ones, relative and sorted."""
+    files = []
+    for folder, dirs, names in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d != 'node_modules']
+        relative = (os.path.relpath(os.path.join(folder, n), root).replace(os.sep, '/')
+                    for n in names if not n.startswith('.'))
+        files.extend(path for path in relative
+                     if not any(fnmatch.fnmatch(path, pattern) for pattern in NOT_SHIPPED))
+    return sorted(files)
+
+
+def first_load_files(root: Path) -> List[str]:
+    """The STATIC_ASSETS of the service worker, as paths relative to 'root'."""
+    worker = root / SERVICE_WORKER
+    if not worker.exists():
+        return []
+    block = re.search(r'STATIC_ASSETS\s*=\s*\[(.*?)\]', worker.read_text(encoding='utf-8'), re.S)
+    if not block:
+        return []
+    urls = re.findall(r"['\"](/[^'\"]*)['\"]", block.group(1))
+    return sorted({'index.html' if url == '/' else url.lstrip('/') for url in urls})
+
+
+def brotli_sizes(paths: List[str], data: List[bytes]) -> List[Optional[int]]:
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+    if brotli is not None:
+        return [len(brotli.compress(d, quality=11)) for d in data]
+    if shutil.which('node'):
+        result = subprocess.run(['node', '-e', NODE_BROTLI], input=json.dumps(paths),
+                                capture_output=True, text=True, check=True)
+        return json.loads(result.stdout)
+    return [None] * len(paths)
+
+
+def measure_chunk(root: str, paths: List[str]) -> List[List[Optional[int]]]:
+    """[raw, gzip, brotli] of each file in 'paths' (relative to 'root')."""
+    sizes = [None] * len(paths)
+    compressible = []
+    for i, path in enumerate(paths):
+        full = os.path.join(root, path)
+        if Path(path).suffix.lower() in PRECOMPRESSED:
+            raw = os.path.getsize(full)
+            sizes[i] = [raw, raw, raw]
+        else:
+            with open(full, 'rb') as f:
+                data = f.read()
+            sizes[i] = [len(data), len(gzip.compress(data, 9, mtime=0)), None]
+            compressible.append((i, full, data))
+    if compressible:
+        indices, fulls, data = zip(*compressible)
+        for i, size in zip(indices, brotli_sizes(list(fulls), list(data))):
+            sizes[i][2] = size
+    return sizes
+
+
+def measure(root: Path, files: List[str], jobs: Optional[int] = None) -> Dict[str, List[Optional[int]]]:
+    chunks = [files[i:i + CHUNK_SIZE] for i in range(0, len(files), CHUNK_SIZE)]
+    workers = min(len(chunks), jobs or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(measure_chunk, [str(root)] * len(chunks), chunks))
+    else:
+        results = [measure_chunk(str(root), chunk) for chunk in chunks]
+    return {path: size for chunk, sizes in zip(chunks, results) for path, size in zip(chunk, sizes)}
+
+
+def add(total: List[Optional[int]], size: List[Optional[int]]):
+    for i, value in enumerate(size):
+        total[i] = None if total[i] is None or value is None else total[i] + value
+
+
+def summarize(sizes: Dict[str, List[Optional[int]]], first_load: List[str]) -> Dict[str, Any]:
+    """Totals [raw, gzip, brotli] overall, for the first load, by category and by book."""
+    total = [0, 0, 0]
+    categories = defaultdict(lambda: [0, 0, 0])
+    books = defaultdict(lambda: [0, 0, 0])
+    for path, size in sizes.items():
+        add(total, size)
+        add(categories[category(path)], size)
+        book = book_of(path)
+        if book:
+            add(books[book], size)
+    initial = [0, 0, 0]
+    for path in first_load:
+        if path in sizes:
+            add(initial, sizes[path])
+    return {
+        'total': total,
+        'first_load': initial,
+        'categories': dict(sorted(categories.items(), key=lambda item: -item[1][0])),
+        'books': dict(sorted(books.items(), key=lambda item: -item[1][0]))
+    }
+
+
+def budget_overruns(summary: Dict[str, Any]) -> List[Dict[str, Any]]:
+    overruns = []
+    for name, limit_kb in BUDGETS.items():
+        measured = summary.get(name) or summary['categories'].get(name)
+        if measured and measured[1] > limit_kb * 1024:
+            overruns.append({'budget': name, 'limit_kb': limit_kb, 'gzip_kb': round(measured[1] / 1024, 1)})
+    return overruns
+
+
+def diff_baseline(sizes: Dict[str, List[Optional[int]]], baseline: Dict[str, List[Optional[int]]]) -> Dict[str, Any]:
+    """Files added, removed and changed (by gzip size) since the baseline."""
+    added = {p: sizes[p][1] for p in sizes.keys() - baseline.keys()}
+    removed = {p: baseline[p][1] for p in baseline.keys() - sizes.keys()}
+    changed = {p: sizes[p][1] - baseline[p][1] for p in sizes.keys() & baseline.keys()
+               if sizes[p][1] != baseline[p][1]}
+    by_category = defaultdict(int)
+    for path, delta in list(added.items()) + [(p, -v) for p, v in removed.items()] + list(changed.items()):
+        by_category[category(path)] += delta
+    return {
+        'gzip_delta': sum(added.values()) - sum(removed.values()) + sum(changed.values()),
+        'by_category': dict(sorted(by_category.items(), key=lambda item: -abs(item[1]))),
+        'added': dict(sorted(added.items(), key=lambda item: -item[1])),
+        'removed': dict(sorted(removed.items(), key=lambda item: -item[1])),
+        'changed': dict(sorted(changed.items(), key=lambda item: -abs(item[1])))
+    }
+
+
+def kb(value: Optional[int]) -> str:
+    return f"{value / 1024:10.1f}" if value is not None else f"{'-':>10}"
+
+
+def print_rows(title: str, rows: Dict[str, List[Optional[int]]], limit: Optional[int] = None):
+    print(f"\n{title:24} {'KB':>10} {'gzip KB':>10} {'brotli KB':>10}")
+    for name, size in list(rows.items())[:limit]:
+        print(f"  {name:22} {kb(size[0])} {kb(size[1])} {kb(size[2])}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Report and enforce the size budgets of the built app')
+    parser.add_argument('--root', type=Path, default=DIST_DIR, help='Folder to analyze (default: dist)')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE, help='Baseline file to diff against')
+    parser.add_argument('--update-baseline', action='store_true', help='Store the current sizes as the baseline')
+    parser.add_argument('--top', type=int, default=10, help='Files to list per diff section')
+    parser.add_argument('--jobs', type=int, help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+    root = args.root.resolve()
+    if not root.is_dir():
+        parser.error(f'{root} does not exist (run npm run build first)')
+
+    start = time.perf_counter()
+    files = shipped_files(root)
+    sizes = measure(root, files, args.jobs)
+    summary = summarize(sizes, first_load_files(root))
+
+    print_rows('Categoría', summary['categories'])
+    print_rows('Libro', summary['books'], args.top)
+    print_rows('Conjunto', {'primera carga': summary['first_load'], 'total': summary['total']})
+
+    report = {'root': str(root), 'files': len(files), **summary}
+    if args.baseline.exists() and not args.update_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            diff = diff_baseline(sizes, json.load(f)['files'])
+        report['baseline_diff'] = diff
+        print(f"\nFrente a la línea base: {diff['gzip_delta'] / 1024:+.1f} KB gzip")
+        for name, delta in diff['by_category'].items():
+            print(f"  {name:22} {delta / 1024:+10.1f}")
+        for label, key, sign in (('nuevos', 'added', 1), ('eliminados', 'removed', -1), ('cambiados', 'changed', 1)):
+            for path, value in list(diff[key].items())[:args.top]:
+                print(f"  {label:10} {path[:60]:60} {sign * value / 1024:+8.1f} KB")
+
+    overruns = budget_overruns(summary)
+    report['overruns'] = overruns
+    escribir_json_si_cambia(REPORT_FILE, report)
+    if args.update_baseline:
+        escribir_json_si_cambia(args.baseline, {'version': 1, 'files': sizes})
+        print(f"\n✓ Línea base actualizada: {args.baseline}")
+
+    print(f"\n{len(files)} archivos en {time.perf_counter() - start:.1f}s. Informe: {REPORT_FILE}")
+    for overrun in overruns:
+        print(f"✗ Presupuesto '{overrun['budget']}' superado: {overrun['gzip_kb']} KB gzip > {overrun['limit_kb']} KB")
+    if not overruns:
+        print("✓ Todos los presupuestos se cumplen")
+    return 1 if overruns else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
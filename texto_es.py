@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Utilidades de texto en español para las herramientas de quizzes
+
+Normalización, tokenización y limpieza compartidas por los scripts que
+analizan preguntas y capítulos de la Colección Nuevo Ser.
+"""
+
+import re
+import unicodedata
+from typing import List
+
+# Palabras vacías más frecuentes del español (sin acentos, ya normalizadas)
+STOPWORDS_ES = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes aqui asi aun bajo
+bien cada casi como con contra cual cuales cuando de del desde donde dos el
+ella ellas ello ellos en entre era eran es esa esas ese eso esos esta estaba
+estan estar estas este esto estos fue fueron ha hace hacen hacia han hasta
+hay la las le les lo los mas me mi mis mucho muy nada ni no nos nosotros o
+otra otras otro otros para pero poco por porque puede que quien se sea ser
+si sido sin sino sobre solo son su sus tambien tan tanto te tiene tienen
+todo todos tu tus un una unas uno unos y ya yo
+""".split())
+
+PATRON_HTML = re.compile(r'<[^>]+>')
+PATRON_PALABRA = re.compile(r'[a-zñ0-9]+')
+
+
+def limpiar_html(texto: str) -> str:
+    """Elimina tags HTML de un texto"""
+    return PATRON_HTML.sub('', texto)
+
+
+def quitar_acentos(texto: str) -> str:
+    """Quita tildes y diéresis conservando la ñ"""
+    texto = texto.replace('ñ', '\0').replace('Ñ', '\1')
+    descompuesto = unicodedata.normalize('NFD', texto)
+    sin_marcas = ''.join(c for c in descompuesto if unicodedata.category(c) != 'Mn')
+    return sin_marcas.replace('\0', 'ñ').replace('\1', 'Ñ')
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sin acentos, sin puntuación y con espacios colapsados"""
+    texto = quitar_acentos(limpiar_html(texto).lower())
+    return ' '.join(PATRON_PALABRA.findall(texto))
+
+
+def tokenizar(texto: str, quitar_stopwords: bool = True) -> List[str]:
+    """Divide un texto en palabras normalizadas"""
+    palabras = PATRON_PALABRA.findall(quitar_acentos(limpiar_html(texto).lower()))
+    if quitar_stopwords:
+        return [p for p in palabras if p not in STOPWORDS_ES and len(p) > 1]
+    return palabras
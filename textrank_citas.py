@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Extracción de Citas Representativas con TextRank
+
+Para cada capítulo de un libro construye un grafo disperso de similitud entre
+oraciones (coseno TF-IDF, solo aristas por encima de un umbral y con un
+máximo de vecinos) y ordena las oraciones con TextRank por iteración de
+potencias. Todos los capítulos de un libro forman un único grafo
+diagonal por bloques, así que el ranking del libro entero se resuelve en una
+sola iteración vectorizada con NumPy.
+"""
+
+import re
+import zlib
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from texto_es import limpiar_html, tokenizar
+
+LONGITUD_MIN = 50
+LONGITUD_MAX = 300
+
+DIMENSION_HASH = 2048
+UMBRAL_ARISTA = 0.08
+MAX_VECINOS = 12
+AMORTIGUACION = 0.85
+TOLERANCIA = 1e-6
+MAX_ITERACIONES = 100
+
+PATRON_MARKDOWN = re.compile(r'[*_#>`]+')
+PATRON_FIN_ORACION = re.compile(r'(?<=[.!?…»"])\s+(?=[«¿¡"A-ZÁÉÍÓÚÑ])')
+
+
+def dividir_oraciones(contenido: str) -> List[str]:
+    """Divide el contenido en oraciones candidatas a cita (50-300 caracteres)"""
+    texto = PATRON_MARKDOWN.sub('', limpiar_html(contenido))
+    oraciones = []
+    for parrafo in re.split(r'\n\s*\n', texto):
+        # El contenido viene cortado a ~70 columnas: unir las líneas del párrafo
+        parrafo = ' '.join(parrafo.split())
+        for oracion in PATRON_FIN_ORACION.split(parrafo):
+            oracion = oracion.strip()
+            if oracion.count('«') != oracion.count('»'):
+                oracion = oracion.strip('«»')
+            if LONGITUD_MIN < len(oracion) < LONGITUD_MAX and oracion[-1] in '.!?…»"':
+                oraciones.append(oracion)
+    return oraciones
+
+
+def matriz_frecuencias(oraciones: List[str]) -> np.ndarray:
+    """Matriz (n_oraciones × DIMENSION_HASH) de frecuencias con hashing trick"""
+    matriz = np.zeros((len(oraciones), DIMENSION_HASH), dtype=np.float32)
+    for i, oracion in enumerate(oraciones):
+        for palabra in tokenizar(oracion):
+            matriz[i, zlib.crc32(palabra.encode('utf-8')) % DIMENSION_HASH] += 1.0
+    return matriz
+
+
+def calcular_idf(matriz: np.ndarray) -> np.ndarray:
+    """IDF suavizado de cada columna de una matriz de frecuencias"""
+    documentos = (matriz > 0).sum(axis=0)
+    return (np.log((1 + matriz.shape[0]) / (1 + documentos)) + 1).astype(np.float32)
+
+
+def vectores_tfidf(oraciones: List[str], idf: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Matriz (n_oraciones × DIMENSION_HASH) TF-IDF normalizada por filas.
+
+    Sin 'idf' se calcula sobre las propias oraciones; pasarlo permite
+    proyectar consultas en el mismo espacio que un índice ya construido.
+    """
+    matriz = matriz_frecuencias(oraciones)
+    matriz *= calcular_idf(matriz) if idf is None else idf
+    normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+    return matriz / np.where(normas > 0, normas, 1)
+
+
+def aristas_bloque(vectores: np.ndarray, desplazamiento: int):
+    """Aristas dispersas (origen, destino, peso) del grafo de un capítulo"""
+    similitud = vectores @ vectores.T
+    np.fill_diagonal(similitud, 0)
+    similitud[similitud < UMBRAL_ARISTA] = 0
+
+    # Conservar solo los MAX_VECINOS más parecidos de cada oración
+    if similitud.shape[0] > MAX_VECINOS:
+        corte = np.partition(similitud, -MAX_VECINOS, axis=1)[:, -MAX_VECINOS][:, None]
+        similitud[similitud < corte] = 0
+
+    origen, destino = np.nonzero(similitud)
+    return origen + desplazamiento, destino + desplazamiento, similitud[origen, destino]
+
+
+def textrank(n: int, origen: np.ndarray, destino: np.ndarray, pesos: np.ndarray,
+             bloque: np.ndarray) -> np.ndarray:
+    """
+    TextRank ponderado por iteración de potencias sobre un grafo disperso.
+
+    'bloque' indica el capítulo de cada oración: la teletransportación se
+    reparte dentro de cada capítulo, de modo que las puntuaciones de cada
+    bloque son comparables entre sí e independientes de los demás.
+    """
+    salida = np.bincount(origen, weights=pesos, minlength=n)
+    pesos_norm = pesos / np.where(salida[origen] > 0, salida[origen], 1)
+
+    tamano_bloque = np.bincount(bloque)[bloque].astype(float)
+    teletransporte = (1 - AMORTIGUACION) / tamano_bloque
+    rango = 1 / tamano_bloque
+
+    for _ in range(MAX_ITERACIONES):
+        nuevo = teletransporte + AMORTIGUACION * np.bincount(
+            destino, weights=pesos_norm * rango[origen], minlength=n)
+        if np.abs(nuevo - rango).sum() < TOLERANCIA:
+            return nuevo
+        rango = nuevo
+
+    return rango
+
+
+def citas_por_capitulo(capitulos: List[Dict[str, Any]], k: int = 5) -> Dict[str, List[str]]:
+    """
+    Top-k oraciones representativas de cada capítulo de un libro.
+
+    Recibe la lista de capítulos (con 'id' y 'content') y devuelve
+    {cap_id: [citas ordenadas por relevancia]}.
+    """
+    oraciones: List[str] = []
+    bloques: List[int] = []
+    aristas = []
+
+    for idx, capitulo in enumerate(capitulos):
+        propias = dividir_oraciones(capitulo.get('content', ''))
+        if propias:
+            aristas.append(aristas_bloque(vectores_tfidf(propias), len(oraciones)))
+        oraciones.extend(propias)
+        bloques.extend([idx] * len(propias))
+
+    resultado = {capitulo.get('id', ''): [] for capitulo in capitulos}
+    if not oraciones:
+        return resultado
+
+    origen = np.concatenate([a[0] for a in aristas]).astype(np.int64)
+    destino = np.concatenate([a[1] for a in aristas]).astype(np.int64)
+    pesos = np.concatenate([a[2] for a in aristas]).astype(np.float64)
+    bloque = np.asarray(bloques)
+
+    puntuaciones = textrank(len(oraciones), origen, destino, pesos, bloque)
+
+    # Ordenar por capítulo y, dentro de cada uno, por puntuación descendente
+    orden = np.lexsort((-puntuaciones, bloque))
+    inicio_bloque = np.searchsorted(bloque[orden], np.arange(len(capitulos)))
+    fin_bloque = np.searchsorted(bloque[orden], np.arange(len(capitulos)), side='right')
+
+    for idx, capitulo in enumerate(capitulos):
+        seleccion = orden[inicio_bloque[idx]:min(fin_bloque[idx], inicio_bloque[idx] + k)]
+        resultado[capitulo.get('id', '')] = [oraciones[i] for i in seleccion]
+
+    return resultado
+
+
+def citas_capitulo(contenido: str, k: int = 5) -> List[str]:
+    """Top-k citas de un único texto"""
+    return citas_por_capitulo([{"id": "", "content": contenido}], k)[""]
+
+
+def cita_mas_afin(texto: str, candidatas: List[str]) -> Optional[str]:
+    """De entre varias citas, la más parecida (coseno TF-IDF) a un texto dado"""
+    if not candidatas:
+        return None
+    vectores = vectores_tfidf([texto] + candidatas)
+    return candidatas[int(np.argmax(vectores[1:] @ vectores[0]))]
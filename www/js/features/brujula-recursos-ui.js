@@ -406,7 +406,7 @@ class BrujulaRecursosUI {
     const recursosFiltrados = this.brujula.recursos.filter(r => {
       if (filtro.dimension && !r.dimensiones.includes(filtro.dimension)) return false;
       if (filtro.tipo && r.tipo !== filtro.tipo) return false;
-      if (filtro.libro && r.libroOrigen !== filtro.libro) return false;
+      if (filtro.libro && !(r.libros || [r.libroOrigen]).includes(filtro.libro)) return false;
       return true;
     });
 
@@ -693,6 +693,10 @@ class BrujulaRecursosUI {
 
         ${recurso.libroNombre ? `<p class="brujula-detalle-fuente">Fuente: ${recurso.libroNombre}</p>` : ''}
 
+        ${(recurso.notasLibros || []).map(nota => `
+          <p class="brujula-detalle-fuente">En ${nota.libroNombre}: ${nota.texto}</p>
+        `).join('')}
+
         ${recurso.link || recurso.website ? `
           <a href="${recurso.link || recurso.website}" target="_blank" rel="noopener" class="brujula-btn-link">
             🔗 Visitar recurso externo
@@ -15,6 +15,9 @@
  */
 
 class BrujulaRecursos {
+  // Categorías de resources.json que se muestran en la brújula
+  static TIPOS_RECURSO = ['books', 'papers', 'documentaries', 'podcasts', 'organizations', 'tools'];
+
   constructor() {
     this.modo = 'inicio'; // inicio, dialogo, explorar, serendipity
     this.pasoDialogo = 0;
@@ -89,10 +92,13 @@ class BrujulaRecursos {
 
       this.recursos = [];
 
-      // Cargar recursos de cada libro publicado (verificando su config.json)
+      // Cargar recursos de cada libro publicado: del índice compartido si existe
+      // (una sola petición), si no de cada libro (verificando su config.json)
       const librosPublicados = catalog.books.filter(libro => libro.status === 'published');
-      for (const libro of librosPublicados) {
-        await this.cargarRecursosLibro(libro);
+      if (!(await this.cargarIndiceRecursos(librosPublicados))) {
+        for (const libro of librosPublicados) {
+          await this.cargarRecursosLibro(libro);
+        }
       }
 
       // Enriquecer recursos con scoring y metadata
@@ -103,6 +109,100 @@ class BrujulaRecursos {
     }
   }
 
+  /**
+   * Carga books/resources-index.json (scripts/build_resource_index.py): cada
+   * obra aparece una sola vez aunque la citen varios libros, con todos ellos
+   * en 'libros'. Devuelve false si el índice no está disponible.
+   */
+  async cargarIndiceRecursos(librosPublicados) {
+    try {
+      const response = await fetch('books/resources-index.json');
+      if (!response.ok) return false;
+      const indice = await response.json();
+      if (indice.version !== 1) return false;
+
+      const librosPorId = new Map(librosPublicados.map(libro => [libro.id, libro]));
+
+      for (const entrada of indice.resources) {
+        const refs = entrada.refs.filter(ref => librosPorId.has(ref.book));
+
+        const refsTipo = refs.filter(ref => BrujulaRecursos.TIPOS_RECURSO.includes(ref.category));
+        if (refsTipo.length > 0) {
+          const [principal, ...otras] = refsTipo;
+          const recurso = this.crearRecurso(
+            this.recursoDeReferencia(entrada, principal),
+            principal.category,
+            librosPorId.get(principal.book)
+          );
+          recurso.libros = [...new Set(refsTipo.map(ref => ref.book))];
+          // Lo que dice de la obra cada uno de los otros libros
+          recurso.notasLibros = [];
+          for (const ref of otras) {
+            const segunLibro = this.recursoDeReferencia(entrada, ref);
+            this.detectarDimensiones(segunLibro, ref.book).forEach(dim => {
+              if (!recurso.dimensiones.includes(dim)) recurso.dimensiones.push(dim);
+            });
+            const texto = segunLibro.why || segunLibro.description;
+            if (texto && texto !== (recurso.why || recurso.description)
+                && !recurso.notasLibros.some(nota => nota.libroId === ref.book)) {
+              recurso.notasLibros.push({ libroId: ref.book, libroNombre: librosPorId.get(ref.book).title, texto });
+            }
+          }
+          this.recursos.push(recurso);
+        }
+
+        refs.filter(ref => ref.category === 'related_books_coleccion').forEach(ref => {
+          this.recursos.push(this.crearReferenciaColeccion(
+            this.recursoDeReferencia(entrada, ref),
+            librosPorId.get(ref.book)
+          ));
+        });
+      }
+      return true;
+    } catch (error) {
+      // logger.warn('Índice de recursos no disponible, cargando por libro:', error);
+      return false;
+    }
+  }
+
+  /**
+   * El recurso de una entrada del índice tal como lo cita un libro: sus
+   * capítulos y su propio texto (description, why, relation) sobre el
+   * recurso representativo. Un null en ref.text quita el campo.
+   */
+  recursoDeReferencia(entrada, ref) {
+    const recurso = { ...entrada.resource, ...ref.text, id: ref.id, relatedChapters: ref.chapters };
+    Object.keys(ref.text || {}).forEach(campo => {
+      if (recurso[campo] === null) delete recurso[campo];
+    });
+    return recurso;
+  }
+
+  crearRecurso(recurso, tipo, libro) {
+    return {
+      ...recurso,
+      tipo: this.mapearTipo(tipo),
+      icono: this.asignarIcono(tipo),
+      libroOrigen: libro.id,
+      libroNombre: libro.title,
+      dimensiones: this.detectarDimensiones(recurso, libro.id)
+    };
+  }
+
+  crearReferenciaColeccion(ref, libro) {
+    return {
+      id: `rel-${ref.id}`,
+      title: ref.title,
+      description: ref.relation,
+      tipo: 'libro_colección',
+      icono: '📖',
+      libroOrigen: libro.id,
+      libroDestino: ref.id,
+      dimensiones: ref.relatedChapters ? this.inferirDimensionesDeCapitulos(ref.relatedChapters) : [],
+      relatedChapters: ref.relatedChapters
+    };
+  }
+
   async cargarRecursosLibro(libro) {
     try {
       const configResponse = await fetch(`books/${libro.id}/config.json`);
@@ -115,19 +215,10 @@ class BrujulaRecursos {
         const data = await recursosResponse.json();
 
         // Procesar cada tipo de recurso
-        const tipos = ['books', 'papers', 'documentaries', 'podcasts', 'organizations', 'tools'];
-
-        for (const tipo of tipos) {
+        for (const tipo of BrujulaRecursos.TIPOS_RECURSO) {
           if (data[tipo]) {
             data[tipo].forEach(recurso => {
-              this.recursos.push({
-                ...recurso,
-                tipo: this.mapearTipo(tipo),
-                icono: this.asignarIcono(tipo),
-                libroOrigen: libro.id,
-                libroNombre: libro.title,
-                dimensiones: this.detectarDimensiones(recurso, libro.id)
-              });
+              this.recursos.push(this.crearRecurso(recurso, tipo, libro));
             });
           }
         }
@@ -135,17 +226,7 @@ class BrujulaRecursos {
         // Añadir referencias a otros libros de la colección
         if (data.related_books_coleccion) {
           data.related_books_coleccion.forEach(ref => {
-            this.recursos.push({
-              id: `rel-${ref.id}`,
-              title: ref.title,
-              description: ref.relation,
-              tipo: 'libro_colección',
-              icono: '📖',
-              libroOrigen: libro.id,
-              libroDestino: ref.id,
-              dimensiones: ref.relatedChapters ? this.inferirDimensionesDeCapitulos(ref.relatedChapters) : [],
-              relatedChapters: ref.relatedChapters
-            });
+            this.recursos.push(this.crearReferenciaColeccion(ref, libro));
           });
         }
       }
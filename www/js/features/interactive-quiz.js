@@ -9,14 +9,111 @@ class InteractiveQuiz {
     this.answers = [];
     this.score = 0;
     this.isOpen = false;
+    // bookId -> Promise<bundle | null> (quizzes.bundle generado por empaquetar_quizzes.py)
+    this.bundles = new Map();
+    // Conjunto elegido en el selector ({ difficulty } | { tag } | null)
+    this.filter = null;
+    this.reviewMode = false;
   }
 
   // ==========================================================================
   // CARGAR QUIZ
   // ==========================================================================
 
+  /**
+   * Descarga (una vez por libro) el bundle de quizzes: una cabecera JSON con la
+   * tabla de cadenas y los desplazamientos de cada capítulo, seguida de un JSON
+   * compacto por capítulo. Devuelve null si el libro no tiene bundle.
+   */
+  loadBundle(bookId) {
+    if (!this.bundles.has(bookId)) {
+      const pending = fetch(`books/${bookId}/assets/quizzes.bundle`)
+        .then(async response => {
+          if (!response.ok) return null;
+          const bytes = new Uint8Array(await response.arrayBuffer());
+          const headerEnd = bytes.indexOf(10);
+          const decoder = new TextDecoder('utf-8');
+          const header = JSON.parse(decoder.decode(bytes.subarray(0, headerEnd)));
+          return { header, bytes, bodyStart: headerEnd + 1, decoder };
+        })
+        .catch(() => null);
+      this.bundles.set(bookId, pending);
+    }
+    return this.bundles.get(bookId);
+  }
+
+  /**
+   * Extrae del bundle solo el capítulo pedido y restaura las cadenas internadas.
+   * Devuelve undefined si el bundle no sirve (para caer a los JSON).
+   */
+  quizFromBundle(bundle, chapterId, kids) {
+    if (!bundle || bundle.header.version !== 1) return undefined;
+
+    const entry = bundle.header.chapters[kids ? 'kids' : 'normal']?.[chapterId];
+    if (!entry) return null;
+
+    const [offset, length] = entry;
+    const start = bundle.bodyStart + offset;
+    const quiz = JSON.parse(bundle.decoder.decode(bundle.bytes.subarray(start, start + length)));
+
+    this.restoreStrings(quiz.questions, bundle.header.strings);
+    return quiz;
+  }
+
+  /**
+   * Sustituye los índices de la tabla de cadenas (tags, difficulty, type)
+   * por las cadenas originales.
+   */
+  restoreStrings(questions, strings) {
+    for (const q of questions) {
+      if (typeof q.difficulty === 'number') q.difficulty = strings[q.difficulty];
+      if (typeof q.type === 'number') q.type = strings[q.type];
+      if (Array.isArray(q.tags)) q.tags = q.tags.map(t => (typeof t === 'number' ? strings[t] : t));
+    }
+    return questions;
+  }
+
+  /**
+   * Quiz de un capítulo reducido a un conjunto precalculado por dificultad
+   * ('principiante' | 'iniciado' | 'experto') o por tag. Los conjuntos
+   * viajan en el capítulo del bundle ("sets"); sin ellos (quiz JSON) se
+   * filtra en el dispositivo.
+   */
+  async loadQuizSet(bookId, chapterId, kids = false, { difficulty = null, tag = null } = {}) {
+    const quiz = await this.loadQuiz(bookId, chapterId, kids);
+    if (!quiz || (!difficulty && !tag)) return quiz;
+
+    const indices = tag ? quiz.sets?.tags?.[tag] : quiz.sets?.difficulty?.[difficulty];
+
+    const questions = indices
+      ? indices.map(i => quiz.questions[i]).filter(Boolean)
+      : quiz.questions.filter(q => (tag ? q.tags?.includes(tag) : q.difficulty === difficulty));
+
+    return questions.length ? { ...quiz, questions } : null;
+  }
+
+  /**
+   * Bolsa de repaso con preguntas de todos los libros (quiz-review.json,
+   * generado por conjuntos_quiz.py). Cada pregunta lleva bookId y chapterId.
+   */
+  async loadReviewPool(kids = false) {
+    try {
+      const response = await fetch('books/quiz-review.json');
+      if (!response.ok) return [];
+
+      const review = await response.json();
+      return this.restoreStrings(review.pools?.[kids ? 'kids' : 'normal'] || [], review.strings || []);
+    } catch (error) {
+      logger.error('Error cargando repaso:', error);
+      return [];
+    }
+  }
+
   async loadQuiz(bookId, chapterId, kids = false) {
     try {
+      const fromBundle = this.quizFromBundle(await this.loadBundle(bookId), chapterId, kids);
+      if (fromBundle !== undefined) return fromBundle;
+
       const file = kids ? 'quizzes-kids.json' : 'quizzes.json';
       const response = await fetch(`books/${bookId}/assets/${file}`);
       if (!response.ok) return null;
@@ -33,16 +130,18 @@ class InteractiveQuiz {
   // ABRIR QUIZ
   // ==========================================================================
 
-  async open(bookId, chapterId, kids = false) {
+  async open(bookId, chapterId, kids = false, filter = null) {
     // FIX v2.9.234: Show loading state while fetching data
     this.renderLoading();
 
     try {
-      const quiz = await this.loadQuiz(bookId, chapterId, kids);
+      const quiz = filter
+        ? await this.loadQuizSet(bookId, chapterId, kids, filter)
+        : await this.loadQuiz(bookId, chapterId, kids);
 
       if (!quiz) {
         // Si se pidió la versión para niños y no existe, caer a la normal.
-        if (kids) { return this.open(bookId, chapterId, false); }
+        if (kids) { return this.open(bookId, chapterId, false, filter); }
         this.close();
         window.toast?.info('No hay quiz disponible para este capitulo');
         return;
@@ -53,18 +152,10 @@ class InteractiveQuiz {
       this.bookId = bookId;
       this.chapterId = chapterId;
       this.kidsMode = kids;
+      this.filter = filter;
+      this.reviewMode = false;
 
-      this.currentQuiz = quiz;
-      this.currentQuestionIndex = 0;
-      this.answers = [];
-      this.score = 0;
-      // Solo las preguntas evaluables (con opciones) cuentan para la puntuación;
-      // las de tipo 'reflection' se muestran pero no se puntúan.
-      this.gradedCount = quiz.questions.filter(q => Array.isArray(q.options) && q.options.length > 0).length;
-      this.isOpen = true;
-
-      this.render();
-      this.attachEventListeners();
+      this.start(quiz);
     } catch (error) {
       logger.error('Error opening quiz:', error);
       this.close();
@@ -72,6 +163,53 @@ class InteractiveQuiz {
     }
   }
 
+  /**
+   * Modo repaso: unas cuantas preguntas al azar de la bolsa de repaso de
+   * toda la biblioteca.
+   */
+  async openReview(kids = false, size = 10) {
+    this.renderLoading();
+
+    const pool = await this.loadReviewPool(kids);
+    if (!pool.length) {
+      this.close(true);
+      window.toast?.info('No hay preguntas de repaso disponibles');
+      return;
+    }
+
+    // Fisher-Yates parcial: las 'size' primeras quedan al azar
+    const questions = pool.slice();
+    for (let i = 0; i < Math.min(size, questions.length); i++) {
+      const j = i + Math.floor(Math.random() * (questions.length - i));
+      [questions[i], questions[j]] = [questions[j], questions[i]];
+    }
+
+    this.hasAlternate = false;
+    this.kidsMode = kids;
+    this.filter = null;
+    this.reviewMode = true;
+
+    this.start({
+      title: 'Repaso de la biblioteca',
+      description: 'Preguntas de todos los libros',
+      questions: questions.slice(0, size)
+    });
+  }
+
+  start(quiz) {
+    this.currentQuiz = quiz;
+    this.currentQuestionIndex = 0;
+    this.answers = [];
+    this.score = 0;
+    // Solo las preguntas evaluables (con opciones) cuentan para la puntuación;
+    // las de tipo 'reflection' se muestran pero no se puntúan.
+    this.gradedCount = quiz.questions.filter(q => Array.isArray(q.options) && q.options.length > 0).length;
+    this.isOpen = true;
+
+    this.render();
+    this.attachEventListeners();
+  }
+
   /**
    * FIX v2.9.234: Loading state for async data
    */
@@ -144,6 +282,7 @@ class InteractiveQuiz {
                     ${this.kidsMode ? '🎓 Ver versión normal' : '👶 Ver versión para niños'}
                   </button>
                 ` : ''}
+                ${this.renderSetSelector()}
               </div>
               <button id="close-quiz" class="text-gray-400 hover:text-white transition p-2">
                 <svg class="w-6 h-6" fill="none" stroke="currentColor" viewBox="0 0 24 24">
@@ -181,6 +320,31 @@ class InteractiveQuiz {
     }, 10);
   }
 
+  /**
+   * Selector de conjunto: todas las preguntas, un nivel de dificultad o un
+   * tag, con los conjuntos que trae el capítulo.
+   */
+  renderSetSelector() {
+    const sets = this.currentQuiz.sets;
+    const levels = Object.keys(sets?.difficulty || {});
+    const tags = Object.keys(sets?.tags || {});
+    if (this.reviewMode || (!levels.length && !tags.length)) return '';
+
+    const chip = (label, attribute, value, active) => `
+      <button class="quiz-set text-xs px-3 py-1 rounded-full border transition ${active
+        ? 'bg-cyan-500/30 text-cyan-200 border-cyan-400'
+        : 'bg-slate-800/50 text-gray-400 border-gray-600 hover:border-cyan-500'}"
+              ${attribute ? `data-${attribute}="${value}"` : ''}>${label}</button>`;
+
+    return `
+      <div id="quiz-sets" class="flex flex-wrap gap-2 mt-3">
+        ${chip('Todas', null, null, !this.filter)}
+        ${levels.map(level => chip(level, 'difficulty', level, this.filter?.difficulty === level)).join('')}
+        ${tags.map(tag => chip(`#${tag}`, 'tag', tag, this.filter?.tag === tag)).join('')}
+      </div>
+    `;
+  }
+
   renderCurrentQuestion() {
     if (this.currentQuestionIndex >= this.currentQuiz.questions.length) {
       return this.renderResults();
@@ -352,6 +516,9 @@ class InteractiveQuiz {
           <button id="retry-quiz" class="px-6 py-3 bg-gradient-to-r from-cyan-600 to-indigo-600 hover:from-cyan-700 hover:to-indigo-700 rounded-lg transition font-semibold">
             🔄 Volver a intentar
           </button>
+          <button id="review-quiz" class="px-6 py-3 bg-gradient-to-r from-amber-600 to-orange-600 hover:from-amber-700 hover:to-orange-700 rounded-lg transition font-semibold">
+            🔀 ${this.reviewMode ? 'Otro repaso' : 'Repaso de la biblioteca'}
+          </button>
           <button id="close-quiz-results" class="px-6 py-3 bg-gray-700 hover:bg-gray-600 rounded-lg transition">
             Cerrar
           </button>
@@ -397,6 +564,20 @@ class InteractiveQuiz {
       this.open(this.bookId, this.chapterId, !this.kidsMode);
     });
 
+    // Elegir conjunto por dificultad o tag (sin data-* = todas las preguntas)
+    document.querySelectorAll('.quiz-set').forEach(btn => {
+      btn.addEventListener('click', (e) => {
+        const { difficulty, tag } = e.currentTarget.dataset;
+        const filter = difficulty ? { difficulty } : tag ? { tag } : null;
+        this.open(this.bookId, this.chapterId, this.kidsMode, filter);
+      });
+    });
+
+    // Repaso con preguntas de toda la biblioteca
+    document.getElementById('review-quiz')?.addEventListener('click', () => {
+      this.openReview(this.kidsMode);
+    });
+
     // ESC para cerrar
     document.addEventListener('keydown', this.handleEscape = (e) => {
       if (e.key === 'Escape' && this.isOpen) this.close();
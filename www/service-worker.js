@@ -7,9 +7,20 @@
  */
 
 const CACHE_VERSION = 'coleccion-nuevo-ser-v2.9.283';
-const CACHE_STATIC = `${CACHE_VERSION}-static`;
-const CACHE_DYNAMIC = `${CACHE_VERSION}-dynamic`;
-const CACHE_IMAGES = `${CACHE_VERSION}-images`;
+// Nombres estables: las actualizaciones sustituyen archivos sueltos según
+// precache-manifest.json en vez de tirar las caches enteras
+const CACHE_STATIC = 'coleccion-nuevo-ser-static';
+const CACHE_DYNAMIC = 'coleccion-nuevo-ser-dynamic';
+const CACHE_IMAGES = 'coleccion-nuevo-ser-images';
+const CACHE_META = 'coleccion-nuevo-ser-meta';
+const CACHES = [CACHE_STATIC, CACHE_DYNAMIC, CACHE_IMAGES];
+
+// Manifiesto con la revisión de cada archivo (scripts/build_precache_manifest.py).
+// En dist/ el build sustituye PRECACHE_REVISION por la revisión del manifiesto,
+// así que cualquier cambio de contenido cambia este archivo y el navegador
+// instala el nuevo service worker.
+const PRECACHE_MANIFEST = '/precache-manifest.json';
+const PRECACHE_REVISION = 'dev';
 
 // Assets críticos para funcionamiento offline
 const STATIC_ASSETS = [
@@ -59,13 +70,16 @@ const NO_CACHE_PATTERNS = [
  * Install event - cachear assets estáticos
  */
 self.addEventListener('install', event => {
-  console.log('[SW] Installing Service Worker v' + CACHE_VERSION);
+  console.log('[SW] Installing Service Worker v' + CACHE_VERSION + ' (' + PRECACHE_REVISION + ')');
 
   event.waitUntil(
-    caches.open(CACHE_STATIC)
-      .then(cache => {
+    updateFromManifest()
+      .then(updated => {
+        if (updated) return;
+        // Sin manifiesto (p. ej. sirviendo www/ sin build): precachear STATIC_ASSETS
         console.log('[SW] Caching static assets');
-        return cache.addAll(STATIC_ASSETS.map(url => new Request(url, { cache: 'reload' })));
+        return caches.open(CACHE_STATIC)
+          .then(cache => cache.addAll(STATIC_ASSETS.map(url => new Request(url, { cache: 'reload' }))));
       })
       .catch(error => {
         console.error('[SW] Error caching static assets:', error);
@@ -74,6 +88,64 @@ self.addEventListener('install', event => {
   );
 });
 
+/**
+ * Compara precache-manifest.json con el de la instalación anterior y
+ * descarga solo lo que cambió: los archivos críticos siempre, el resto solo
+ * si ya estaban en cache. Los archivos que desaparecen se borran.
+ * Devuelve false si no hay manifiesto.
+ */
+async function updateFromManifest() {
+  const response = await fetch(PRECACHE_MANIFEST, { cache: 'reload' }).catch(() => null);
+  if (!response || !response.ok) return false;
+  const manifest = await response.clone().json();
+
+  const meta = await caches.open(CACHE_META);
+  const previousResponse = await meta.match(PRECACHE_MANIFEST);
+  const previous = previousResponse ? await previousResponse.json() : { entries: [] };
+  const before = new Map(previous.entries.map(entry => [entry.url, entry.revision]));
+  const after = new Set(manifest.entries.map(entry => entry.url));
+
+  const changed = manifest.entries.filter(entry => before.get(entry.url) !== entry.revision);
+  const removed = [...before.keys()].filter(url => !after.has(url));
+  console.log(`[SW] Manifest ${manifest.revision}: ${changed.length} changed, ${removed.length} removed`);
+
+  await Promise.all(changed.map(async entry => {
+    for (const url of entryUrls(entry.url)) {
+      const holder = await cacheHolding(url);
+      if (holder || entry.critical) {
+        const fresh = await fetch(new Request(url, { cache: 'reload' }));
+        if (fresh.ok) await (holder || await caches.open(CACHE_STATIC)).put(url, fresh);
+      }
+    }
+  }));
+  await Promise.all(removed.flatMap(entryUrls).map(async url => {
+    for (const cacheName of CACHES) {
+      await (await caches.open(cacheName)).delete(url);
+    }
+  }));
+
+  await meta.put(PRECACHE_MANIFEST, response);
+  return true;
+}
+
+/**
+ * URLs bajo las que se cachea un archivo ('/' es también index.html)
+ */
+function entryUrls(url) {
+  return url === '/index.html' ? [url, '/'] : [url];
+}
+
+/**
+ * La cache que ya tiene 'url', o null
+ */
+async function cacheHolding(url) {
+  for (const cacheName of CACHES) {
+    const cache = await caches.open(cacheName);
+    if (await cache.match(url)) return cache;
+  }
+  return null;
+}
+
 /**
  * Activate event - limpiar caches antiguas
  */
@@ -85,9 +157,8 @@ self.addEventListener('activate', event => {
       .then(cacheNames => {
         return Promise.all(
           cacheNames.map(cacheName => {
-            if (cacheName !== CACHE_STATIC &&
-                cacheName !== CACHE_DYNAMIC &&
-                cacheName !== CACHE_IMAGES &&
+            if (!CACHES.includes(cacheName) &&
+                cacheName !== CACHE_META &&
                 cacheName.startsWith('coleccion-nuevo-ser')) {
               console.log('[SW] Deleting old cache:', cacheName);
               return caches.delete(cacheName);
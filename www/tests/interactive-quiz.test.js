@@ -0,0 +1,286 @@
+/**
+ * Interactive Quiz Tests
+ *
+ * Tests for the quizzes.bundle reader of InteractiveQuiz: the header with
+ * the string table and per-chapter byte offsets written by
+ * empaquetar_quizzes.py, the fallback to the quiz JSON files, the
+ * precomputed question sets and the library review mode.
+ */
+
+const { TextEncoder, TextDecoder } = require('util');
+
+if (typeof global.TextEncoder === 'undefined') global.TextEncoder = TextEncoder;
+if (typeof global.TextDecoder === 'undefined') global.TextDecoder = TextDecoder;
+
+// Load the source file which assigns InteractiveQuiz to window
+require('../js/features/interactive-quiz.js');
+
+const InteractiveQuiz = window.InteractiveQuiz;
+
+/**
+ * Builds a bundle the way empaquetar_quizzes.py does: a JSON header line,
+ * then one compact JSON per chapter, offsets counted in bytes from the
+ * first byte after the header.
+ */
+function buildBundle(variants, strings, version = 1) {
+  const encoder = new TextEncoder();
+  const chapters = {};
+  const segments = [];
+  let position = 0;
+
+  for (const [variant, quizzes] of Object.entries(variants)) {
+    chapters[variant] = {};
+    for (const quiz of quizzes) {
+      const segment = encoder.encode(JSON.stringify(quiz));
+      chapters[variant][quiz.chapterId] = [position, segment.length];
+      segments.push(segment);
+      position += segment.length + 1;
+    }
+  }
+
+  const header = encoder.encode(JSON.stringify({ version, bookId: 'libro', strings, chapters }));
+  const parts = [header, ...segments];
+  const bytes = new Uint8Array(parts.reduce((total, part) => total + part.length + 1, 0));
+  let offset = 0;
+  for (const part of parts) {
+    bytes.set(part, offset);
+    bytes[offset + part.length] = 10;
+    offset += part.length + 1;
+  }
+  return bytes;
+}
+
+function bundleResponse(bytes) {
+  return Promise.resolve({
+    ok: true,
+    arrayBuffer: () => Promise.resolve(bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.length))
+  });
+}
+
+const STRINGS = ['principiante', 'multiple', 'experto', 'ecología'];
+
+const NORMAL = [
+  {
+    chapterId: 'cap-1',
+    title: 'Señales del despertar ¿ñandú? 🌱',
+    questions: [{ question: '¿Qué es la conciencia?', correctAnswer: 1, difficulty: 0, type: 1, tags: [3, 'libre'] }]
+  },
+  {
+    chapterId: 'cap-2',
+    title: 'Capítulo dos',
+    questions: [{ question: 'Después de texto multibyte', correctAnswer: 0, difficulty: 2, type: 1 }]
+  },
+  {
+    chapterId: 'cap-3',
+    title: 'Con conjuntos',
+    questions: [
+      { question: 'Fácil', options: ['a', 'b'], correctAnswer: 0, difficulty: 0 },
+      { question: 'Difícil', options: ['a', 'b'], correctAnswer: 1, difficulty: 2, tags: [3] },
+      { question: 'Otra fácil', options: ['a', 'b'], correctAnswer: 0, difficulty: 0, tags: [3] }
+    ],
+    sets: { difficulty: { principiante: [2, 0], experto: [1, 0] }, tags: { 'ecología': [1, 2] } }
+  }
+];
+
+const KIDS = [
+  {
+    chapterId: 'cap-1',
+    title: 'Versión niños',
+    questions: [{ question: '¿Sabías que la Tierra está viva?', correctAnswer: 2, difficulty: 0 }]
+  }
+];
+
+describe('InteractiveQuiz bundle', () => {
+  let quiz;
+  let bundle;
+
+  beforeEach(async () => {
+    quiz = new InteractiveQuiz();
+    global.fetch = jest.fn(() => bundleResponse(buildBundle({ normal: NORMAL, kids: KIDS }, STRINGS)));
+    bundle = await quiz.loadBundle('libro');
+  });
+
+  // ========================================================================
+  // loadBundle
+  // ========================================================================
+  describe('loadBundle', () => {
+    it('should parse the header and point the body after the first newline', () => {
+      expect(bundle.header.version).toBe(1);
+      expect(bundle.header.strings).toEqual(STRINGS);
+      expect(bundle.bytes[bundle.bodyStart - 1]).toBe(10);
+    });
+
+    it('should download each book only once', async () => {
+      await quiz.loadBundle('libro');
+      expect(global.fetch).toHaveBeenCalledTimes(1);
+    });
+
+    it('should resolve to null when the book has no bundle', async () => {
+      global.fetch = jest.fn(() => Promise.resolve({ ok: false }));
+      expect(await quiz.loadBundle('otro-libro')).toBeNull();
+    });
+  });
+
+  // ========================================================================
+  // quizFromBundle
+  // ========================================================================
+  describe('quizFromBundle', () => {
+    it('should decode a chapter from its byte offsets', () => {
+      const chapter = quiz.quizFromBundle(bundle, 'cap-1', false);
+      expect(chapter.chapterId).toBe('cap-1');
+      expect(chapter.title).toBe('Señales del despertar ¿ñandú? 🌱');
+    });
+
+    it('should count offsets in bytes, not characters, after multibyte text', () => {
+      const chapter = quiz.quizFromBundle(bundle, 'cap-2', false);
+      expect(chapter.title).toBe('Capítulo dos');
+      expect(chapter.questions[0].question).toBe('Después de texto multibyte');
+    });
+
+    it('should restore interned strings', () => {
+      const [question] = quiz.quizFromBundle(bundle, 'cap-1', false).questions;
+      expect(question.difficulty).toBe('principiante');
+      expect(question.type).toBe('multiple');
+      expect(question.tags).toEqual(['ecología', 'libre']);
+      expect(question.correctAnswer).toBe(1);
+    });
+
+    it('should read the kids variant separately', () => {
+      const chapter = quiz.quizFromBundle(bundle, 'cap-1', true);
+      expect(chapter.title).toBe('Versión niños');
+      expect(chapter.questions[0].correctAnswer).toBe(2);
+    });
+
+    it('should return null for a chapter the bundle does not have', () => {
+      expect(quiz.quizFromBundle(bundle, 'cap-9', false)).toBeNull();
+    });
+
+    it('should return undefined without a usable bundle', () => {
+      expect(quiz.quizFromBundle(null, 'cap-1', false)).toBeUndefined();
+      const future = { ...bundle, header: { ...bundle.header, version: 2 } };
+      expect(quiz.quizFromBundle(future, 'cap-1', false)).toBeUndefined();
+    });
+  });
+
+  // ========================================================================
+  // loadQuiz
+  // ========================================================================
+  describe('loadQuiz', () => {
+    it('should fall back to the quiz JSON when there is no bundle', async () => {
+      const json = { quizzes: [{ chapterId: 'cap-1', questions: [{ question: 'Desde JSON', correct: 0 }] }] };
+      global.fetch = jest.fn((url) => Promise.resolve(
+        url.endsWith('quizzes.bundle')
+          ? { ok: false }
+          : { ok: true, json: () => Promise.resolve(json) }
+      ));
+
+      const fresh = new InteractiveQuiz();
+      expect(await fresh.loadQuiz('libro', 'cap-1', false)).toEqual(json.quizzes[0]);
+      expect(global.fetch).toHaveBeenCalledWith('books/libro/assets/quizzes.json');
+    });
+  });
+
+  // ========================================================================
+  // loadQuizSet
+  // ========================================================================
+  describe('loadQuizSet', () => {
+    it('should pick the questions of the set stored in the bundle chapter', async () => {
+      const set = await quiz.loadQuizSet('libro', 'cap-3', false, { difficulty: 'experto' });
+      expect(set.questions.map(q => q.question)).toEqual(['Difícil', 'Fácil']);
+
+      const byTag = await quiz.loadQuizSet('libro', 'cap-3', false, { tag: 'ecología' });
+      expect(byTag.questions.map(q => q.question)).toEqual(['Difícil', 'Otra fácil']);
+      expect(global.fetch).toHaveBeenCalledTimes(1);
+    });
+
+    it('should filter on the device when the chapter has no sets', async () => {
+      const set = await quiz.loadQuizSet('libro', 'cap-1', false, { tag: 'ecología' });
+      expect(set.questions.length).toBe(1);
+      expect(await quiz.loadQuizSet('libro', 'cap-1', false, { difficulty: 'experto' })).toBeNull();
+    });
+  });
+
+  // ========================================================================
+  // open
+  // ========================================================================
+  describe('open', () => {
+    afterEach(() => {
+      document.body.innerHTML = '';
+    });
+
+    it('should fall back to the adult quiz when the bundle has no kids chapter', async () => {
+      // Los quizzes-kids.json con el formato antiguo no entran en el bundle
+      global.fetch = jest.fn(() => bundleResponse(buildBundle({ normal: NORMAL, kids: [] }, STRINGS)));
+
+      const fresh = new InteractiveQuiz();
+      await fresh.open('libro', 'cap-1', true);
+
+      expect(fresh.kidsMode).toBe(false);
+      expect(fresh.currentQuiz.title).toBe('Señales del despertar ¿ñandú? 🌱');
+      expect(fresh.hasAlternate).toBe(false);
+      expect(document.getElementById('toggle-kids')).toBeNull();
+      expect(global.fetch).toHaveBeenCalledTimes(1);
+    });
+
+    it('should offer the kids version when the bundle has it', async () => {
+      const fresh = new InteractiveQuiz();
+      fresh.bundles = quiz.bundles;
+      await fresh.open('libro', 'cap-1', false);
+
+      expect(fresh.hasAlternate).toBe(true);
+      expect(document.getElementById('toggle-kids')).not.toBeNull();
+    });
+
+    it('should offer the chapter sets in the selector', async () => {
+      const fresh = new InteractiveQuiz();
+      fresh.bundles = quiz.bundles;
+      await fresh.open('libro', 'cap-3', false, { tag: 'ecología' });
+
+      expect(fresh.filter).toEqual({ tag: 'ecología' });
+      expect(fresh.currentQuiz.questions.length).toBe(2);
+      expect(document.getElementById('quiz-sets')).not.toBeNull();
+      expect(document.body.innerHTML.includes('data-difficulty="principiante"')).toBe(true);
+    });
+
+    it('should not show the selector for chapters without sets', async () => {
+      const fresh = new InteractiveQuiz();
+      fresh.bundles = quiz.bundles;
+      await fresh.open('libro', 'cap-2', false);
+
+      expect(document.getElementById('quiz-sets')).toBeNull();
+    });
+  });
+
+  // ========================================================================
+  // openReview
+  // ========================================================================
+  describe('openReview', () => {
+    afterEach(() => {
+      document.body.innerHTML = '';
+    });
+
+    it('should draw review questions from the library pool', async () => {
+      const review = {
+        version: 1,
+        strings: ['iniciado'],
+        pools: {
+          normal: [1, 2, 3].map(n => ({
+            bookId: `libro-${n}`, chapterId: 'cap-1', question: `Repaso ${n}`, options: ['a', 'b'], correctAnswer: 0, difficulty: 0
+          })),
+          kids: []
+        }
+      };
+      global.fetch = jest.fn(() => Promise.resolve({ ok: true, json: () => Promise.resolve(review) }));
+
+      const fresh = new InteractiveQuiz();
+      await fresh.openReview(false, 2);
+
+      expect(global.fetch).toHaveBeenCalledWith('books/quiz-review.json');
+      expect(fresh.reviewMode).toBe(true);
+      expect(fresh.currentQuiz.questions.length).toBe(2);
+      expect(fresh.currentQuiz.questions[0].difficulty).toBe('iniciado');
+      expect(fresh.gradedCount).toBe(2);
+      expect(document.getElementById('quiz-sets')).toBeNull();
+    });
+  });
+});